@@ -5,39 +5,351 @@ Logging module for OpenCC GUI - Chinese Text Conversion Tool
 Provides structured logging for debugging and troubleshooting
 """
 
+import atexit
+import contextvars
+import functools
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 
-# Create logs directory if it doesn't exist
-log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
+# Logging is configured from these environment variables on first use
+LOG_DIR_ENV = 'OPENCC_GUI_LOG_DIR'
+LOG_LEVEL_ENV = 'OPENCC_GUI_LOG_LEVEL'
+LOG_MAX_BYTES_ENV = 'OPENCC_GUI_LOG_MAX_BYTES'
+LOG_BACKUPS_ENV = 'OPENCC_GUI_LOG_BACKUPS'
 
-# Configure logging
-log_filename = os.path.join(log_dir, f"opencc_gui_{datetime.now().strftime('%Y%m%d')}.log")
+DEFAULT_LOG_DIR = 'logs'
+DEFAULT_LOG_LEVEL = 'DEBUG'
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 7
 
-# Create logger
+LOG_FILENAME = 'opencc_gui.log'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Create logger; handlers are attached lazily so importing has no side effects
 logger = logging.getLogger('opencc_gui')
 logger.setLevel(logging.DEBUG)
+logger.propagate = False
+
+_setup_lock = threading.RLock()
+_listener = None
+# Process that started the listener; a forked child inherits the object but not its thread
+_listener_pid = None
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Rotates at midnight and whenever the file reaches max_bytes, keeping backup_count old files"""
+
+    def __init__(self, filename, max_bytes=DEFAULT_LOG_MAX_BYTES, backup_count=DEFAULT_LOG_BACKUPS):
+        super().__init__(filename, when='midnight', backupCount=backup_count, encoding='utf-8', delay=True)
+        self.max_bytes = max_bytes
+        # Several size rollovers on one day get increasing numbers instead of overwriting each other
+        self.namer = self._next_name
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if not self.max_bytes:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        self.stream.seek(0, 2)
+        return self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes
+
+    @staticmethod
+    def _next_name(default_name):
+        """default_name, or default_name.NNN numbered past every backup of that day still on disk
+
+        Names freed by the retention are never reused, so a later backup never
+        takes the name of an older one.
+        """
+        directory, base = os.path.split(default_name)
+        numbers = []
+        for name in os.listdir(directory or '.'):
+            if name == base:
+                numbers.append(0)
+            elif name.startswith(base + '.') and name[len(base) + 1:].isdigit():
+                numbers.append(int(name[len(base) + 1:]))
+        if not numbers:
+            return default_name
+        return f"{default_name}.{max(numbers) + 1:03d}"
+
+    def getFilesToDelete(self):
+        """Backups beyond backup_count, oldest first by modification time rather than by name"""
+        directory, base = os.path.split(self.baseFilename)
+        base += '.'
+        backups = [os.path.join(directory, name) for name in os.listdir(directory)
+                   if name.startswith(base) and self.extMatch.match(name[len(base):].split('.')[0])]
+        if len(backups) <= self.backupCount:
+            return []
+        backups.sort(key=lambda path: (os.stat(path).st_mtime_ns, path))
+        return backups[:len(backups) - self.backupCount]
+
+
+def _env_int(name, default):
+    """Integer environment variable, default when unset or invalid"""
+    try:
+        return int(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def configure_logging(log_dir=None, level=None, max_bytes=None, backup_count=None, console=True, log_file=True):
+    """Set up the log pipeline; later calls replace the earlier setup
+
+    Records go through a queue to a listener thread that writes the rotating
+    file and the console, so logging never blocks the calling thread on I/O.
+    Unset arguments come from the OPENCC_GUI_LOG_* environment variables.
+    """
+    global _listener, _listener_pid
+    log_dir = log_dir or os.environ.get(LOG_DIR_ENV) or DEFAULT_LOG_DIR
+    level = (level or os.environ.get(LOG_LEVEL_ENV) or DEFAULT_LOG_LEVEL)
+    level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    if not isinstance(level, int):
+        level = logging.DEBUG
+    max_bytes = max_bytes if max_bytes is not None else _env_int(LOG_MAX_BYTES_ENV, DEFAULT_LOG_MAX_BYTES)
+    backup_count = backup_count if backup_count is not None else _env_int(LOG_BACKUPS_ENV, DEFAULT_LOG_BACKUPS)
+
+    with _setup_lock:
+        shutdown_logging()
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = []
+        try:
+            if log_file:
+                os.makedirs(log_dir, exist_ok=True)
+                file_handler = SizedTimedRotatingFileHandler(os.path.join(log_dir, LOG_FILENAME),
+                                                             max_bytes, backup_count)
+                file_handler.setLevel(level)
+                file_handler.setFormatter(formatter)
+                handlers.append(file_handler)
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Log file disabled: {e}")
+
+        # Console handler with a higher log level
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(max(level, logging.INFO))
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
 
-# Create file handler which logs even debug messages
-fh = logging.FileHandler(log_filename, encoding='utf-8')
-fh.setLevel(logging.DEBUG)
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
-# Create console handler with a higher log level
-ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
 
-# Create formatter and add it to the handlers
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-fh.setFormatter(formatter)
-ch.setFormatter(formatter)
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        # A forked child only drops its copy; the parent still owns the thread and the files
+        if _listener_pid == os.getpid():
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+
+def configure_worker_logging():
+    """Console-only logging for worker processes (a pool initializer)
+
+    Only the parent process writes the log file: several processes rotating
+    the same file would rename it under each other.
+    """
+    configure_logging(log_file=False)
+
+
+class _BootstrapHandler(logging.Handler):
+    """Sets up the real pipeline when the first record arrives, then hands the record over"""
+
+    def emit(self, record):
+        with _setup_lock:
+            if self in logger.handlers:
+                configure_logging()
+        for handler in logger.handlers:
+            if handler is not self and record.levelno >= handler.level:
+                handler.handle(record)
+
+
+logger.addHandler(_BootstrapHandler())
+atexit.register(shutdown_logging)
 
-# Add the handlers to the logger
-logger.addHandler(fh)
-logger.addHandler(ch)
 
 def get_logger():
     """Return the configured logger instance"""
-    return logger
\ No newline at end of file
+    return logger
+
+
+# Stage timing and per-job performance records
+#
+#     with job('convert', mode='s2twp', file_type='excel'):
+#         with span('load'):
+#             ...
+#         record(rows=len(data))
+#
+# Records are only collected when OPENCC_GUI_PERF is set (or after
+# configure_performance(True)); otherwise job() and span() return a shared
+# no-op object. OPENCC_GUI_PROFILE_DIR additionally dumps a cProfile file per job.
+PERF_ENV = 'OPENCC_GUI_PERF'
+PROFILE_DIR_ENV = 'OPENCC_GUI_PROFILE_DIR'
+
+perf_logger = logging.getLogger('opencc_gui.perf')
+
+_perf_enabled = os.environ.get(PERF_ENV, '') not in ('', '0')
+_profile_dir = os.environ.get(PROFILE_DIR_ENV) or None
+_current_job = contextvars.ContextVar('opencc_gui_job', default=None)
+_last_record = None
+
+
+def configure_performance(enabled=True, profile_dir=None):
+    """Turn job records on or off; profile_dir enables a cProfile dump per job"""
+    global _perf_enabled, _profile_dir
+    _perf_enabled = enabled
+    _profile_dir = profile_dir
+
+
+class JobRecord:
+    """Fields, counters and per-stage times of one job"""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = dict(fields)
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    def set(self, **fields):
+        """Add or replace fields of the record"""
+        self.fields.update(fields)
+
+    def add_stage(self, stage, seconds):
+        """Accumulate time spent in a stage (a stage may run many times)"""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def as_dict(self):
+        """The record as emitted"""
+        result = {'job': self.name}
+        result.update(self.fields)
+        result['stages_ms'] = {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()}
+        result['total_ms'] = round((time.perf_counter() - self.started) * 1000, 1)
+        return result
+
+
+class _NullSpan:
+    """Stand-in for job() and span() when there is nothing to record"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times one stage of a job"""
+
+    __slots__ = ('record', 'stage', 'start')
+
+    def __init__(self, record, stage):
+        self.record = record
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        self.record.add_stage(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _Job:
+    """Context of a top-level job: collects its record and emits it at the end"""
+
+    def __init__(self, name, fields):
+        self.record = JobRecord(name, fields)
+        self.profile = None
+
+    def __enter__(self):
+        self.token = _current_job.set(self.record)
+        if _profile_dir:
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        global _last_record
+        _current_job.reset(self.token)
+        result = self.record.as_dict()
+        if self.profile is not None:
+            self.profile.disable()
+            os.makedirs(_profile_dir, exist_ok=True)
+            path = os.path.join(_profile_dir, f"{self.record.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                                              f"_{os.getpid()}.prof")
+            self.profile.dump_stats(path)
+            result['profile'] = path
+        if exc_type is not None:
+            result['error'] = str(exc)
+        _last_record = result
+        perf_logger.info(f"Job record: {json.dumps(result, ensure_ascii=False, default=str)}",
+                         extra={'job_record': result})
+        return False
+
+
+def job(name, **fields):
+    """Context manager for one job (a conversion, a preview...)
+
+    Inside another job it only times a stage called name of the outer job, so
+    engine functions can open jobs of their own and still compose.
+    """
+    if not _perf_enabled:
+        return _NULL_SPAN
+    current = _current_job.get()
+    if current is not None:
+        return _Span(current, name)
+    return _Job(name, fields)
+
+
+def span(stage):
+    """Context manager timing a stage of the current job (no-op outside a job)"""
+    current = _current_job.get()
+    if current is None:
+        return _NULL_SPAN
+    return _Span(current, stage)
+
+
+def timed(stage):
+    """Decorator timing every call of a function as a stage of the current job"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            current = _current_job.get()
+            if current is None:
+                return func(*args, **kwargs)
+            with _Span(current, stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record(**fields):
+    """Add fields (counts, sizes, hit rates) to the current job's record"""
+    current = _current_job.get()
+    if current is not None:
+        current.set(**fields)
+
+
+def last_job_record():
+    """The most recently emitted job record, or None"""
+    return _last_record
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arrow engine for OpenCC GUI - Chinese Text Conversion Tool
+Converts the selected text columns of Parquet and Arrow IPC (Feather) files
+row group by row group, converting each distinct string once; other columns
+are passed through without being decoded
+"""
+
+from pathlib import Path
+
+# Import UI strings
+import ui_strings as ui
+
+# Import logger and stage timing
+from app_logger import get_logger, span
+
+# Import batched conversion
+from batch_convert import ConversionMemo, convert_unique
+
+# Import the rewritable-cell pre-filter
+from char_filter import rewritable_pattern
+
+# Initialize logger
+logger = get_logger()
+
+# Extensions of Parquet files; every other Arrow file type is read as Arrow IPC (Feather v2)
+PARQUET_EXTENSIONS = ('.parquet', '.parq')
+
+# Parquet codec names (file metadata) -> ParquetWriter compression names
+_PARQUET_CODECS = {'UNCOMPRESSED': 'none', 'LZ4_RAW': 'lz4'}
+
+
+def is_parquet(file_path):
+    """Whether a file is Parquet (by extension) rather than Arrow IPC"""
+    return Path(file_path).suffix.lower() in PARQUET_EXTENSIONS
+
+
+def _is_text_type(data_type):
+    import pyarrow as pa
+
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+def _is_text_column(data_type):
+    """String columns, plain or dictionary-encoded"""
+    import pyarrow as pa
+
+    if pa.types.is_dictionary(data_type):
+        return _is_text_type(data_type.value_type)
+    return _is_text_type(data_type)
+
+
+def read_preview(file_path, row_limit):
+    """First row_limit + 1 rows as a pandas DataFrame (the extra row tells whether the file has more)"""
+    import pyarrow as pa
+
+    wanted = row_limit + 1
+    if is_parquet(file_path):
+        import pyarrow.parquet as pq
+        batches = []
+        rows = 0
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=wanted):
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= wanted:
+                break
+        schema = pq.read_schema(file_path)
+    else:
+        reader = pa.ipc.open_file(file_path)
+        batches = []
+        rows = 0
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= wanted:
+                break
+        schema = reader.schema
+    return pa.Table.from_batches(batches, schema=schema).slice(0, wanted).to_pandas()
+
+
+class _ColumnConverter:
+    """Converts string arrays through their dictionary: each distinct value once, indices reused"""
+
+    def __init__(self, converter, memo, conversion_mode):
+        import pyarrow.compute as pc
+
+        self.pc = pc
+        self.converter = converter
+        self.memo = memo if memo is not None else ConversionMemo()
+        self.conversion_mode = conversion_mode
+        self.pattern = rewritable_pattern(conversion_mode)
+        self.distinct = 0
+        self.converted = 0
+
+    def convert_array(self, array, target_type):
+        """Convert one string or dictionary<string> array, returning an array of target_type"""
+        import pyarrow as pa
+
+        encoded = array if pa.types.is_dictionary(array.type) else self.pc.dictionary_encode(array)
+        dictionary = encoded.dictionary
+        self.distinct += len(dictionary)
+        # Only the distinct values holding a character the mode could rewrite reach the converter
+        mask = self.pc.fill_null(self.pc.match_substring_regex(dictionary, self.pattern), False)
+        if not self.pc.any(mask).as_py():
+            return array if array.type == target_type else encoded.cast(target_type)
+        positions = self.pc.indices_nonzero(mask).to_pylist()
+        values = dictionary.to_pylist()
+        texts = [values[i] for i in positions]
+        for position, converted in zip(positions, convert_unique(self.converter, texts, self.memo,
+                                                                 self.conversion_mode)):
+            values[position] = converted
+        self.converted += len(positions)
+        new_dictionary = pa.array(values, type=dictionary.type)
+        result = pa.DictionaryArray.from_arrays(encoded.indices, new_dictionary)
+        if pa.types.is_dictionary(target_type) and len(self.pc.unique(new_dictionary)) < len(new_dictionary):
+            # Values converted to the same text (e.g. 发 and 發 in s2t): re-encode so
+            # the dictionary stays unique, as pandas categories must be
+            result = self.pc.dictionary_encode(result.cast(dictionary.type))
+        return result if result.type == target_type else result.cast(target_type)
+
+    def convert_column(self, column, target_type):
+        """Convert every chunk of a (chunked) column"""
+        import pyarrow as pa
+
+        if isinstance(column, pa.ChunkedArray):
+            return pa.chunked_array([self.convert_array(chunk, target_type) for chunk in column.chunks],
+                                    type=target_type)
+        return self.convert_array(column, target_type)
+
+
+def _convert_table(table, schema, selected, column_converter):
+    """Rebuild a table (or record batch) with the selected columns converted and the original schema"""
+    import pyarrow as pa
+
+    arrays = []
+    for index, field in enumerate(schema):
+        column = table.column(index)
+        if field.name in selected:
+            column = column_converter.convert_column(column, field.type)
+        arrays.append(column)
+    if isinstance(table, pa.RecordBatch):
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _parquet_compression(metadata):
+    """Per-column compression of the first row group, in ParquetWriter terms"""
+    if metadata.num_row_groups == 0:
+        return 'snappy'
+    row_group = metadata.row_group(0)
+    compression = {}
+    for index in range(row_group.num_columns):
+        column = row_group.column(index)
+        codec = column.compression
+        compression[column.path_in_schema] = _PARQUET_CODECS.get(codec, codec.lower())
+    return compression
+
+
+def _selected_text_columns(schema, columns):
+    """Resolve the column selection against a schema, keeping only text columns"""
+    from conversion_engine import resolve_columns
+
+    names = schema.names
+    selected = names if columns is None else resolve_columns(names, columns)
+    if not selected:
+        raise ValueError(ui.WARNING_NO_COLUMN_MSG)
+    text_columns = [name for name in selected if _is_text_column(schema.field(name).type)]
+    skipped = [name for name in selected if name not in text_columns]
+    if skipped:
+        logger.debug(f"Arrow engine: non-text columns left as they are: {skipped}")
+    return selected, set(text_columns)
+
+
+def convert_arrow_file(input_path, output_path, converter, columns=None, progress=None, conversion_mode=None,
+                       memo=None):
+    """Convert the selected columns of a Parquet or Arrow IPC (Feather) file (all columns when none are given)
+
+    Parquet files are processed one row group at a time and keep their row
+    groups, schema metadata and per-column compression; the selected string
+    columns are read dictionary-encoded, so only their distinct values are
+    decoded and converted. IPC files are processed one record batch at a time.
+    """
+    column_converter = _ColumnConverter(converter, memo, conversion_mode)
+    if is_parquet(input_path):
+        summary = _convert_parquet(input_path, output_path, columns, progress, column_converter)
+    else:
+        summary = _convert_ipc(input_path, output_path, columns, progress, column_converter)
+    logger.debug(f"Arrow engine: {column_converter.distinct} distinct strings, "
+                 f"{column_converter.converted} converted")
+    summary['distinct_strings'] = column_converter.distinct
+    return summary
+
+
+def _report_rows(progress, done, total):
+    if progress:
+        progress(done, total, ui.PROGRESS_CONVERTING_TABLE_ROWS.format(done, total))
+
+
+def _convert_parquet(input_path, output_path, columns, progress, column_converter):
+    import pyarrow.parquet as pq
+
+    source = pq.ParquetFile(input_path)
+    schema = source.schema_arrow
+    selected, text_columns = _selected_text_columns(schema, columns)
+    metadata = source.metadata
+    total_rows = metadata.num_rows
+    done_rows = 0
+    _report_rows(progress, 0, total_rows)
+    # Row groups of the selected columns come straight from their dictionary pages
+    source = pq.ParquetFile(input_path, read_dictionary=sorted(text_columns))
+
+    with pq.ParquetWriter(output_path, schema, compression=_parquet_compression(metadata)) as writer:
+        for index in range(metadata.num_row_groups):
+            with span('read'):
+                table = source.read_row_group(index)
+            with span('convert'):
+                table = _convert_table(table, schema, text_columns, column_converter)
+            with span('write'):
+                writer.write_table(table, row_group_size=max(table.num_rows, 1))
+            done_rows += table.num_rows
+            _report_rows(progress, done_rows, total_rows)
+    return {'rows': total_rows, 'columns': [str(col) for col in selected], 'row_groups': metadata.num_row_groups}
+
+
+def _convert_ipc(input_path, output_path, columns, progress, column_converter):
+    import pyarrow as pa
+
+    with pa.memory_map(str(input_path)) as source:
+        reader = pa.ipc.open_file(source)
+        schema = reader.schema
+        selected, text_columns = _selected_text_columns(schema, columns)
+        batches = reader.num_record_batches
+        total_rows = sum(reader.get_batch(index).num_rows for index in range(batches))
+        done_rows = 0
+        _report_rows(progress, 0, total_rows)
+        # Feather's default codec, when this pyarrow build has it
+        options = pa.ipc.IpcWriteOptions(compression='lz4' if pa.Codec.is_available('lz4') else None)
+        with pa.OSFile(str(output_path), 'wb') as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+            for index in range(batches):
+                with span('read'):
+                    batch = reader.get_batch(index)
+                with span('convert'):
+                    batch = _convert_table(batch, schema, text_columns, column_converter)
+                with span('write'):
+                    writer.write_batch(batch)
+                done_rows += batch.num_rows
+                _report_rows(progress, done_rows, total_rows)
+    return {'rows': total_rows, 'columns': [str(col) for col in selected], 'batches': batches}
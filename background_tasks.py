@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Background tasks for OpenCC GUI - Chinese Text Conversion Tool
+Runs loading and preview work off the Tk main thread and posts results back
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Import logger
+from app_logger import get_logger
+
+# Initialize logger
+logger = get_logger()
+
+# The UI event loop should never be blocked longer than this
+UI_LATENCY_TARGET_MS = 50
+
+
+class BackgroundTasks:
+    """Runs callables on worker threads; results are delivered on the Tk thread via root.after
+
+    Tasks are grouped by key ('load', 'preview', ...). Submitting a new task for a
+    key, or cancelling the key, makes any earlier task of that key stale: it is
+    cancelled if it has not started yet and its result is dropped otherwise.
+    """
+
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="opencc-task")
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._futures = {}
+
+    def submit(self, key, func, *args, on_success=None, on_error=None, **kwargs):
+        """Run func(*args, **kwargs) in the background, replacing any pending task of the same key"""
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            previous = self._futures.get(key)
+            if previous is not None:
+                previous.cancel()
+            future = self._executor.submit(func, *args, **kwargs)
+            self._futures[key] = future
+        future.add_done_callback(
+            lambda f: self._post_result(key, generation, f, on_success, on_error))
+        return generation
+
+    def cancel(self, key):
+        """Mark the current task of a key as stale"""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def is_pending(self, key):
+        """Whether a current (non-stale) task of this key has not delivered yet"""
+        with self._lock:
+            future = self._futures.get(key)
+            return future is not None and not future.done()
+
+    def is_current(self, key, generation):
+        """Whether generation is still the latest task of this key"""
+        with self._lock:
+            return self._generations.get(key) == generation
+
+    def _post_result(self, key, generation, future, on_success, on_error):
+        """Worker-side done callback: hand the outcome to the Tk thread"""
+        if future.cancelled() or not self.is_current(key, generation):
+            return
+        try:
+            self.root.after(0, lambda: self._deliver(key, generation, future, on_success, on_error))
+        except RuntimeError:
+            # The main loop is gone (window closed while a task was running)
+            pass
+
+    def _deliver(self, key, generation, future, on_success, on_error):
+        """Tk-side: call the success or error handler unless the task went stale meanwhile"""
+        if not self.is_current(key, generation):
+            return
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                logger.error(f"Background task '{key}' error: {error}")
+        elif on_success:
+            on_success(future.result())
+
+    def shutdown(self):
+        """Stop accepting tasks and drop the queued ones"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class EventLoopMonitor:
+    """Measures how late Tk timer callbacks fire, i.e. how long the event loop was blocked"""
+
+    def __init__(self, root, interval_ms=10):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_lag_ms = 0.0
+        self.samples = 0
+        self._running = False
+        self._expected = 0.0
+
+    def start(self):
+        """Start sampling"""
+        self._running = True
+        self.max_lag_ms = 0.0
+        self.samples = 0
+        self._schedule()
+
+    def stop(self):
+        """Stop sampling and return the worst lag seen in milliseconds"""
+        self._running = False
+        return self.max_lag_ms
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self.root.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        if not self._running:
+            return
+        lag_ms = (time.perf_counter() - self._expected) * 1000
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self.samples += 1
+        self._schedule()
+
+
+def measure_event_loop_lag(root, action, duration_ms=2000, interval_ms=10):
+    """Run action() on the Tk loop and return the worst event-loop lag (ms) within duration_ms
+
+    Meant for automated checks against UI_LATENCY_TARGET_MS, e.g. loading a large
+    file or typing into the direct-text box while the monitor samples the loop.
+    """
+    monitor = EventLoopMonitor(root, interval_ms)
+    monitor.start()
+    root.after(0, action)
+    deadline = time.perf_counter() + duration_ms / 1000
+    while time.perf_counter() < deadline:
+        root.update()
+        time.sleep(0.001)
+    return monitor.stop()
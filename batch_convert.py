@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batched conversion for OpenCC GUI - Chinese Text Conversion Tool
+Joins many short strings into one converter call and splits the result back
+"""
+
+import threading
+from collections import OrderedDict
+
+# Import logger
+from app_logger import get_logger
+
+# Initialize logger
+logger = get_logger()
+
+# Private-use character between newlines: no OpenCC dictionary entry contains a
+# newline or a private-use character, so nothing can be rewritten or matched
+# across the boundary between two pieces
+SEPARATOR_CHAR = "\uE000"
+SEPARATOR = f"\n{SEPARATOR_CHAR}\n"
+
+# Maximum UTF-8 size of the joined text sent to one convert() call
+DEFAULT_BATCH_BYTES = 256 * 1024
+
+# Maximum number of strings kept in the session memo
+DEFAULT_MEMO_SIZE = 200000
+
+
+def _convert_joined(converter, texts):
+    """Convert one batch with a single call, falling back to per-item calls on mismatch"""
+    if len(texts) == 1:
+        return [converter.convert(texts[0])]
+    parts = converter.convert(SEPARATOR.join(texts)).split(SEPARATOR)
+    if len(parts) != len(texts):
+        logger.warning(f"Batch split mismatch ({len(parts)} pieces for {len(texts)} texts), converting one by one")
+        return [converter.convert(text) for text in texts]
+    return parts
+
+
+def convert_batch(converter, texts, batch_bytes=DEFAULT_BATCH_BYTES):
+    """Convert a list of strings with as few converter calls as possible
+
+    Returns the converted strings in input order. Strings that contain the
+    separator character are converted on their own.
+    """
+    results = [None] * len(texts)
+    pending_indexes = []
+    pending_texts = []
+    pending_bytes = 0
+
+    for i, text in enumerate(texts):
+        if SEPARATOR_CHAR in text:
+            results[i] = converter.convert(text)
+            continue
+        size = len(text.encode('utf-8')) + len(SEPARATOR)
+        if pending_texts and pending_bytes + size > batch_bytes:
+            for index, converted in zip(pending_indexes, _convert_joined(converter, pending_texts)):
+                results[index] = converted
+            pending_indexes, pending_texts, pending_bytes = [], [], 0
+        pending_indexes.append(i)
+        pending_texts.append(text)
+        pending_bytes += size
+
+    if pending_texts:
+        for index, converted in zip(pending_indexes, _convert_joined(converter, pending_texts)):
+            results[index] = converted
+    return results
+
+
+def convert_unique(converter, texts, memo=None, conversion_mode=None, convert_func=None):
+    """Convert each distinct string once (through the memo when given) and map results back
+
+    convert_func(list) -> list replaces the default batched call on the converter,
+    e.g. to convert the distinct strings in a process pool.
+    """
+    if convert_func is None:
+        convert_func = lambda items: convert_batch(converter, items)
+    unique_texts = list(dict.fromkeys(texts))
+    if memo is not None and conversion_mode:
+        converted = memo.convert_many(conversion_mode, unique_texts, convert_func)
+    else:
+        converted = convert_func(unique_texts)
+    if len(unique_texts) == len(texts):
+        return converted
+    lookup = dict(zip(unique_texts, converted))
+    return [lookup[text] for text in texts]
+
+
+class ConversionMemo:
+    """Bounded LRU memo of source string -> converted string, keyed per conversion mode"""
+
+    def __init__(self, max_entries=DEFAULT_MEMO_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def convert_many(self, conversion_mode, texts, convert_func):
+        """Convert a list of strings, only passing memo misses to convert_func"""
+        results = [None] * len(texts)
+        missing = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = (conversion_mode, text)
+                converted = self._entries.get(key)
+                if converted is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    results[i] = converted
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if not missing:
+            return results
+
+        converted_missing = convert_func([texts[i] for i in missing])
+        with self._lock:
+            for i, converted in zip(missing, converted_missing):
+                results[i] = converted
+                self._entries[(conversion_mode, texts[i])] = converted
+            overflow = len(self._entries) - self.max_entries
+            for _ in range(max(overflow, 0)):
+                self._entries.popitem(last=False)
+            self.evictions += max(overflow, 0)
+        return results
+
+    def stats(self):
+        """Return memo counters as a dictionary"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+# Memo shared by all conversions of this session
+_session_memo = None
+_session_memo_lock = threading.Lock()
+
+
+def get_session_memo(max_entries=DEFAULT_MEMO_SIZE):
+    """Return the memo shared across columns and files of this session"""
+    global _session_memo
+    with _session_memo_lock:
+        if _session_memo is None:
+            _session_memo = ConversionMemo(max_entries)
+        return _session_memo
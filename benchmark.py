@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for OpenCC GUI - Chinese Text Conversion Tool
+Generates deterministic synthetic corpora, runs every conversion path headlessly
+and compares the JSON results with a stored baseline
+
+Examples:
+    python benchmark.py run --suite quick -o bench.json
+    python benchmark.py run --suite full --modes s2twp,t2s --baseline baseline.json
+    python benchmark.py compare bench.json baseline.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+import ui_strings as ui
+
+# Import logger and job records
+from app_logger import get_logger, configure_performance, configure_worker_logging, job, span, last_job_record
+
+# Import trie engine specs
+from trie_converter import make_spec
+
+# Initialize logger
+logger = get_logger()
+
+MB = 1024 * 1024
+
+# Simplified vocabulary with conversions in every mode; the traditional corpora are derived from it
+VOCABULARY = [
+    '鼠标', '打印机', '软件', '信息', '网络', '头发', '发展', '简体中文', '计算机', '数据库',
+    '服务器', '程序', '内存', '硬盘', '视频', '文件', '系统', '设置', '图书馆', '发票',
+    '里面', '后来', '干净', '面条', '出租车', '自行车', '质量', '优化', '默认', '文档',
+    '用户', '界面', '转换', '汉字', '台湾', '香港', '公司', '报告', '会议', '时间',
+]
+PUNCTUATION = ['，', '。', '、', '；', '：', '！', '？']
+
+# Text file sizes per suite
+TEXT_SIZES = {
+    'quick': [1 * MB, 16 * MB],
+    'full': [1 * MB, 16 * MB, 256 * MB, 1024 * MB],
+}
+
+# Workbooks per suite: (rows, columns, repetition rate)
+WORKBOOKS = {
+    'quick': [(20000, 4, 0.5), (20000, 4, 0.95)],
+    'full': [(20000, 4, 0.5), (200000, 8, 0.0), (200000, 8, 0.5), (200000, 8, 0.95)],
+}
+
+# Word documents per suite: (paragraphs, tables)
+DOCUMENTS = {
+    'quick': [(2000, 20)],
+    'full': [(2000, 20), (50000, 500)],
+}
+
+# Rows loaded by the preview case, as in the GUI
+PREVIEW_ROWS = 1000
+
+# The GUI script timed by the start-up case
+GUI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opencc-py-gui.py')
+
+# Modules that must not be imported before the first frame
+HEAVY_MODULES = ('pandas', 'opencc', 'openpyxl', 'docx')
+
+# Slowdown (or memory growth) tolerated before a case counts as a regression
+DEFAULT_TOLERANCE = 0.15
+
+# Id segment of the cases run without a progress callback, paired with the same case with one
+NO_PROGRESS_TAG = 'noprogress'
+
+# Modes whose input is traditional Chinese
+_TRADITIONAL_SOURCE_MODES = {
+    ui.CONVERSION_MODE_TW2SP, ui.CONVERSION_MODE_TW2S, ui.CONVERSION_MODE_HK2S,
+    ui.CONVERSION_MODE_T2S, ui.CONVERSION_MODE_T2TW, ui.CONVERSION_MODE_T2HK,
+}
+
+
+def source_script(conversion_mode):
+    """'traditional' or 'simplified': the script a mode reads"""
+    return 'traditional' if conversion_mode in _TRADITIONAL_SOURCE_MODES else 'simplified'
+
+
+def vocabulary(script):
+    """Word list of the given script"""
+    if script == 'simplified':
+        return list(VOCABULARY)
+    from converter_cache import get_converter
+    converter = get_converter(ui.CONVERSION_MODE_S2T)
+    return [converter.convert(word) for word in VOCABULARY]
+
+
+def _sentence(rng, words, min_words=4, max_words=12):
+    """A random sentence of words and punctuation"""
+    count = rng.randint(min_words, max_words)
+    parts = []
+    for i in range(count):
+        parts.append(rng.choice(words))
+        if i < count - 1 and rng.random() < 0.2:
+            parts.append(rng.choice(PUNCTUATION[:3]))
+    return ''.join(parts) + rng.choice(PUNCTUATION[1:])
+
+
+def generate_text(path, size_bytes, script, seed=1):
+    """Write a UTF-8 text file of about size_bytes"""
+    rng = random.Random(seed)
+    words = vocabulary(script)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        while written < size_bytes:
+            lines = [''.join(_sentence(rng, words) for _ in range(rng.randint(1, 4))) for _ in range(1000)]
+            block = '\n'.join(lines) + '\n'
+            f.write(block)
+            written += len(block.encode('utf-8'))
+
+
+def _cell_texts(rng, words, rows, columns, repetition):
+    """Yield rows of cell texts; a share of `repetition` comes from a small pool of repeated values"""
+    pool = [_sentence(rng, words, 1, 4) for _ in range(200)]
+    for row in range(rows):
+        yield [rng.choice(pool) if rng.random() < repetition else f"{_sentence(rng, words, 2, 6)}{row}"
+               for _ in range(columns)]
+
+
+def _column_name(index):
+    """Excel column letters of a zero-based index"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_DOC_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+def generate_workbook(path, rows, columns, repetition, script, seed=1):
+    """Write an .xlsx with a header row, text columns and one number column, using shared strings like Excel"""
+    rng = random.Random(seed)
+    words = vocabulary(script)
+    strings = {}
+
+    def shared(text):
+        return strings.setdefault(text, len(strings))
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as package:
+        with package.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((_XML_HEADER + '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                         '<sheetData>').encode('utf-8'))
+            header = [f"{rng.choice(words)}{i}" for i in range(columns)] + ['数量']
+            cells = ''.join(f'<c r="{_column_name(i)}1" t="s"><v>{shared(name)}</v></c>' for i, name in enumerate(header))
+            sheet.write(f'<row r="1">{cells}</row>'.encode('utf-8'))
+            for row, texts in enumerate(_cell_texts(rng, words, rows, columns, repetition), start=2):
+                cells = ''.join(f'<c r="{_column_name(i)}{row}" t="s"><v>{shared(text)}</v></c>'
+                                for i, text in enumerate(texts))
+                cells += f'<c r="{_column_name(columns)}{row}"><v>{row}</v></c>'
+                sheet.write(f'<row r="{row}">{cells}</row>'.encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+
+        items = ''.join(f'<si><t>{escape(text)}</t></si>' for text in strings)
+        package.writestr('xl/sharedStrings.xml', (
+            _XML_HEADER + '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'count="{rows * columns + columns + 1}" uniqueCount="{len(strings)}">{items}</sst>'))
+        package.writestr('xl/workbook.xml', (
+            _XML_HEADER + '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'xmlns:r="{_DOC_REL}"><sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'))
+        package.writestr('xl/_rels/workbook.xml.rels', (
+            _XML_HEADER + f'<Relationships xmlns="{_RELS_NS}">'
+            f'<Relationship Id="rId1" Type="{_DOC_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{_DOC_REL}/sharedStrings" Target="sharedStrings.xml"/></Relationships>'))
+        package.writestr('_rels/.rels', (
+            _XML_HEADER + f'<Relationships xmlns="{_RELS_NS}">'
+            f'<Relationship Id="rId1" Type="{_DOC_REL}/officeDocument" Target="xl/workbook.xml"/></Relationships>'))
+        package.writestr('[Content_Types].xml', (
+            _XML_HEADER + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/sharedStrings.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+            '</Types>'))
+
+
+def _docx_paragraph(rng, words):
+    """A paragraph of two to four runs, some of them bold"""
+    runs = []
+    for _ in range(rng.randint(2, 4)):
+        properties = '<w:rPr><w:b/></w:rPr>' if rng.random() < 0.3 else ''
+        runs.append(f'<w:r>{properties}<w:t xml:space="preserve">{escape(_sentence(rng, words))}</w:t></w:r>')
+    return f'<w:p>{"".join(runs)}</w:p>'
+
+
+def generate_document(path, paragraphs, tables, script, seed=1):
+    """Write a .docx with formatted paragraphs and 3x4 tables spread through the body"""
+    rng = random.Random(seed)
+    words = vocabulary(script)
+    table_every = max(paragraphs // max(tables, 1), 1)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as package:
+        with package.open('word/document.xml', 'w', force_zip64=True) as document:
+            document.write((_XML_HEADER + '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+                            'wordprocessingml/2006/main"><w:body>').encode('utf-8'))
+            written_tables = 0
+            for index in range(paragraphs):
+                document.write(_docx_paragraph(rng, words).encode('utf-8'))
+                if written_tables < tables and index % table_every == table_every - 1:
+                    rows = ''.join('<w:tr>' + ''.join(f'<w:tc>{_docx_paragraph(rng, words)}</w:tc>'
+                                                      for _ in range(4)) + '</w:tr>' for _ in range(3))
+                    document.write(f'<w:tbl>{rows}</w:tbl>'.encode('utf-8'))
+                    written_tables += 1
+            document.write(b'<w:sectPr/></w:body></w:document>')
+        package.writestr('_rels/.rels', (
+            _XML_HEADER + f'<Relationships xmlns="{_RELS_NS}">'
+            f'<Relationship Id="rId1" Type="{_DOC_REL}/officeDocument" Target="word/document.xml"/></Relationships>'))
+        package.writestr('[Content_Types].xml', (
+            _XML_HEADER + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.'
+            'wordprocessingml.document.main+xml"/></Types>'))
+
+
+def build_cases(suite, modes):
+    """List the benchmark cases of a suite for the given modes"""
+    cases = [{'id': 'gui-first-frame', 'kind': 'gui', 'mode': None, 'engine': 'tk'}]
+    for mode in modes:
+        script = source_script(mode)
+        cases.append({'id': f"startup-{mode}", 'kind': 'startup', 'mode': mode, 'engine': 'opencc'})
+        for size in TEXT_SIZES[suite]:
+            cases.append({'id': f"text-{size // MB}mb-{mode}", 'kind': 'text', 'mode': mode, 'engine': 'text',
+                          'input': f"text-{script}-{size // MB}mb.txt",
+                          'generate': ['text', size, script]})
+        size = TEXT_SIZES[suite][0]
+        cases.append({'id': f"text-{size // MB}mb-trie-{mode}", 'kind': 'text', 'mode': mode, 'engine': 'trie',
+                      'input': f"text-{script}-{size // MB}mb.txt",
+                      'generate': ['text', size, script]})
+        cases.append({'id': f"text-{size // MB}mb-{NO_PROGRESS_TAG}-{mode}", 'kind': 'text', 'mode': mode,
+                      'engine': 'text', 'progress': False, 'input': f"text-{script}-{size // MB}mb.txt",
+                      'generate': ['text', size, script]})
+        size = TEXT_SIZES[suite][-1]
+        cases.append({'id': f"text-{size // MB}mb-parallel-{mode}", 'kind': 'text', 'mode': mode,
+                      'engine': 'text-parallel', 'input': f"text-{script}-{size // MB}mb.txt",
+                      'generate': ['text', size, script]})
+        for rows, columns, repetition in WORKBOOKS[suite]:
+            name = f"xlsx-{script}-{rows}x{columns}-rep{int(repetition * 100)}.xlsx"
+            for engine in ('sharedstrings', 'pandas'):
+                cases.append({'id': f"xlsx-{rows}x{columns}-rep{int(repetition * 100)}-{engine}-{mode}",
+                              'kind': 'excel', 'mode': mode, 'engine': engine, 'input': name,
+                              'generate': ['excel', rows, columns, repetition, script]})
+        rows, columns, repetition = WORKBOOKS[suite][0]
+        for engine in ('sharedstrings', 'pandas'):
+            cases.append({'id': f"xlsx-{rows}x{columns}-rep{int(repetition * 100)}-{engine}-{NO_PROGRESS_TAG}-{mode}",
+                          'kind': 'excel', 'mode': mode, 'engine': engine, 'progress': False,
+                          'input': f"xlsx-{script}-{rows}x{columns}-rep{int(repetition * 100)}.xlsx",
+                          'generate': ['excel', rows, columns, repetition, script]})
+        cases.append({'id': f"preview-{PREVIEW_ROWS}rows-{mode}", 'kind': 'preview', 'mode': mode,
+                      'engine': 'pandas',
+                      'input': f"xlsx-{script}-{rows}x{columns}-rep{int(repetition * 100)}.xlsx",
+                      'generate': ['excel', rows, columns, repetition, script]})
+        for paragraphs, tables in DOCUMENTS[suite]:
+            cases.append({'id': f"docx-{paragraphs}p-{tables}t-{mode}", 'kind': 'word', 'mode': mode,
+                          'engine': 'docx', 'input': f"docx-{script}-{paragraphs}p-{tables}t.docx",
+                          'generate': ['word', paragraphs, tables, script]})
+        paragraphs, tables = DOCUMENTS[suite][0]
+        cases.append({'id': f"docx-{paragraphs}p-{tables}t-{NO_PROGRESS_TAG}-{mode}", 'kind': 'word', 'mode': mode,
+                      'engine': 'docx', 'progress': False, 'input': f"docx-{script}-{paragraphs}p-{tables}t.docx",
+                      'generate': ['word', paragraphs, tables, script]})
+    return cases
+
+
+def ensure_input(workdir, case):
+    """Generate the input of a case unless an earlier run left it in workdir"""
+    if 'input' not in case:
+        return None
+    path = os.path.join(workdir, case['input'])
+    if not os.path.exists(path):
+        kind, *params = case['generate']
+        logger.info(f"Generating {path}")
+        partial = path + '.partial'
+        if kind == 'text':
+            generate_text(partial, *params)
+        elif kind == 'excel':
+            generate_workbook(partial, *params)
+        else:
+            generate_document(partial, *params)
+        os.replace(partial, path)
+    return path
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB, None when the platform does not tell
+
+    Linux keeps ru_maxrss across fork and exec, so a spawned worker would report
+    the parent's peak; /proc/self/status has the peak of this process image only.
+    """
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, other systems kilobytes
+    return round(peak / MB if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def _run_gui_startup(case):
+    """Time-to-first-frame of the GUI: module import, window construction and first paint
+
+    Without a display only the import is timed and 'display' is False.
+    """
+    import importlib.util
+
+    configure_performance(True)
+    start = time.perf_counter()
+    first_frame = None
+    with job('gui_startup'):
+        with span('import'):
+            spec = importlib.util.spec_from_file_location('opencc_py_gui', GUI_SCRIPT)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        try:
+            root = module.tk.Tk()
+        except module.tk.TclError:
+            root = None
+        if root is not None:
+            with span('first_frame'):
+                app = module.OpenCCGUI(root)
+                root.wait_visibility(root)
+                root.update()
+            first_frame = time.perf_counter() - start
+            heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+            app.tasks.shutdown()
+            root.destroy()
+        else:
+            heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+    wall = first_frame if first_frame is not None else time.perf_counter() - start
+    return {
+        'case': case['id'],
+        'kind': case['kind'],
+        'engine': case['engine'],
+        'mode': None,
+        'display': root is not None,
+        'heavy_modules_loaded': heavy,
+        'wall_s': round(wall, 4),
+        'peak_rss_mb': _peak_rss_mb(),
+        'stages_ms': (last_job_record() or {}).get('stages_ms'),
+    }
+
+
+def run_case(case, input_path, output_dir):
+    """Run one case in the current process and return its result record"""
+    if case['kind'] == 'gui':
+        return _run_gui_startup(case)
+
+    import conversion_engine
+    from progress_channel import ProgressChannel
+
+    mode = case['mode']
+    configure_performance(True)
+    channel = ProgressChannel()
+    items = None
+    start = time.perf_counter()
+
+    if case['kind'] == 'startup':
+        from converter_cache import get_converter
+        with job('startup', mode=mode):
+            with span('import'):
+                import opencc  # noqa: F401
+            converter = get_converter(mode)
+            with span('first_convert'):
+                converter.convert(VOCABULARY[0])
+        items = 1
+    elif case['kind'] == 'preview':
+        from converter_cache import get_converter
+        with job('preview', mode=mode):
+            data, _ = conversion_engine.load_preview_data(input_path, 'excel', row_limit=PREVIEW_ROWS)
+            with span('convert'):
+                conversion_engine.convert_dataframe(data, list(data.columns), get_converter(mode))
+        items = len(data)
+    else:
+        extension = os.path.splitext(input_path)[1]
+        output_path = os.path.join(output_dir, f"{case['id']}{extension}")
+        summary = conversion_engine.convert_file(
+            input_path, output_path, make_spec(mode) if case['engine'] == 'trie' else mode,
+            progress=channel.update if case.get('progress', True) else None,
+            workers=0 if case['engine'] == 'text-parallel' else None,
+            excel_engine=case['engine'] if case['kind'] == 'excel' else 'auto')
+        items = (summary.get('rows') or summary.get('shared_strings') or summary.get('paragraphs')
+                 or summary.get('chars'))
+
+    wall = time.perf_counter() - start
+    extra = {}
+    if case['engine'] == 'trie':
+        extra['matches_opencc'] = _matches_opencc(input_path, output_path, mode)
+    if case['kind'] in ('text', 'excel', 'word'):
+        os.remove(output_path)
+        extra['progress'] = case.get('progress', True)
+    input_bytes = os.path.getsize(input_path) if input_path else 0
+    return {
+        'case': case['id'],
+        'kind': case['kind'],
+        'engine': case['engine'],
+        'mode': mode,
+        'input_bytes': input_bytes,
+        'items': items,
+        'wall_s': round(wall, 4),
+        'throughput_mb_s': round(input_bytes / MB / wall, 3) if input_bytes and wall else None,
+        'items_per_s': round(items / wall, 1) if items and wall else None,
+        'peak_rss_mb': _peak_rss_mb(),
+        'stages_ms': (last_job_record() or {}).get('stages_ms'),
+        **extra,
+    }
+
+
+def _matches_opencc(input_path, output_path, mode):
+    """Whether a text converted by the trie engine equals the OpenCC package's conversion"""
+    from converter_cache import get_converter
+
+    with open(input_path, encoding='utf-8') as f:
+        expected = get_converter(mode).convert(f.read())
+    with open(output_path, encoding='utf-8') as f:
+        return f.read() == expected
+
+
+def add_engine_speedups(records):
+    """Add speedup_vs_opencc to trie cases whose OpenCC counterpart ran too"""
+    walls = {record['case']: record['wall_s'] for record in records}
+    for record in records:
+        if record.get('engine') == 'trie':
+            reference = walls.get(record['case'].replace('-trie-', '-'))
+            if reference and record['wall_s']:
+                record['speedup_vs_opencc'] = round(reference / record['wall_s'], 2)
+
+
+def run_case_isolated(case, input_path, output_dir):
+    """Run one case in a fresh process so peak RSS and start-up cost belong to that case only"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=configure_worker_logging) as executor:
+        return executor.submit(run_case, case, input_path, output_dir).result()
+
+
+def environment():
+    """Machine and library versions recorded with the results"""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    for module in ('opencc', 'pandas', 'openpyxl'):
+        try:
+            info[module] = getattr(__import__(module), '__version__', 'unknown')
+        except ImportError:
+            info[module] = None
+    return info
+
+
+def add_progress_overheads(records):
+    """Add progress_overhead_s and progress_overhead (a fraction) to cases whose no-progress twin ran too"""
+    by_case = {record['case']: record for record in records}
+    for record in records:
+        if record.get('progress') is False:
+            paired = by_case.get(record['case'].replace(f"-{NO_PROGRESS_TAG}-", '-'))
+            if paired and paired['wall_s'] and record['wall_s']:
+                paired['progress_overhead_s'] = round(paired['wall_s'] - record['wall_s'], 4)
+                paired['progress_overhead'] = round(paired['wall_s'] / record['wall_s'] - 1, 3)
+
+
+def progress_overheads(results, baseline=None):
+    """Progress reporting overhead of every paired case, with the baseline's when it has the case"""
+    previous = {record['case']: record for record in (baseline or {}).get('results', [])}
+    overheads = []
+    for record in results.get('results', []):
+        if 'progress_overhead' in record:
+            overheads.append({
+                'case': record['case'],
+                'current': record['progress_overhead'],
+                'baseline': previous.get(record['case'], {}).get('progress_overhead'),
+            })
+    return overheads
+
+
+def print_progress_overheads(overheads):
+    """Print the progress reporting overheads to stdout"""
+    for item in overheads:
+        baseline = f" (baseline {item['baseline']:+.1%})" if item['baseline'] is not None else ''
+        print(f"PROGRESS {item['case']}: {item['current']:+.1%}{baseline}")
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """List regressions of results against a baseline (both run() outputs)
+
+    A case regresses when it got slower, or its peak memory grew, by more than
+    tolerance (a fraction). Cases missing from either side are ignored.
+    """
+    previous = {record['case']: record for record in baseline.get('results', [])}
+    regressions = []
+    for record in results.get('results', []):
+        old = previous.get(record['case'])
+        if not old:
+            continue
+        for metric in ('wall_s', 'peak_rss_mb'):
+            if old.get(metric) and record.get(metric) and record[metric] > old[metric] * (1 + tolerance):
+                regressions.append({
+                    'case': record['case'],
+                    'metric': metric,
+                    'baseline': old[metric],
+                    'current': record[metric],
+                    'change': round(record[metric] / old[metric] - 1, 3),
+                })
+    return regressions
+
+
+def print_regressions(regressions):
+    """Print a regression report to stdout"""
+    if not regressions:
+        print("No regressions")
+        return
+    for item in regressions:
+        print(f"REGRESSION {item['case']}: {item['metric']} {item['baseline']} -> {item['current']} "
+              f"({item['change']:+.0%})")
+
+
+def run_benchmarks(args):
+    """Run the 'run' command; returns the process exit code"""
+    modes = [m for m in args.modes.split(',') if m.strip()]
+    cases = build_cases(args.suite, modes)
+    if args.cases:
+        wanted = [c for c in args.cases.split(',') if c.strip()]
+        cases = [case for case in cases if any(name in case['id'] for name in wanted)]
+
+    workdir = args.workdir or os.path.join(tempfile.gettempdir(), 'opencc_benchmark')
+    os.makedirs(workdir, exist_ok=True)
+    results = {'environment': environment(), 'suite': args.suite, 'results': []}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for case in cases:
+            input_path = ensure_input(workdir, case)
+            record = run_case_isolated(case, input_path, output_dir)
+            results['results'].append(record)
+            rate = f"{record['throughput_mb_s']} MB/s" if record.get('throughput_mb_s') else ''
+            print(f"{record['case']:<48} {record['wall_s']:>9.3f}s {rate:>14} "
+                  f"{record['peak_rss_mb'] or 0:>8.0f} MB", flush=True)
+            if record.get('matches_opencc') is False:
+                print(f"MISMATCH {record['case']}: output differs from OpenCC", flush=True)
+    add_engine_speedups(results['results'])
+    add_progress_overheads(results['results'])
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    mismatched = any(record.get('matches_opencc') is False for record in results['results'])
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print_progress_overheads(progress_overheads(results, baseline))
+        regressions = compare_results(results, baseline, args.tolerance)
+        print_regressions(regressions)
+        return 1 if regressions or mismatched else 0
+    print_progress_overheads(progress_overheads(results))
+    return 1 if mismatched else 0
+
+
+def run_compare(args):
+    """Run the 'compare' command; returns the process exit code"""
+    with open(args.results, encoding='utf-8') as f:
+        results = json.load(f)
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print_progress_overheads(progress_overheads(results, baseline))
+    regressions = compare_results(results, baseline, args.tolerance)
+    print_regressions(regressions)
+    return 1 if regressions else 0
+
+
+def build_parser():
+    """Build the argument parser"""
+    parser = argparse.ArgumentParser(description="OpenCC conversion benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="generate corpora and run the benchmarks")
+    run_parser.add_argument('--suite', choices=sorted(TEXT_SIZES), default='quick',
+                            help="quick: MB-sized inputs; full: up to 1 GB of text and 200k-row workbooks")
+    run_parser.add_argument('--modes', default=ui.CONVERSION_MODE_S2TWP,
+                            help="comma-separated conversion modes (default: s2twp)")
+    run_parser.add_argument('--cases', help="only run cases whose id contains one of these comma-separated names")
+    run_parser.add_argument('--workdir', help="where generated inputs are kept between runs "
+                                              "(default: <tmp>/opencc_benchmark)")
+    run_parser.add_argument('-o', '--output', help="write the JSON results to this file")
+    run_parser.add_argument('--baseline', help="compare with an earlier JSON result and fail on regressions")
+    run_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help="allowed slowdown or memory growth as a fraction (default: 0.15)")
+    run_parser.set_defaults(func=run_benchmarks)
+
+    compare_parser = subparsers.add_parser('compare', help="compare two JSON results")
+    compare_parser.add_argument('results')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    compare_parser.set_defaults(func=run_compare)
+    return parser
+
+
+def main(argv=None):
+    """Main function to run the benchmarks"""
+    multiprocessing.freeze_support()
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
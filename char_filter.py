@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Character filter for OpenCC GUI - Chinese Text Conversion Tool
+Finds the cells a conversion mode could rewrite, so the rest never reach OpenCC
+"""
+
+import re
+from functools import lru_cache
+
+# Import logger
+from app_logger import get_logger
+
+# Import dictionary discovery and conversion specs
+from trie_converter import dictionary_chain, parse_spec, read_dictionary
+
+# Initialize logger
+logger = get_logger()
+
+# Used when the dictionaries of a mode cannot be read: every OpenCC dictionary
+# entry contains at least one CJK character
+CJK_PATTERN = '[\u2e80-\u2fdf\u3005-\u3007\u3021-\u3029\u3038-\u303b\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0003134f]'
+
+# dtype kinds that never hold text: booleans, numbers, dates and durations
+NON_TEXT_KINDS = 'biufcmM'
+
+
+def _dictionary_files(conversion_mode):
+    """Dictionary and glossary files that can rewrite text in a mode or trie spec, None when unknown"""
+    parsed = parse_spec(conversion_mode)
+    mode, glossary_files = parsed if parsed else (conversion_mode, [])
+    chain = dictionary_chain(mode)
+    if chain is None:
+        return None
+    return [path for group in chain for path in group] + list(glossary_files)
+
+
+def _character_class(chars):
+    """Regex character class matching exactly the given characters, with runs folded into ranges"""
+    codes = sorted(ord(char) for char in chars)
+    parts = []
+    start = previous = codes[0]
+    for code in codes[1:] + [None]:
+        if code is not None and code == previous + 1:
+            previous = code
+            continue
+        if previous == start:
+            parts.append(re.escape(chr(start)))
+        else:
+            parts.append(f"{re.escape(chr(start))}-{re.escape(chr(previous))}")
+        if code is not None:
+            start = previous = code
+    return f"[{''.join(parts)}]"
+
+
+@lru_cache(maxsize=None)
+def rewritable_pattern(conversion_mode=None):
+    """Regex matching text that the conversion mode could change
+
+    Each dictionary (and glossary) key contributes its first non-ASCII
+    character: a key can only match where all of its characters occur, and a
+    step of the conversion chain that matches nothing hands its input unchanged
+    to the next one, so text without any of these characters passes through
+    the whole chain as is.
+    Falls back to CJK_PATTERN when the dictionaries are not available.
+    """
+    files = _dictionary_files(conversion_mode) if conversion_mode else None
+    if not files:
+        return CJK_PATTERN
+    chars = set()
+    for path in files:
+        for key in read_dictionary(path, strict=False):
+            chars.add(next((char for char in key if ord(char) > 0x7f), key[0]))
+    if not chars:
+        return CJK_PATTERN
+    logger.debug(f"Rewritable characters for {conversion_mode}: {len(chars)} from {len(files)} dictionaries")
+    return _character_class(chars)
+
+
+def rewritable_mask(series, conversion_mode=None):
+    """Boolean mask of the text cells of a pandas Series that the mode could rewrite
+
+    Columns of non-text dtypes are all False, as are missing values and the
+    numbers and dates inside object columns, so their type is kept.
+    """
+    import pandas as pd
+
+    if series.dtype.kind in NON_TEXT_KINDS:
+        return pd.Series(False, index=series.index)
+    if series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype):
+        # Mixed cells or categories: astype(str) turns every cell into text (the
+        # str dtype from pandas 3, Python str objects before) so one vectorized
+        # .str.contains covers the column; the text of a number, a date or a
+        # missing value never contains a CJK character
+        series = series.astype(str)
+    return series.str.contains(rewritable_pattern(conversion_mode), regex=True, na=False).astype(bool)
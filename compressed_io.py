@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compressed I/O for OpenCC GUI - Chinese Text Conversion Tool
+Reads and writes gzip, bzip2, xz and Zstandard files as streams, with the
+(de)compression running in a background thread alongside the conversion
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+from pathlib import Path
+
+# Import UI strings
+import ui_strings as ui
+
+# Import logger
+from app_logger import get_logger
+
+# Initialize logger
+logger = get_logger()
+
+# Compressed file suffixes and the compression they stand for
+COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+}
+
+# Leading bytes of each format, for compressed files without a compression suffix
+_MAGIC_BYTES = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+_BZIP2_MAGIC = b'BZh'
+
+# Levels of the command line tools' defaults (gzip -6, zstd -3) rather than
+# the slower library defaults
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Uncompressed bytes per block handed between the threads
+DEFAULT_BLOCK_BYTES = 1024 * 1024
+
+# Blocks decompressed ahead of the reader, or queued for the compressor
+DEFAULT_BLOCKS_AHEAD = 4
+
+# How often a blocked background thread checks whether the stream was closed
+_POLL_SECONDS = 0.1
+
+
+def compression_from_suffix(file_path):
+    """Compression named by a file's suffix ('gzip', 'bz2', 'xz', 'zstd'), or None"""
+    return COMPRESSION_SUFFIXES.get(Path(file_path).suffix.lower())
+
+
+def detect_compression(file_path):
+    """Compression of an existing file from its suffix, else from its first bytes; None when uncompressed"""
+    compression = compression_from_suffix(file_path)
+    if compression:
+        return compression
+    with open(file_path, 'rb') as f:
+        head = f.read(6)
+    for magic, name in _MAGIC_BYTES:
+        if head.startswith(magic):
+            return name
+    if head.startswith(_BZIP2_MAGIC) and head[3:4].isdigit() and head[3:4] != b'0':
+        return 'bz2'
+    return None
+
+
+def strip_compression_suffix(file_path):
+    """Path without its compression suffix ('a.csv.gz' -> 'a.csv')"""
+    file_path = Path(file_path)
+    return file_path.with_suffix('') if compression_from_suffix(file_path) else file_path
+
+
+def _zstandard():
+    """The zstandard module (optional: only needed for .zst files)"""
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(ui.ERROR_IMPORT_ZSTANDARD_MSG) from None
+    return zstandard
+
+
+def _open_stream(raw, compression, mode):
+    """(De)compressing binary stream over an open raw file; closing it leaves raw open"""
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode=mode, compresslevel=GZIP_LEVEL)
+    if compression == 'bz2':
+        return bz2.BZ2File(raw, mode)
+    if compression == 'xz':
+        return lzma.LZMAFile(raw, mode)
+    if compression == 'zstd':
+        zstandard = _zstandard()
+        if mode == 'rb':
+            return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=False)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+class _ThreadedReader(io.BufferedIOBase):
+    """Binary reader whose blocks are decompressed ahead in a background thread"""
+
+    def __init__(self, file_path, compression, block_bytes=DEFAULT_BLOCK_BYTES, blocks_ahead=DEFAULT_BLOCKS_AHEAD):
+        super().__init__()
+        self.name = str(file_path)
+        self.compression = compression
+        # Bytes of the compressed file consumed by the blocks read so far
+        self.compressed_position = 0
+        self._raw = open(file_path, 'rb')
+        try:
+            self._source = _open_stream(self._raw, compression, 'rb')
+        except BaseException:
+            self._raw.close()
+            raise
+        self._blocks = queue.Queue(blocks_ahead)
+        self._stop = threading.Event()
+        self._block = b''
+        self._offset = 0
+        self._position = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._decompress, args=(block_bytes,),
+                                        name=f"decompress-{Path(file_path).name}", daemon=True)
+        self._thread.start()
+
+    def _decompress(self, block_bytes):
+        """Background: decompress blocks until the end of the file (an empty block) or close()"""
+        try:
+            while True:
+                block = self._source.read(block_bytes)
+                if not self._put((block, self._raw.tell())) or not block:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _next_block(self):
+        item = self._blocks.get()
+        if isinstance(item, Exception):
+            self._eof = True
+            raise item
+        self._block, self.compressed_position = item
+        self._offset = 0
+        self._eof = not self._block
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = None
+        parts = []
+        while size is None or size > 0:
+            if self._offset >= len(self._block):
+                if self._eof:
+                    break
+                self._next_block()
+                continue
+            end = len(self._block) if size is None else min(len(self._block), self._offset + size)
+            parts.append(self._block[self._offset:end])
+            if size is not None:
+                size -= end - self._offset
+            self._offset = end
+        data = b''.join(parts)
+        self._position += len(data)
+        return data
+
+    def read1(self, size=-1):
+        """Read from the current block only (one more block when it is used up)"""
+        if self._offset >= len(self._block) and not self._eof:
+            self._next_block()
+        end = len(self._block) if size is None or size < 0 else min(len(self._block), self._offset + size)
+        data = self._block[self._offset:end]
+        self._offset = end
+        self._position += len(data)
+        return data
+
+    def peek(self, size=0):
+        """Bytes ahead of the read position without consuming them"""
+        if self._offset >= len(self._block) and not self._eof:
+            self._next_block()
+        return self._block[self._offset:]
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._source.close()
+            self._raw.close()
+        super().close()
+
+
+class _ThreadedWriter(io.BufferedIOBase):
+    """Binary writer whose blocks are compressed in a background thread"""
+
+    def __init__(self, file_path, compression, block_bytes=DEFAULT_BLOCK_BYTES, blocks_ahead=DEFAULT_BLOCKS_AHEAD):
+        super().__init__()
+        self.name = str(file_path)
+        self.compression = compression
+        self._raw = open(file_path, 'wb')
+        try:
+            self._sink = _open_stream(self._raw, compression, 'wb')
+        except BaseException:
+            self._raw.close()
+            raise
+        self._block_bytes = block_bytes
+        self._blocks = queue.Queue(blocks_ahead)
+        self._pending = []
+        self._pending_size = 0
+        self._error = None
+        self._thread = threading.Thread(target=self._compress, name=f"compress-{Path(file_path).name}",
+                                        daemon=True)
+        self._thread.start()
+
+    def _compress(self):
+        """Background: compress queued blocks until None; after an error the rest is drained unwritten"""
+        while True:
+            block = self._blocks.get()
+            if block is None:
+                return
+            if self._error is None:
+                try:
+                    self._sink.write(block)
+                except Exception as e:
+                    self._error = e
+
+    def _check_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._check_error()
+        self._pending.append(bytes(data))
+        self._pending_size += len(data)
+        if self._pending_size >= self._block_bytes:
+            self._send()
+        return len(data)
+
+    def _send(self):
+        self._blocks.put(b''.join(self._pending))
+        self._pending = []
+        self._pending_size = 0
+
+    def flush(self):
+        # Blocks reach the compressor as they fill up and at close()
+        self._check_error()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._pending:
+                self._send()
+            self._blocks.put(None)
+            self._thread.join()
+            if self._error is None:
+                self._sink.close()
+        finally:
+            self._raw.close()
+            super().close()
+        self._check_error()
+
+
+def open_file(file_path, mode='rb', encoding=None, newline=None, compression=None):
+    """open() for files that may be compressed
+
+    When compression is None it is detected: from the suffix or the first bytes
+    when reading, from the suffix when writing. Uncompressed files are opened
+    with the built-in open(); compressed ones get a stream whose
+    (de)compression runs in a background thread, so it overlaps with the
+    conversion of the previous block.
+    """
+    reading = 'r' in mode
+    if compression is None:
+        compression = detect_compression(file_path) if reading else compression_from_suffix(file_path)
+    if not compression:
+        return open(file_path, mode, encoding=encoding, newline=newline)
+    logger.debug(f"Opening {file_path} as {compression} ({'read' if reading else 'write'})")
+    stream = _ThreadedReader(file_path, compression) if reading else _ThreadedWriter(file_path, compression)
+    if 'b' in mode:
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, newline=newline)
+
+
+def input_position(stream):
+    """Position in the file on disk of a binary stream from open_file, for progress against its size"""
+    position = getattr(stream, 'compressed_position', None)
+    return stream.tell() if position is None else position
@@ -0,0 +1,697 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conversion engine for OpenCC GUI - Chinese Text Conversion Tool
+UI-free Excel, Word and text conversion shared by the GUI and the CLI
+(never imports tkinter; heavy libraries are imported on first use)
+"""
+
+import csv
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+# Import UI strings
+import ui_strings as ui
+
+# Import logger and stage timing
+from app_logger import get_logger, job, span, record
+
+# Import converter registry
+from converter_cache import get_converter, get_converter_cache
+
+# Import batched conversion
+from batch_convert import ConversionMemo, convert_unique
+
+# Import the rewritable-cell pre-filter
+from char_filter import rewritable_mask
+
+# Import progress units
+from progress_channel import UNIT_BYTES
+
+# Import transparent (de)compression
+from compressed_io import compression_from_suffix, detect_compression, input_position, open_file, strip_compression_suffix
+
+# Initialize logger
+logger = get_logger()
+
+# Conversion modes understood by OpenCC
+CONVERSION_MODES = [
+    ui.CONVERSION_MODE_S2TWP,
+    ui.CONVERSION_MODE_S2TW,
+    ui.CONVERSION_MODE_S2HK,
+    ui.CONVERSION_MODE_S2T,
+    ui.CONVERSION_MODE_TW2SP,
+    ui.CONVERSION_MODE_TW2S,
+    ui.CONVERSION_MODE_HK2S,
+    ui.CONVERSION_MODE_T2S,
+    ui.CONVERSION_MODE_T2TW,
+    ui.CONVERSION_MODE_T2HK,
+]
+
+# Supported file extensions and the file type they map to
+FILE_TYPES = {
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+    '.docx': 'word',
+    '.txt': 'text',
+    '.csv': 'csv',
+    '.tsv': 'csv',
+    '.parquet': 'arrow',
+    '.parq': 'arrow',
+    '.feather': 'arrow',
+    '.arrow': 'arrow',
+    '.json': 'json',
+    '.jsonl': 'json',
+    '.ndjson': 'json',
+}
+
+# File types that can also be read from and written to compressed files
+# (.gz, .bz2, .xz, .zst; see compressed_io)
+COMPRESSED_FILE_TYPES = ('text', 'csv', 'json')
+
+# File types converted column by column, using the column selection
+# (key paths for JSON)
+TABLE_FILE_TYPES = ('excel', 'csv', 'arrow', 'json')
+
+# Size of the line-aligned chunks read by the streaming text conversion
+DEFAULT_TEXT_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Chunks read without a line break before a chunk is cut at another boundary
+_MAX_PENDING_CHUNKS = 4
+
+# Characters that no OpenCC dictionary entry contains (a subset of OpenCC's
+# sentence separators), so a chunk cut right after one converts like the whole text
+_CUT_AFTER_RE = re.compile(b'|'.join(re.escape(char.encode('utf-8'))
+                                     for char in ' \t\r,.?!，。、；：？！…」』）》'))
+
+# Rows written between two progress reports by the streaming Excel writer
+DEFAULT_EXCEL_WRITE_BATCH = 10000
+
+# Rows read, converted and appended at a time by the CSV conversion
+DEFAULT_CSV_CHUNK_ROWS = 50000
+
+# Bytes at the start of a CSV file looked at for its line ending and quoting
+_CSV_SNIFF_BYTES = 64 * 1024
+
+# Excel conversion engines: 'auto' uses the shared-strings rewrite for .xlsx and pandas otherwise
+EXCEL_ENGINES = ['auto', 'pandas', 'sharedstrings']
+
+# Summary counts copied into the job record of a conversion
+_RECORDED_COUNTS = ('rows', 'chars', 'paragraphs', 'shared_strings', 'inline_strings', 'skipped_cells', 'strings')
+
+_COLUMN_LETTERS_RE = re.compile(r'^[A-Za-z]{1,3}$')
+
+
+def detect_file_type(file_path):
+    """Detect file type ('excel', 'csv', 'arrow', 'json', 'word', 'text' or 'unknown') from the extension
+
+    A compression suffix is looked through ('a.csv.gz' is 'csv'); compressed
+    files without another known extension ('corpus.zst') are text.
+    """
+    file_path = Path(file_path)
+    if not compression_from_suffix(file_path):
+        return FILE_TYPES.get(file_path.suffix.lower(), 'unknown')
+    file_type = FILE_TYPES.get(Path(file_path.stem).suffix.lower(), 'text')
+    return file_type if file_type in COMPRESSED_FILE_TYPES else 'unknown'
+
+
+def default_output_path(input_path, mode_label, output_dir=None):
+    """Build '<stem>_<mode><suffix>' next to the input file or inside output_dir
+
+    A compression suffix stays last: 'a.txt.gz' becomes 'a_<mode>.txt.gz'.
+    """
+    input_path = Path(input_path)
+    parent = Path(output_dir) if output_dir else input_path.parent
+    compression_suffix = input_path.suffix if compression_from_suffix(input_path) else ''
+    stem_path = Path(input_path.stem) if compression_suffix else input_path
+    return parent / f"{stem_path.stem}_{mode_label}{stem_path.suffix}{compression_suffix}"
+
+
+def column_letter_to_index(letters):
+    """Convert an Excel column letter ('A', 'AB') to a zero-based index"""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index - 1
+
+
+def resolve_columns(available_columns, column_spec):
+    """Resolve a list of column names or Excel letters to column names"""
+    available = [str(col) for col in available_columns]
+    resolved = []
+    for item in column_spec:
+        item = str(item).strip()
+        if not item:
+            continue
+        if item in available:
+            name = available_columns[available.index(item)]
+        elif _COLUMN_LETTERS_RE.match(item):
+            index = column_letter_to_index(item)
+            if index >= len(available_columns):
+                raise ValueError(f"Column {item} is out of range ({len(available_columns)} columns)")
+            name = available_columns[index]
+        else:
+            raise ValueError(f"Unknown column: {item}")
+        if name not in resolved:
+            resolved.append(name)
+    return resolved
+
+
+def _read_docx_paragraphs(file_path, char_limit):
+    """Read body paragraphs of a .docx until char_limit characters are collected
+
+    Streams word/document.xml instead of building the whole python-docx model.
+    Returns (text, complete).
+    """
+    import zipfile
+    import xml.etree.ElementTree as ET
+
+    w = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+    paragraphs = []
+    current = []
+    chars = 0
+    with zipfile.ZipFile(file_path) as package:
+        with package.open('word/document.xml') as part:
+            for event, element in ET.iterparse(part, events=('start', 'end')):
+                if event == 'start':
+                    if element.tag == w + 'p':
+                        current = []
+                    continue
+                if element.tag == w + 't':
+                    current.append(element.text or '')
+                elif element.tag == w + 'tab':
+                    current.append('\t')
+                elif element.tag in (w + 'br', w + 'cr'):
+                    current.append('\n')
+                elif element.tag == w + 'p':
+                    text = ''.join(current)
+                    paragraphs.append(text)
+                    chars += len(text) + 1
+                    element.clear()
+                    if chars >= char_limit:
+                        return '\n'.join(paragraphs), False
+    return '\n'.join(paragraphs), True
+
+
+def load_preview_data(file_path, file_type=None, row_limit=10, text_limit=1000):
+    """Load only the part of a file the preview shows
+
+    Table files return the first row_limit rows as a DataFrame (JSON records
+    flattened to one column per key path), Word and text files return about
+    text_limit characters. Returns (data, complete) where
+    complete tells whether the whole file content was read.
+    """
+    file_type = file_type or detect_file_type(file_path)
+    with job('load', file_type=file_type, bytes_in=os.path.getsize(file_path)):
+        if file_type == 'excel':
+            import pandas as pd
+            # One extra row tells whether anything was left out
+            data = pd.read_excel(file_path, nrows=row_limit + 1)
+            record(rows=min(len(data), row_limit))
+            return data.head(row_limit), len(data) <= row_limit
+        if file_type == 'csv':
+            import pandas as pd
+            with open_file(file_path) as f:
+                data = pd.read_csv(f, nrows=row_limit + 1, **_csv_read_options(file_path))
+            record(rows=min(len(data), row_limit))
+            return data.head(row_limit), len(data) <= row_limit
+        if file_type == 'arrow':
+            from arrow_engine import read_preview
+            data = read_preview(file_path, row_limit)
+            record(rows=min(len(data), row_limit))
+            return data.head(row_limit), len(data) <= row_limit
+        if file_type == 'json':
+            from json_engine import read_preview
+            data = read_preview(file_path, row_limit)
+            record(rows=min(len(data), row_limit))
+            return data.head(row_limit), len(data) <= row_limit
+        if file_type == 'word':
+            return _read_docx_paragraphs(file_path, text_limit)
+        if file_type == 'text':
+            with open_file(file_path, 'r', encoding='utf-8') as f:
+                text = f.read(text_limit + 1)
+            return text[:text_limit], len(text) <= text_limit
+    raise ValueError(f"Unsupported file type: {file_path}")
+
+
+def _report(progress, done, total, message, unit=None):
+    """Forward progress to the callback when one is given (unit: progress_channel.UNIT_*)"""
+    if progress:
+        if unit:
+            progress(done, total, message, unit=unit)
+        else:
+            progress(done, total, message)
+
+
+def _assign_converted(data, mask, col, converted):
+    """Write converted strings back into the masked cells of a column"""
+    if len(converted):
+        data.loc[mask, col] = converted
+
+
+def _skipped_cells(series, mask):
+    """Number of non-missing cells the pre-filter kept away from the converter"""
+    return int(series.notna().sum() - mask.sum())
+
+
+def _convert_column_values(series, converter, memo=None, conversion_mode=None, convert_func=None):
+    """Convert the distinct values of a series once each and map them back in order"""
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(series.astype(str))
+    converted = convert_unique(converter, [str(value) for value in uniques], memo, conversion_mode,
+                               convert_func)
+    return np.asarray(converted, dtype=object)[codes], len(uniques)
+
+
+def convert_dataframe(data, columns, converter, progress=None, workers=None, conversion_mode=None,
+                      memo=None):
+    """Return a copy of the DataFrame with the given columns converted
+
+    Only the distinct values of each column that contain a character the mode
+    could rewrite are converted (see char_filter); numbers, dates and other
+    cells are left as they are, and their count is stored in
+    attrs['skipped_cells'] of the result. When workers is set
+    (0 meaning all cores) and the conversion mode is known, the distinct cells of
+    all selected columns are converted together in a process pool. A memo
+    (batch_convert.ConversionMemo) reuses results across columns and files.
+    Selected categorical columns come back as object columns.
+    """
+    import pandas as pd
+
+    converted_data = data.copy()
+    for col in columns:
+        if col not in converted_data.columns:
+            raise ValueError(f"Column not found: {col}")
+        if isinstance(converted_data[col].dtype, pd.CategoricalDtype):
+            # Converted values are new categories (and may merge two): convert them as plain objects
+            converted_data[col] = converted_data[col].astype(object)
+
+    with span('filter'):
+        masks = {col: rewritable_mask(converted_data[col], conversion_mode) for col in columns}
+    skipped = sum(_skipped_cells(converted_data[col], masks[col]) for col in columns)
+    logger.debug(f"Pre-filter: {skipped} cells cannot change and are skipped")
+
+    if workers is not None and conversion_mode:
+        _convert_dataframe_parallel(converted_data, columns, masks, conversion_mode, workers, progress, memo)
+        converted_data.attrs['skipped_cells'] = skipped
+        return converted_data
+
+    total_rows = len(converted_data)
+    total_operations = max(total_rows * len(columns), 1)
+    current_operation = 0
+
+    for i, col in enumerate(columns):
+        # Convert the distinct rewritable values of the column
+        mask = masks[col]
+        converted, unique_count = _convert_column_values(
+            converted_data.loc[mask, col], converter, memo, conversion_mode)
+        _assign_converted(converted_data, mask, col, converted)
+        logger.debug(f"Column '{col}': {int(mask.sum())} cells, {unique_count} distinct values")
+
+        current_operation += total_rows
+        progress_percentage = int(current_operation / total_operations * 100)
+        _report(progress, current_operation, total_operations,
+                f"正在转换列 '{col}' ({i + 1}/{len(columns)}) ({progress_percentage}%)")
+    converted_data.attrs['skipped_cells'] = skipped
+    return converted_data
+
+
+def _convert_dataframe_parallel(converted_data, columns, masks, conversion_mode, workers, progress, memo):
+    """Convert the distinct selected cells of all columns across worker processes"""
+    import pandas as pd
+    from parallel_convert import convert_values_parallel
+
+    texts = pd.concat([converted_data.loc[masks[col], col].astype(str) for col in columns],
+                      ignore_index=True)
+
+    def convert_in_pool(items):
+        return convert_values_parallel(items, conversion_mode, workers=workers, progress=progress,
+                                       message=f"正在并行转换 {len(columns)} 列")
+
+    converted, unique_count = _convert_column_values(texts, None, memo, conversion_mode, convert_in_pool)
+    logger.debug(f"Parallel columns: {len(texts)} cells, {unique_count} distinct values")
+
+    # Reassemble in the same column order the texts were collected in
+    offset = 0
+    for col in columns:
+        count = int(masks[col].sum())
+        _assign_converted(converted_data, masks[col], col, converted[offset:offset + count])
+        offset += count
+
+
+def iter_dataframe_rows(data, batch_rows=DEFAULT_EXCEL_WRITE_BATCH):
+    """Yield DataFrame rows as lists, with missing values as None, one batch at a time"""
+    for start in range(0, len(data), batch_rows):
+        batch = data.iloc[start:start + batch_rows].astype(object)
+        batch = batch.where(batch.notna(), None)
+        for row in batch.itertuples(index=False, name=None):
+            yield list(row)
+
+
+def write_excel_streaming(output_path, columns, rows, total_rows=None, progress=None,
+                          batch_rows=DEFAULT_EXCEL_WRITE_BATCH, sheet_name='Sheet1'):
+    """Write a header and an iterator of rows with openpyxl write-only mode (constant memory)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(columns))
+
+    written = 0
+    for row in rows:
+        sheet.append(row)
+        written += 1
+        if written % batch_rows == 0:
+            _report(progress, written, total_rows or written, f"{ui.PROGRESS_SAVING_FILE} {written}/{total_rows or '?'}")
+
+    workbook.save(output_path)
+    _report(progress, written, total_rows or written, f"{ui.PROGRESS_SAVING_FILE} {written}/{total_rows or written}")
+    return written
+
+
+def select_excel_engine(input_path, excel_engine='auto'):
+    """Pick 'sharedstrings' (zip-level .xlsx rewrite) or 'pandas' for an Excel file"""
+    if excel_engine not in EXCEL_ENGINES:
+        raise ValueError(f"Unknown Excel engine: {excel_engine}")
+    is_xlsx = Path(input_path).suffix.lower() == '.xlsx'
+    if excel_engine == 'sharedstrings' and not is_xlsx:
+        raise ValueError(f"The sharedstrings engine only reads .xlsx files: {input_path}")
+    if excel_engine == 'auto':
+        return 'sharedstrings' if is_xlsx else 'pandas'
+    return excel_engine
+
+
+def supports_workers(input_path, file_type=None, excel_engine='auto'):
+    """Whether convert_file spreads the conversion of this file over worker processes
+
+    Only uncompressed text files and Excel files read by the pandas engine use
+    workers; the other engines convert in one process.
+    """
+    file_type = file_type or detect_file_type(input_path)
+    if file_type == 'excel':
+        return select_excel_engine(input_path, excel_engine) == 'pandas'
+    return file_type == 'text' and not detect_compression(input_path)
+
+
+def convert_excel_file(input_path, output_path, converter, columns=None, progress=None, data=None,
+                       workers=None, conversion_mode=None, memo=None, excel_engine='auto'):
+    """Convert the selected columns of an Excel file (all columns when none are given)
+
+    .xlsx files go through xlsx_engine by default, which rewrites the shared
+    strings and keeps formatting and all sheets; excel_engine='pandas' forces the
+    DataFrame round trip (the only choice for .xls, and the one using workers).
+    """
+    if select_excel_engine(input_path, excel_engine) == 'sharedstrings':
+        from xlsx_engine import convert_xlsx_file
+        return convert_xlsx_file(input_path, output_path, converter, columns, progress, conversion_mode, memo)
+
+    import pandas as pd
+
+    if data is None:
+        with span('load'):
+            data = pd.read_excel(input_path)
+    if not isinstance(data, pd.DataFrame):
+        raise ValueError(ui.PREVIEW_INVALID_EXCEL)
+    columns = list(data.columns) if columns is None else resolve_columns(list(data.columns), columns)
+    if not columns:
+        raise ValueError(ui.WARNING_NO_COLUMN_MSG)
+
+    with span('convert'):
+        converted_data = convert_dataframe(data, columns, converter, progress, workers, conversion_mode, memo)
+    with span('save'):
+        write_excel_streaming(output_path, converted_data.columns, iter_dataframe_rows(converted_data),
+                              len(converted_data), progress)
+    return {'rows': len(converted_data), 'columns': [str(col) for col in columns],
+            'skipped_cells': converted_data.attrs.get('skipped_cells', 0)}
+
+
+def csv_separator(file_path):
+    """Field separator of a delimited file: tab for .tsv, comma otherwise"""
+    return '\t' if strip_compression_suffix(file_path).suffix.lower() == '.tsv' else ','
+
+
+def _csv_read_options(file_path):
+    """read_csv options keeping every field as the exact text of the file"""
+    return {'sep': csv_separator(file_path), 'dtype': str, 'keep_default_na': False, 'encoding': 'utf-8-sig'}
+
+
+def _csv_write_options(head, separator):
+    """to_csv options repeating the line ending and quoting of a file, sniffed from its first bytes
+
+    Lines end with CRLF when the first line does. Every field is quoted when
+    every header field is, otherwise only the fields that need it.
+    """
+    end = head.find(b'\n')
+    line_terminator = '\r\n' if end > 0 and head[end - 1:end] == b'\r' else '\n'
+    first_line = head[:end if end >= 0 else len(head)].rstrip(b'\r').decode('utf-8-sig', errors='replace')
+    fields = next(csv.reader([first_line], delimiter=separator), [])
+    all_quoted = bool(fields) and first_line == separator.join(
+        '"' + field.replace('"', '""') + '"' for field in fields)
+    return {'lineterminator': line_terminator, 'quoting': csv.QUOTE_ALL if all_quoted else csv.QUOTE_MINIMAL}
+
+
+def convert_csv_file(input_path, output_path, converter, columns=None, progress=None, conversion_mode=None,
+                     memo=None, chunk_rows=DEFAULT_CSV_CHUNK_ROWS):
+    """Convert the selected columns of a CSV/TSV file chunk by chunk (all columns when none are given)
+
+    Every field is read as text, so numbers and dates keep their exact text.
+    The line ending (LF or CRLF) and the quoting style (all fields or only
+    where needed) of the file are kept; quoting is otherwise normalized, so a
+    quoted empty field ("") is written as an empty one. An empty file gives an
+    empty output. Memory is bounded by one chunk; values repeated across
+    chunks are converted once through the memo (a file-local one when none is
+    given). Progress counts rows, its percentage comes from the read position
+    in the file.
+    """
+    import pandas as pd
+
+    total_bytes = max(os.path.getsize(input_path), 1)
+    separator = csv_separator(input_path)
+    if memo is None:
+        memo = ConversionMemo()
+    rows = 0
+    skipped = 0
+    _report(progress, 0, total_bytes, ui.PROGRESS_CONVERTING_CSV_FILE.format(0), UNIT_BYTES)
+
+    with open_file(input_path) as src:
+        # Keep a byte order mark if the file had one (Excel looks for it)
+        head = src.peek(_CSV_SNIFF_BYTES)[:_CSV_SNIFF_BYTES]
+        encoding = 'utf-8-sig' if head[:3] == b'\xef\xbb\xbf' else 'utf-8'
+        write_options = _csv_write_options(head, separator)
+        try:
+            reader = pd.read_csv(src, chunksize=chunk_rows, **_csv_read_options(input_path))
+        except pd.errors.EmptyDataError:
+            # No header line at all: nothing to convert
+            with open_file(output_path, 'w', encoding=encoding, newline=''):
+                pass
+            _report(progress, total_bytes, total_bytes, ui.PROGRESS_CONVERTING_CSV_FILE.format(0), UNIT_BYTES)
+            return {'rows': 0, 'columns': [], 'skipped_cells': 0}
+        with open_file(output_path, 'w', encoding=encoding, newline='') as dst:
+            first = True
+            while True:
+                with span('read'):
+                    chunk = next(reader, None)
+                if chunk is None:
+                    break
+                if first:
+                    available = list(chunk.columns)
+                    columns = available if columns is None else resolve_columns(available, columns)
+                    if not columns:
+                        raise ValueError(ui.WARNING_NO_COLUMN_MSG)
+                with span('convert'):
+                    converted = convert_dataframe(chunk, columns, converter, conversion_mode=conversion_mode, memo=memo)
+                with span('write'):
+                    converted.to_csv(dst, sep=separator, index=False, header=first, **write_options)
+                first = False
+                rows += len(converted)
+                skipped += converted.attrs.get('skipped_cells', 0)
+                _report(progress, min(input_position(src), total_bytes), total_bytes,
+                        ui.PROGRESS_CONVERTING_CSV_FILE.format(rows), UNIT_BYTES)
+    return {'rows': rows, 'columns': [str(col) for col in columns], 'skipped_cells': skipped}
+
+
+def convert_word_file(input_path, output_path, converter, progress=None, conversion_mode=None, memo=None):
+    """Convert the text of a Word document, keeping runs and formatting (see docx_engine)"""
+    from docx_engine import convert_docx_file
+
+    return convert_docx_file(input_path, output_path, converter, progress, conversion_mode, memo)
+
+
+def _safe_cut(data, chunk_bytes):
+    """End of the first chunk of newline-free data
+
+    Right after the last separator within its final chunk_bytes, else before
+    its last UTF-8 character.
+    """
+    tail_start = max(len(data) - chunk_bytes, 0)
+    cut = 0
+    for match in _CUT_AFTER_RE.finditer(data, tail_start):
+        cut = match.end()
+    if cut:
+        return cut
+    # Before the lead byte of the last (possibly incomplete) UTF-8 character
+    cut = len(data) - 1
+    while cut > 0 and data[cut] & 0xC0 == 0x80:
+        cut -= 1
+    return cut or len(data)
+
+
+def iter_line_chunks(stream, chunk_bytes=DEFAULT_TEXT_CHUNK_BYTES):
+    """Yield byte chunks of roughly chunk_bytes from a binary stream, each ending at a newline
+
+    A newline byte never occurs inside a multi-byte UTF-8 sequence and no OpenCC
+    dictionary entry spans a line break, so chunks decode and convert independently.
+    A line longer than a few chunks (a minified export) is cut after a
+    separator such as a space or a full stop, or failing that between two
+    characters, so memory stays bounded by a few chunks.
+    """
+    pending = []
+    pending_size = 0
+    while True:
+        block = stream.read(chunk_bytes)
+        if not block:
+            break
+        pending.append(block)
+        pending_size += len(block)
+        cut = block.rfind(b'\n') + 1
+        if cut:
+            cut += pending_size - len(block)
+        elif pending_size < chunk_bytes * _MAX_PENDING_CHUNKS:
+            # No line break yet, keep reading until the line ends
+            continue
+        data = b''.join(pending)
+        if not cut:
+            cut = _safe_cut(data, chunk_bytes)
+        pending = [data[cut:]] if cut < len(data) else []
+        pending_size = len(data) - cut
+        yield data[:cut]
+    if pending:
+        yield b''.join(pending)
+
+
+def convert_text_file(input_path, output_path, converter, progress=None, chunk_bytes=DEFAULT_TEXT_CHUNK_BYTES,
+                      workers=None, conversion_mode=None):
+    """Convert a UTF-8 text file in line-aligned chunks with constant memory
+
+    Line endings are kept byte for byte, so the output is identical to converting
+    the whole file content in one call. When workers is set, uncompressed files
+    larger than one chunk are converted in a process pool instead.
+    """
+    total_bytes = os.path.getsize(input_path)
+    if (workers is not None and conversion_mode and total_bytes > chunk_bytes
+            and not detect_compression(input_path) and not compression_from_suffix(output_path)):
+        # Imported lazily so the process pool machinery is only loaded when used
+        from parallel_convert import convert_text_file_parallel
+        _report(progress, 0, total_bytes, ui.PROGRESS_CONVERTING_TEXT_FILE, UNIT_BYTES)
+        with span('convert'):
+            chars = convert_text_file_parallel(input_path, output_path, conversion_mode, workers,
+                                               chunk_bytes, progress, ui.PROGRESS_CONVERTING_TEXT_FILE)
+        if chars is not None:
+            return {'chars': chars, 'bytes_in': total_bytes}
+    chars = 0
+    _report(progress, 0, total_bytes, ui.PROGRESS_CONVERTING_TEXT_FILE, UNIT_BYTES)
+
+    with open_file(input_path, 'rb') as src, open_file(output_path, 'wb') as dst:
+        chunks = iter_line_chunks(src, chunk_bytes)
+        while True:
+            with span('read'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            text = chunk.decode('utf-8')
+            with span('convert'):
+                converted = converter.convert(text)
+            with span('write'):
+                dst.write(converted.encode('utf-8'))
+            chars += len(text)
+            done_bytes = min(input_position(src), total_bytes)
+            _report(progress, done_bytes, total_bytes,
+                    f"{ui.PROGRESS_CONVERTING_TEXT_FILE} {done_bytes / 1048576:.1f}/{total_bytes / 1048576:.1f} MB",
+                    UNIT_BYTES)
+    return {'chars': chars, 'bytes_in': total_bytes}
+
+
+@contextmanager
+def _partial_output(output_path):
+    """Yield a temporary path next to output_path that replaces it once the block succeeds
+
+    The input is read while the output is written, so writing straight to the
+    output would truncate an input converted in place. A failed conversion
+    removes the temporary file and leaves any existing output untouched. The
+    temporary name ends with the output's name so its suffixes (compression,
+    file type) still apply.
+    """
+    output_path = Path(output_path)
+    partial_path = output_path.with_name(f".partial-{uuid.uuid4().hex[:8]}-{output_path.name}")
+    try:
+        yield partial_path
+        os.replace(partial_path, output_path)
+    finally:
+        if partial_path.exists():
+            partial_path.unlink()
+
+
+def convert_file(input_path, output_path, conversion_mode=None, columns=None, progress=None,
+                 file_type=None, converter=None, data=None, workers=None, memo=None, excel_engine='auto'):
+    """Convert one file, dispatching on its type; returns a summary dictionary
+
+    workers enables multi-process conversion of Excel columns and large text files
+    (0 means all cores);
+    memo is an optional batch_convert.ConversionMemo shared between files;
+    excel_engine is one of EXCEL_ENGINES.
+    The output is written to a temporary file that replaces output_path at the
+    end, so output_path may be the input itself.
+    """
+    file_type = file_type or detect_file_type(input_path)
+    with job('convert', mode=conversion_mode, file_type=file_type, bytes_in=os.path.getsize(input_path)):
+        if converter is None:
+            if not conversion_mode:
+                raise ValueError(ui.WARNING_NO_CONVERTER_MSG)
+            converter = get_converter(conversion_mode)
+
+        with _partial_output(output_path) as partial_path:
+            if file_type == 'excel':
+                summary = convert_excel_file(input_path, partial_path, converter, columns, progress, data,
+                                             workers, conversion_mode, memo, excel_engine)
+            elif file_type == 'csv':
+                summary = convert_csv_file(input_path, partial_path, converter, columns, progress, conversion_mode,
+                                           memo)
+            elif file_type == 'arrow':
+                from arrow_engine import convert_arrow_file
+                summary = convert_arrow_file(input_path, partial_path, converter, columns, progress,
+                                             conversion_mode, memo)
+            elif file_type == 'json':
+                from json_engine import convert_json_file
+                summary = convert_json_file(input_path, partial_path, converter, columns, progress,
+                                            conversion_mode, memo)
+            elif file_type == 'word':
+                summary = convert_word_file(input_path, partial_path, converter, progress, conversion_mode, memo)
+            elif file_type == 'text':
+                summary = convert_text_file(input_path, partial_path, converter, progress,
+                                            workers=workers, conversion_mode=conversion_mode)
+            else:
+                raise ValueError(f"Unsupported file type: {input_path}")
+
+        summary.update({
+            'input': str(input_path),
+            'output': str(output_path),
+            'file_type': file_type,
+            'mode': conversion_mode,
+        })
+        _report(progress, 1, 1, ui.PROGRESS_COMPLETED)
+        logger.info(f"Converted {input_path} -> {output_path} ({file_type}, {conversion_mode})")
+        if memo is not None:
+            memo_stats = memo.stats()
+            summary['memo'] = memo_stats
+            logger.info(f"Conversion memo: {memo_stats['hits']} hits, {memo_stats['misses']} misses "
+                        f"({memo_stats['hit_rate']:.1%} hit rate, {memo_stats['size']} entries)")
+            record(memo_hit_rate=round(memo_stats['hit_rate'], 4))
+        record(bytes_out=os.path.getsize(output_path),
+               converter_cache_hit_rate=round(get_converter_cache().stats()['hit_rate'], 4),
+               **{key: summary[key] for key in _RECORDED_COUNTS if key in summary})
+    return summary
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Converter cache for OpenCC GUI - Chinese Text Conversion Tool
+Process-wide registry of OpenCC converters keyed by conversion mode
+"""
+
+import threading
+from collections import OrderedDict
+
+# Import UI strings
+import ui_strings as ui
+
+# Import logger and stage timing
+from app_logger import get_logger, timed
+
+# Prefix of conversion specs served by the trie engine
+from trie_converter import TRIE_SPEC_PREFIX
+
+# Initialize logger
+logger = get_logger()
+
+# Maximum number of converters kept alive at once
+DEFAULT_MAX_SIZE = 8
+
+# Modes loaded eagerly at startup (the ones switched between most often)
+DEFAULT_WARMUP_MODES = [
+    ui.CONVERSION_MODE_S2TW,
+    ui.CONVERSION_MODE_S2HK,
+    ui.CONVERSION_MODE_S2TWP,
+]
+
+
+@timed('converter_init')
+def _create_opencc(conversion_mode):
+    """Build a new converter for the given mode, or a TrieConverter for a trie spec"""
+    if conversion_mode.startswith(TRIE_SPEC_PREFIX):
+        from trie_converter import TrieConverter
+        return TrieConverter.from_spec(conversion_mode)
+    from opencc import OpenCC
+    return OpenCC(conversion_mode)
+
+
+class ConverterCache:
+    """LRU cache of converter instances keyed by conversion mode string"""
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, factory=_create_opencc):
+        self.max_size = max_size
+        self.factory = factory
+        self._converters = OrderedDict()
+        self._lock = threading.Lock()
+        # Per-mode locks so a slow dictionary load never blocks lookups of other modes
+        self._mode_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, conversion_mode):
+        """Return the converter for a mode, building it on first use"""
+        with self._lock:
+            converter = self._lookup(conversion_mode)
+            if converter is not None:
+                self.hits += 1
+                return converter
+            mode_lock = self._mode_locks.setdefault(conversion_mode, threading.Lock())
+
+        with mode_lock:
+            # Another thread may have finished building it while we waited
+            with self._lock:
+                converter = self._lookup(conversion_mode)
+                if converter is not None:
+                    self.hits += 1
+                    return converter
+                self.misses += 1
+
+            converter = self.factory(conversion_mode)
+            logger.debug(f"Converter built: {conversion_mode}")
+
+            with self._lock:
+                self._converters[conversion_mode] = converter
+                self._converters.move_to_end(conversion_mode)
+                while len(self._converters) > self.max_size:
+                    evicted_mode, _ = self._converters.popitem(last=False)
+                    self.evictions += 1
+                    logger.debug(f"Converter evicted: {evicted_mode}")
+            return converter
+
+    def _lookup(self, conversion_mode):
+        """Return a cached converter and mark it as recently used (lock must be held)"""
+        converter = self._converters.get(conversion_mode)
+        if converter is not None:
+            self._converters.move_to_end(conversion_mode)
+        return converter
+
+    def warm_up(self, modes=None):
+        """Build converters for the given modes ahead of first use"""
+        for conversion_mode in (DEFAULT_WARMUP_MODES if modes is None else modes):
+            try:
+                self.get(conversion_mode)
+            except Exception as e:
+                logger.error(f"Converter warm-up error ({conversion_mode}): {e}")
+
+    def stats(self):
+        """Return cache counters as a dictionary"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._converters),
+                'max_size': self.max_size,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'modes': list(self._converters.keys()),
+            }
+
+    def clear(self):
+        """Drop all cached converters and reset counters"""
+        with self._lock:
+            self._converters.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+# Process-wide registry
+_converter_cache = ConverterCache()
+
+
+def get_converter(conversion_mode):
+    """Return the shared converter for a conversion mode"""
+    return _converter_cache.get(conversion_mode)
+
+
+def warm_up_converters(modes=None, background=False):
+    """Eagerly build converters, optionally in a daemon thread"""
+    if not background:
+        _converter_cache.warm_up(modes)
+        return None
+    thread = threading.Thread(target=_converter_cache.warm_up, args=(modes,), daemon=True)
+    thread.start()
+    return thread
+
+
+def get_converter_cache():
+    """Return the process-wide converter cache"""
+    return _converter_cache
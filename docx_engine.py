@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DOCX engine for OpenCC GUI - Chinese Text Conversion Tool
+Converts the w:t text nodes of a .docx package in a streaming pass, paragraph
+by paragraph, keeping runs and their formatting; every other member is copied
+"""
+
+import re
+import zipfile
+
+# Import UI strings
+import ui_strings as ui
+
+# Import logger and stage timing
+from app_logger import get_logger, span
+
+# Import batched conversion
+from batch_convert import DEFAULT_BATCH_BYTES
+
+# Import OOXML streaming helpers
+from ooxml_stream import (iter_xml_tokens, unescape_text, escape_text, convert_runs,
+                          copy_member, open_member_for_write)
+
+# Import progress units
+from progress_channel import UNIT_BYTES
+
+# Initialize logger
+logger = get_logger()
+
+# Package parts that hold document text
+TEXT_PART_RE = re.compile(r'^word/(?:document|header\d*|footer\d*|footnotes|endnotes|comments)\.xml$')
+
+# Paragraph boundaries and text nodes; w:pPr, w:tab, w:tbl... are not matched
+_TOKEN_RE = re.compile(r'<w:t\b[^>]*?/>|<w:t\b[^>]*>.*?</w:t>|<w:p\b[^>]*?/>|<w:p\b[^>]*>|</w:p>', re.S)
+_START_RE = re.compile(r'<w:[tp][\s>/]|</w:p')
+
+
+class _ParagraphWriter:
+    """Writes a part in order while the text of closed paragraphs is collected into batches
+
+    Paragraphs may nest (text boxes); each paragraph is converted as one group
+    of runs, and output is only released once no paragraph is open.
+    """
+
+    def __init__(self, target, converter, memo, conversion_mode, on_flush=None, batch_bytes=DEFAULT_BATCH_BYTES):
+        self.target = target
+        self.converter = converter
+        self.memo = memo
+        self.conversion_mode = conversion_mode
+        self.on_flush = on_flush
+        self.batch_bytes = batch_bytes
+        self.segments = []
+        self.groups = []
+        self.raw = []
+        self.open_paragraphs = []
+        self.pending_size = 0
+        self.paragraphs = 0
+
+    def write(self, text):
+        """Queue markup that is copied unchanged"""
+        if self.segments or self.open_paragraphs:
+            self.segments.append(text)
+        else:
+            self.target.write(text.encode('utf-8'))
+
+    def open_paragraph(self):
+        """Start collecting the runs of a (possibly nested) paragraph"""
+        self.open_paragraphs.append(self._new_group())
+
+    def close_paragraph(self):
+        """Finish the innermost paragraph; flush once the batch is full and no paragraph is open"""
+        if self.open_paragraphs:
+            self.open_paragraphs.pop()
+            self.paragraphs += 1
+        if not self.open_paragraphs and self.pending_size >= self.batch_bytes:
+            self.flush()
+
+    def write_text(self, raw):
+        """Queue the escaped content of a w:t node of the current paragraph"""
+        group = self.open_paragraphs[-1] if self.open_paragraphs else self._new_group()
+        self.segments.append((group, len(self.groups[group])))
+        self.groups[group].append(unescape_text(raw))
+        self.raw[group].append(raw)
+        self.pending_size += len(raw)
+
+    def _new_group(self):
+        self.groups.append([])
+        self.raw.append([])
+        return len(self.groups) - 1
+
+    def flush(self):
+        """Convert the collected paragraphs and write everything queued so far"""
+        if not self.segments:
+            return
+        converted = convert_runs(self.groups, self.converter, self.memo, self.conversion_mode)
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, tuple):
+                group, index = segment
+                text = converted[group][index]
+                parts.append(escape_text(text) if text != self.groups[group][index] else self.raw[group][index])
+            else:
+                parts.append(segment)
+        self.target.write(''.join(parts).encode('utf-8'))
+        self.segments, self.groups, self.raw, self.pending_size = [], [], [], 0
+        if self.on_flush:
+            self.on_flush()
+
+
+def _rewrite_part(package, info, target_zip, converter, memo, conversion_mode, on_flush):
+    """Stream one text-bearing part through a _ParagraphWriter; returns the paragraph count"""
+    with package.open(info) as stream, open_member_for_write(target_zip, info) as target:
+        writer = _ParagraphWriter(target, converter, memo, conversion_mode,
+                                  on_flush=lambda: on_flush(stream.tell()))
+        for match, text in iter_xml_tokens(stream, _TOKEN_RE, _START_RE):
+            if match is None:
+                writer.write(text)
+            elif text.startswith('<w:t'):
+                if text.endswith('/>'):
+                    writer.write(text)
+                    continue
+                content_start = text.index('>') + 1
+                writer.write(text[:content_start])
+                writer.write_text(text[content_start:-len('</w:t>')])
+                writer.write('</w:t>')
+            elif text.startswith('</'):
+                writer.close_paragraph()
+                writer.write(text)
+            else:
+                writer.write(text)
+                if not text.endswith('/>'):
+                    writer.open_paragraph()
+        writer.flush()
+        on_flush(info.file_size)
+    return writer.paragraphs
+
+
+def convert_docx_file(input_path, output_path, converter, progress=None, conversion_mode=None, memo=None):
+    """Convert the body, headers, footers, footnotes, endnotes and comments of a .docx
+
+    Memory stays bounded by one batch of paragraphs, whatever the document size.
+    """
+    with zipfile.ZipFile(input_path) as package:
+        text_parts = [info for info in package.infolist() if TEXT_PART_RE.match(info.filename)]
+        if not any(info.filename == 'word/document.xml' for info in text_parts):
+            raise ValueError(f"Not a Word document: {input_path}")
+        total_bytes = max(sum(info.file_size for info in text_parts), 1)
+        done_bytes = 0
+        paragraphs = 0
+
+        def report(part_bytes):
+            if progress:
+                done = min(done_bytes + part_bytes, total_bytes)
+                progress(done, total_bytes,
+                         f"{ui.PROGRESS_CONVERTING_FILE} {done / 1048576:.1f}/{total_bytes / 1048576:.1f} MB",
+                         unit=UNIT_BYTES)
+
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as target_zip:
+            for info in package.infolist():
+                if TEXT_PART_RE.match(info.filename):
+                    with span('convert'):
+                        paragraphs += _rewrite_part(package, info, target_zip, converter, memo,
+                                                    conversion_mode, report)
+                    done_bytes += info.file_size
+                else:
+                    with span('copy'):
+                        copy_member(package, info, target_zip)
+
+    logger.debug(f"DOCX engine: {paragraphs} paragraphs in {len(text_parts)} parts")
+    return {'paragraphs': paragraphs, 'parts': len(text_parts)}
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental preview for OpenCC GUI - Chinese Text Conversion Tool
+Re-converts only changed lines of the direct text and patches the preview widget
+"""
+
+# Import batched conversion and the per-string memo
+from batch_convert import ConversionMemo, convert_unique
+
+# Maximum number of converted lines remembered between keystrokes
+DEFAULT_LINE_CACHE_SIZE = 50000
+
+
+class IncrementalPreview:
+    """Converts text line by line, reusing results for lines seen before"""
+
+    def __init__(self, max_entries=DEFAULT_LINE_CACHE_SIZE):
+        self.memo = ConversionMemo(max_entries)
+
+    def convert_lines(self, converter, conversion_mode, text):
+        """Return the converted lines of text; only unseen lines reach the converter"""
+        return convert_unique(converter, text.split('\n'), self.memo, conversion_mode)
+
+    def clear(self):
+        """Forget all cached lines"""
+        self.memo.clear()
+
+
+def diff_lines(old_lines, new_lines):
+    """Find the block of lines that differs between two versions
+
+    Returns (start, old_end, replacement): old_lines[start:old_end] must be
+    replaced by replacement to obtain new_lines, or None when nothing changed.
+    """
+    if old_lines == new_lines:
+        return None
+    limit = min(len(old_lines), len(new_lines))
+    start = 0
+    while start < limit and old_lines[start] == new_lines[start]:
+        start += 1
+    old_end = len(old_lines)
+    new_end = len(new_lines)
+    while old_end > start and new_end > start and old_lines[old_end - 1] == new_lines[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    return start, old_end, new_lines[start:new_end]
+
+
+def apply_line_patch(widget, patch, old_count):
+    """Apply a diff_lines patch to a Text widget holding '\\n'.join(old_lines)
+
+    old_count is the number of lines currently shown. Only the affected range
+    of the widget is deleted and re-inserted.
+    """
+    start, old_end, replacement = patch
+    if start == old_count:
+        # Lines appended after the current last line
+        widget.insert("end-1c", "\n" + "\n".join(replacement))
+    elif old_end < old_count:
+        # Every replaced line is followed by a newline that goes with it
+        widget.delete(f"{start + 1}.0", f"{old_end + 1}.0")
+        if replacement:
+            widget.insert(f"{start + 1}.0", "\n".join(replacement) + "\n")
+    elif replacement or start == 0:
+        # The block runs to the end of the text, which has no trailing newline
+        widget.delete(f"{start + 1}.0", "end-1c")
+        widget.insert(f"{start + 1}.0", "\n".join(replacement))
+    else:
+        # Trailing lines were removed: drop them with the newline before them
+        widget.delete(f"{start}.end", "end-1c")
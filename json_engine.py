@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON engine for OpenCC GUI - Chinese Text Conversion Tool
+Converts the string values of JSON and JSON Lines files in a streaming pass;
+keys, numbers and every byte of formatting are copied unchanged
+"""
+
+import codecs
+import json
+import os
+import re
+
+# Import UI strings
+import ui_strings as ui
+
+# Import logger and stage timing
+from app_logger import get_logger, span
+
+# Import batched conversion
+from batch_convert import DEFAULT_BATCH_BYTES, ConversionMemo, convert_unique
+
+# Import progress units
+from progress_channel import UNIT_BYTES
+
+# Import transparent (de)compression
+from compressed_io import input_position, open_file
+
+# Initialize logger
+logger = get_logger()
+
+# Bytes read at a time (characters for the preview)
+DEFAULT_JSON_CHUNK_BYTES = 1024 * 1024
+
+# Separator of the segments of a key path, e.g. "items.title"
+KEY_PATH_SEPARATOR = '.'
+
+# Matches any key in a key path pattern
+KEY_PATH_WILDCARD = '*'
+
+# Key path of a whole record; also the preview column of records that are not objects
+JSON_ROOT = '$'
+
+# Queued segments that force a write even when few strings are pending
+_MAX_SEGMENTS = 65536
+
+# A complete string with the colon that makes it a key, or (last alternative)
+# the opening quote of a string that the buffer cuts off
+_STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"(\s*:)?|"')
+
+# The same plus the brackets, to follow the key path of each value
+_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"(\s*:)?|[{}\[\]]|"')
+
+# Only whitespace up to the end of the buffer: a colon may still follow in the next chunk
+_TRAILING_SPACE_RE = re.compile(r'\s*\Z')
+
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+
+def parse_key_paths(columns):
+    """Turn key paths ("a.b", "items.*.title", "$" for the whole record) into tuples; None selects everything"""
+    if columns is None:
+        return None
+    patterns = []
+    for column in columns:
+        column = str(column).strip()
+        if column == JSON_ROOT:
+            patterns.append(())
+        elif column:
+            if column.startswith(JSON_ROOT + KEY_PATH_SEPARATOR):
+                column = column[len(JSON_ROOT + KEY_PATH_SEPARATOR):]
+            patterns.append(tuple(column.split(KEY_PATH_SEPARATOR)))
+    return patterns
+
+
+def key_path_selected(path, patterns):
+    """Whether a value at path lies at or below one of the patterns
+
+    Arrays do not add a segment, so "items.title" selects the title of every
+    element of the items list, as json_normalize names its columns.
+    """
+    if patterns is None:
+        return True
+    for pattern in patterns:
+        if len(pattern) <= len(path) and all(
+                segment == KEY_PATH_WILDCARD or segment == key for segment, key in zip(pattern, path)):
+            return True
+    return False
+
+
+def _decode_string(token):
+    """Python string of a JSON string token"""
+    return token[1:-1] if '\\' not in token else json.loads(token)
+
+
+class _JsonWriter:
+    """Queues the output in order and converts the selected string values a batch at a time"""
+
+    def __init__(self, target, converter, memo, conversion_mode, batch_bytes=DEFAULT_BATCH_BYTES):
+        self.target = target
+        self.converter = converter
+        self.memo = memo
+        self.conversion_mode = conversion_mode
+        self.batch_bytes = batch_bytes
+        # Text to copy, or the index of a queued string value
+        self.segments = []
+        self.tokens = []
+        self.pending_size = 0
+        self.changed = 0
+
+    def write(self, text):
+        """Queue text that is copied unchanged"""
+        self.segments.append(text)
+        if len(self.segments) >= _MAX_SEGMENTS:
+            self.flush()
+
+    def write_string(self, token):
+        """Queue a selected string value (the complete token, quotes included)"""
+        self.segments.append(len(self.tokens))
+        self.tokens.append(token)
+        self.pending_size += len(token)
+        if self.pending_size >= self.batch_bytes:
+            self.flush()
+
+    def flush(self):
+        """Convert the queued strings and write everything queued so far"""
+        segments = self.segments
+        if self.tokens:
+            texts = [_decode_string(token) for token in self.tokens]
+            with span('convert'):
+                converted = convert_unique(self.converter, texts, self.memo, self.conversion_mode)
+            for index, segment in enumerate(segments):
+                if isinstance(segment, int):
+                    text = converted[segment]
+                    if text == texts[segment]:
+                        segments[index] = self.tokens[segment]
+                    else:
+                        # Files written with \u escapes keep them
+                        segments[index] = json.dumps(text, ensure_ascii='\\u' in self.tokens[segment])
+                        self.changed += 1
+        with span('write'):
+            self.target.write(''.join(segments))
+        self.segments, self.tokens, self.pending_size = [], [], 0
+
+
+def convert_json_file(input_path, output_path, converter, columns=None, progress=None, conversion_mode=None,
+                      memo=None, chunk_bytes=DEFAULT_JSON_CHUNK_BYTES):
+    """Convert the string values of a JSON or JSON Lines file
+
+    columns lists the key paths (see parse_key_paths) whose strings are
+    converted, relative to each record: a JSON Lines line, an element of a
+    top-level array, or the whole document otherwise. Keys, numbers and the
+    layout of the file are copied unchanged. Memory is bounded by one chunk of
+    the file plus one batch of strings, whatever the file size; values repeated
+    across batches are converted once through the memo (a file-local one when
+    none is given).
+    """
+    if memo is None:
+        memo = ConversionMemo()
+    patterns = parse_key_paths(columns)
+    if patterns is not None and not patterns:
+        raise ValueError(ui.WARNING_NO_COLUMN_MSG)
+    # Brackets only matter when values are selected by key path
+    token_re = _STRING_RE if patterns is None else _TOKEN_RE
+    selection = _KeyPathSelection(patterns)
+    total_bytes = max(os.path.getsize(input_path), 1)
+    strings = 0
+    _report(progress, 0, total_bytes, 0)
+
+    with open_file(input_path) as src:
+        # Keep a byte order mark if the file had one
+        encoding = 'utf-8-sig' if src.peek(3)[:3] == _UTF8_BOM else 'utf-8'
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        with open_file(output_path, 'w', encoding=encoding, newline='') as dst:
+            writer = _JsonWriter(dst, converter, memo, conversion_mode)
+            buffer = ''
+            while True:
+                with span('read'):
+                    block = src.read(chunk_bytes)
+                final = not block
+                buffer += decoder.decode(block, final=final)
+                # Text up to copied is queued, tokens up to position are handled
+                copied = position = 0
+                for match in token_re.finditer(buffer):
+                    token = match.group(0)
+                    if token[0] == '"':
+                        if token == '"' or match.group(1) is None and _TRAILING_SPACE_RE.match(buffer, match.end()):
+                            # Cut off, or a colon may follow in the next chunk
+                            if not final:
+                                break
+                            if token == '"':
+                                raise ValueError(f"Invalid JSON in {input_path}: unterminated string")
+                        if match.group(1) is not None:
+                            if patterns is not None:
+                                selection.key(_decode_string(token[:match.start(1) - match.start()]))
+                        else:
+                            strings += 1
+                            if selection.value_selected():
+                                writer.write(buffer[copied:match.start()])
+                                writer.write_string(token)
+                                copied = match.end()
+                    elif token == '{' or token == '[':
+                        selection.open(token == '{')
+                    elif not selection.close():
+                        raise ValueError(f"Invalid JSON in {input_path}: unexpected '{token}'")
+                    position = match.end()
+                if final:
+                    writer.write(buffer[copied:])
+                    break
+                writer.write(buffer[copied:position])
+                buffer = buffer[position:]
+                _report(progress, min(input_position(src), total_bytes), total_bytes, strings)
+            writer.flush()
+    if selection.stack:
+        raise ValueError(f"Invalid JSON in {input_path}: unexpected end of file")
+    _report(progress, total_bytes, total_bytes, strings)
+    logger.debug(f"JSON engine: {strings} string values, {writer.changed} changed")
+    return {'strings': strings, 'changed_strings': writer.changed,
+            'columns': None if columns is None else [str(col) for col in columns]}
+
+
+class _KeyPathSelection:
+    """Follows the key path of the current value through the open objects and arrays"""
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+        # Each open container: [is object, its key path, current key, whether the current value is selected]
+        self.stack = []
+        self.cache = {}
+
+    def selected(self, path):
+        result = self.cache.get(path)
+        if result is None:
+            result = self.cache[path] = key_path_selected(path, self.patterns)
+        return result
+
+    def open(self, is_object):
+        if self.stack:
+            parent_is_object, parent_path, key, _ = self.stack[-1]
+            path = parent_path + (key,) if parent_is_object else parent_path
+        else:
+            path = ()
+        self.stack.append([is_object, path, None, not is_object and self.selected(path)])
+
+    def close(self):
+        if not self.stack:
+            return False
+        self.stack.pop()
+        return True
+
+    def key(self, key):
+        frame = self.stack[-1]
+        frame[2] = key
+        frame[3] = self.selected(frame[1] + (key,))
+
+    def value_selected(self):
+        if self.patterns is None:
+            return True
+        return self.stack[-1][3] if self.stack else self.selected(())
+
+
+def _report(progress, done, total, strings):
+    if progress:
+        progress(done, total, ui.PROGRESS_CONVERTING_JSON_FILE.format(strings), unit=UNIT_BYTES)
+
+
+def read_records(file_path, limit):
+    """Read up to limit records: JSON Lines lines, elements of a top-level array, or the document
+
+    Only as much of the file as the records need is read; each one is decoded
+    with JSONDecoder.raw_decode.
+    """
+    decoder = json.JSONDecoder()
+    records = []
+    with open_file(file_path, 'r', encoding='utf-8-sig') as f:
+        buffer = f.read(DEFAULT_JSON_CHUNK_BYTES)
+        eof = not buffer
+        position = _skip_separators(buffer, 0, False)
+        in_array = buffer[position:position + 1] == '['
+        if in_array:
+            position += 1
+        while len(records) < limit:
+            position = _skip_separators(buffer, position, in_array)
+            if position >= len(buffer) and eof or in_array and buffer[position:position + 1] == ']':
+                break
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = len(buffer)
+            if end == len(buffer) and not eof:
+                # The value may go on (or a number be cut off) in the next block
+                block = f.read(DEFAULT_JSON_CHUNK_BYTES)
+                eof = not block
+                buffer = buffer[position:] + block
+                position = 0
+                continue
+            records.append(value)
+            position = end
+    return records
+
+
+def _skip_separators(buffer, position, in_array):
+    """Skip whitespace, and the commas between array elements"""
+    while position < len(buffer) and (buffer[position].isspace() or (in_array and buffer[position] == ',')):
+        position += 1
+    return position
+
+
+def read_preview(file_path, row_limit):
+    """First row_limit + 1 records as a pandas DataFrame with one column per key path
+
+    Object records are flattened with json_normalize, so the column names are
+    the key paths convert_json_file selects; other records go in a single
+    JSON_ROOT column.
+    """
+    import pandas as pd
+
+    records = read_records(file_path, row_limit + 1)
+    if records and all(isinstance(record, dict) for record in records):
+        return pd.json_normalize(records)
+    return pd.DataFrame({JSON_ROOT: [record if isinstance(record, str) else json.dumps(record, ensure_ascii=False)
+                                     for record in records]})
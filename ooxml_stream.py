@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OOXML streaming helpers for OpenCC GUI - Chinese Text Conversion Tool
+Incremental tokenizing of XML parts inside .xlsx/.docx packages, so text can be
+rewritten while every other byte is copied unchanged
+"""
+
+import codecs
+import html
+import shutil
+import zipfile
+from xml.sax.saxutils import escape
+
+# Import batched conversion
+from batch_convert import convert_unique
+
+# Characters decoded per read from a package part
+DEFAULT_XML_CHUNK_CHARS = 1024 * 1024
+
+# Copy buffer for zip members that are not rewritten
+COPY_BUFFER_BYTES = 1024 * 1024
+
+
+def iter_xml_tokens(stream, token_re, start_re, chunk_chars=DEFAULT_XML_CHUNK_CHARS):
+    """Split a UTF-8 XML byte stream into passthrough text and complete tokens
+
+    token_re matches the complete elements of interest (they must not nest);
+    start_re matches the beginning of such an element so an element cut by a
+    chunk boundary is kept for the next round. Yields (None, text) for text to
+    copy and (match, text) for each token.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    while True:
+        block = stream.read(chunk_chars)
+        final = not block
+        buffer += decoder.decode(block, final=final)
+        position = 0
+        for match in token_re.finditer(buffer):
+            if match.start() > position:
+                yield None, buffer[position:match.start()]
+            yield match, match.group(0)
+            position = match.end()
+        if final:
+            if position < len(buffer):
+                yield None, buffer[position:]
+            return
+        # Keep whatever could still become a token once more data arrives
+        pending = start_re.search(buffer, position)
+        keep_from = pending.start() if pending else max(buffer.rfind('<', position), position)
+        if keep_from > position:
+            yield None, buffer[position:keep_from]
+        buffer = buffer[keep_from:]
+
+
+def iter_xml_blocks(stream, boundary, chunk_chars=DEFAULT_XML_CHUNK_CHARS):
+    """Split a UTF-8 XML byte stream into text blocks that each end right before boundary
+
+    With boundary the start of a repeated element (e.g. '<row'), everything inside
+    one such element stays within a single block and can be matched with a regex.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    while True:
+        block = stream.read(chunk_chars)
+        final = not block
+        buffer += decoder.decode(block, final=final)
+        if final:
+            if buffer:
+                yield buffer
+            return
+        cut = buffer.rfind(boundary)
+        if cut > 0:
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+
+
+def unescape_text(text):
+    """Decode XML character and entity references"""
+    return html.unescape(text) if '&' in text else text
+
+
+def escape_text(text):
+    """Encode text for use inside an XML element"""
+    return escape(text)
+
+
+def split_like(pieces, converted):
+    """Split converted text back into runs of the original piece lengths
+
+    Returns None when the conversion changed the total length, in which case
+    the caller must convert the pieces one by one.
+    """
+    if len(converted) != sum(len(piece) for piece in pieces):
+        return None
+    result = []
+    offset = 0
+    for piece in pieces:
+        result.append(converted[offset:offset + len(piece)])
+        offset += len(piece)
+    return result
+
+
+def convert_runs(groups, converter, memo=None, conversion_mode=None):
+    """Convert groups of text runs (a paragraph or rich-text string each)
+
+    Each group is converted as one text so words split across runs still match
+    the dictionaries; the result is cut back into the original runs. Groups
+    whose length changes are converted run by run instead.
+    """
+    converted_joined = convert_unique(converter, [''.join(runs) for runs in groups], memo, conversion_mode)
+    results = []
+    fallback = []
+    for i, runs in enumerate(groups):
+        split = split_like(runs, converted_joined[i]) if len(runs) > 1 else [converted_joined[i]]
+        if split is None:
+            fallback.append(i)
+        results.append(split)
+    if fallback:
+        runs = [run for i in fallback for run in groups[i]]
+        converted_runs = iter(convert_unique(converter, runs, memo, conversion_mode))
+        for i in fallback:
+            results[i] = [next(converted_runs) for _ in groups[i]]
+    return results
+
+
+def copy_member(source_zip, info, target_zip):
+    """Copy one zip member with constant memory, keeping its name, date and compression"""
+    if info.is_dir():
+        target_zip.writestr(_clone_info(info), b'')
+        return
+    with source_zip.open(info) as src, target_zip.open(_clone_info(info), 'w', force_zip64=_needs_zip64(info)) as dst:
+        shutil.copyfileobj(src, dst, COPY_BUFFER_BYTES)
+
+
+def open_member_for_write(target_zip, info):
+    """Open a writer for a rewritten zip member with the original metadata"""
+    return target_zip.open(_clone_info(info), 'w', force_zip64=_needs_zip64(info))
+
+
+def _clone_info(info):
+    """Copy the metadata of a source zip entry for the output package"""
+    clone = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    clone.compress_type = info.compress_type
+    clone.external_attr = info.external_attr
+    clone.comment = info.comment
+    return clone
+
+
+def _needs_zip64(info):
+    """Only large members get ZIP64 headers, which some older readers reject"""
+    return info.file_size > zipfile.ZIP64_LIMIT // 2
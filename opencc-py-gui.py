@@ -8,9 +8,11 @@ Supports Excel, Word, and Text files with column selection
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import pandas as pd
+import importlib.util
 import os
+import sys
 import threading
+import multiprocessing
 from pathlib import Path
 import ctypes
 import logging
@@ -18,38 +20,76 @@ import logging
 # Import UI strings
 import ui_strings as ui
 
-# Import logger
-from app_logger import get_logger
+# Import logger and job records
+from app_logger import get_logger, job
+
+# Import converter registry
+from converter_cache import get_converter, get_converter_cache, warm_up_converters
+from trie_converter import base_mode, make_spec
+
+# Import UI-free conversion engine
+import conversion_engine
+from compressed_io import compression_from_suffix, strip_compression_suffix
+from batch_convert import convert_batch, get_session_memo
+
+# Import background task runner
+from background_tasks import BackgroundTasks
+
+# Import incremental direct-text preview
+from incremental_preview import IncrementalPreview, diff_lines, apply_line_patch
+
+# Import column preview rendering
+from table_preview import VirtualTable, comparison_rows, format_table_preview
+
+# Import progress reporting shared with the conversion workers
+from progress_channel import DEFAULT_POLL_INTERVAL_MS, ProgressChannel, format_snapshot, percentage
 
 # Initialize logger
 logger = get_logger()
 
-# Flag to track if required modules are available
-modules_available = True
+# Heavy modules (OpenCC, pandas, openpyxl) are imported on first use; at start-up
+# only their presence is checked, which does not import them
+FILE_TYPE_MODULES = {
+    'excel': [('pandas', ui.ERROR_IMPORT_PANDAS_MSG), ('openpyxl', ui.ERROR_IMPORT_OPENPYXL_MSG)],
+    'csv': [('pandas', ui.ERROR_IMPORT_PANDAS_MSG)],
+    'arrow': [('pyarrow', ui.ERROR_IMPORT_PYARROW_MSG), ('pandas', ui.ERROR_IMPORT_PANDAS_MSG)],
+    'json': [('pandas', ui.ERROR_IMPORT_PANDAS_MSG)],
+}
+
+# Modules needed by compressed files beyond those of their file type
+COMPRESSION_MODULES = {
+    'zstd': [('zstandard', ui.ERROR_IMPORT_ZSTANDARD_MSG)],
+}
+
+
+def module_available(name):
+    """Whether a module can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
 
-try:
-    from opencc import OpenCC
-except ImportError as e:
-    logger.error(f"OpenCC import error: {e}")
-    modules_available = False
 
-try:
-    from openpyxl import load_workbook
-except ImportError as e:
-    logger.error(f"openpyxl import error: {e}")
-    modules_available = False
+def missing_module_message(file_type, compression=None):
+    """Install hint for the first module a file type (and compression) needs that is missing, or None"""
+    for name, message in FILE_TYPE_MODULES.get(file_type, []) + COMPRESSION_MODULES.get(compression, []):
+        if not module_available(name):
+            logger.error(f"{name} is not installed")
+            return message
+    return None
 
-try:
-    from docx import Document
-except ImportError as e:
-    logger.error(f"python-docx import error: {e}")
-    modules_available = False
+
+def is_dataframe(data):
+    """isinstance(data, pandas.DataFrame) without importing pandas"""
+    pandas = sys.modules.get('pandas')
+    return pandas is not None and isinstance(data, pandas.DataFrame)
 
 
 class OpenCCGUI:
     def __init__(self, root):
         # Check if required modules are available
-        if not modules_available:
+        if not module_available('opencc'):
+            logger.error("OpenCC is not installed")
             messagebox.showerror(ui.ERROR_IMPORT_OPENCC, ui.ERROR_IMPORT_OPENCC_MSG)
             root.destroy()
             return
@@ -66,20 +106,28 @@ class OpenCCGUI:
         self.target_type = tk.StringVar(value=ui.TYPE_TRADITIONAL)
         self.variant_standard = tk.StringVar(value=ui.VARIANT_TW)
         self.convert_phrases = tk.BooleanVar(value=True)
+        self.parallel_conversion = tk.BooleanVar(value=False)
+        self.glossary_files = []
+        self.glossary_label_var = tk.StringVar(value=ui.GLOSSARY_NONE)
         self.file_type = tk.StringVar()
         self.direct_text_input = tk.StringVar()
         
         # Configuration variables for preview limits
         self.preview_text_limit = tk.IntVar(value=1000)  # Default: 1000 characters
         self.preview_row_limit = tk.IntVar(value=10)      # Default: 10 rows
+        self.preview_debounce_ms = tk.IntVar(value=300)   # Idle delay before previewing typed text
+        self.preview_table_view = tk.BooleanVar(value=False)  # Column previews as an original/converted table
         
-        # Data storage
+        # Data storage (only the preview slice of the file; see load_file_data)
         self.file_data = None
+        self.file_data_complete = False
         self.selected_columns = []
         self.column_vars = {}
         
-        # OpenCC converter
+        # OpenCC converter (shared instance from the converter cache)
         self.converter = None
+        self.converter_mode = None
+        self.window_mapped = False
         
         # Auto-preview tracking
         self.last_conversion_settings = ""
@@ -89,12 +137,28 @@ class OpenCCGUI:
         # Progress tracking for direct text conversion
         self.converting_direct_text = False
         
+        # Debounced, incremental direct-text preview
+        self.direct_text_after_id = None
+        self.incremental_preview = IncrementalPreview()
+        self.preview_lines = None  # Converted lines currently shown, None if the preview shows anything else
+        
         # Undo functionality
         self.undo_stack = []
         self.redo_stack = []
         
+        # Loading and preview work runs off the Tk thread
+        self.tasks = BackgroundTasks(self.root)
+        
+        # File conversion progress: the worker writes it, a timer renders it
+        self.progress_channel = ProgressChannel()
+        self.progress_version = 0
+        self.conversion_running = False
+        
         self.setup_ui()
-        self.update_converter()
+        
+        # The converter is built in the background once the window is on screen
+        self.progress_var.set(ui.PROGRESS_LOADING_CONVERTER)
+        self.root.bind("<Map>", self._on_window_mapped, add="+")
         
         # Set up auto-preview callbacks
         self.input_file_path.trace('w', self.on_input_change)
@@ -216,6 +280,18 @@ class OpenCCGUI:
                                       command=self.on_conversion_settings_change)
         phrase_check.grid(row=1, column=2, columnspan=2, sticky=tk.W, pady=(10, 0))
         
+        # Third row: multi-process conversion for large text and .xls files
+        self.parallel_check = ttk.Checkbutton(mode_frame, text=ui.PARALLEL_LABEL, variable=self.parallel_conversion)
+        self.parallel_check.grid(row=2, column=0, columnspan=4, sticky=tk.W, pady=(10, 0))
+        
+        # Fourth row: glossaries overriding the OpenCC dictionaries
+        ttk.Label(mode_frame, text=ui.GLOSSARY_LABEL).grid(row=3, column=0, sticky=tk.W, padx=(0, 5), pady=(10, 0))
+        ttk.Label(mode_frame, textvariable=self.glossary_label_var).grid(row=3, column=1, sticky=tk.W, pady=(10, 0))
+        glossary_buttons = ttk.Frame(mode_frame)
+        glossary_buttons.grid(row=3, column=2, columnspan=2, sticky=tk.W, pady=(10, 0))
+        ttk.Button(glossary_buttons, text=ui.GLOSSARY_CHOOSE_BUTTON, command=self.choose_glossary_files).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(glossary_buttons, text=ui.GLOSSARY_CLEAR_BUTTON, command=self.clear_glossary_files).pack(side=tk.LEFT)
+        
         # Column selection section (for Excel files) - Multi-column support in left frame
         self.column_frame = ttk.LabelFrame(left_frame, text=ui.COLUMN_SELECTION_TITLE, padding="10")
         self.column_frame.grid(row=4, column=0, sticky="ew", pady=(0, 10))
@@ -241,7 +317,13 @@ class OpenCCGUI:
         ttk.Entry(preview_config_frame, textvariable=self.preview_text_limit, width=10).grid(row=0, column=1, sticky=tk.W, padx=(0, 20))
         
         ttk.Label(preview_config_frame, text=ui.PREVIEW_ROW_LIMIT_LABEL).grid(row=0, column=2, sticky=tk.W, padx=(0, 5))
-        ttk.Entry(preview_config_frame, textvariable=self.preview_row_limit, width=10).grid(row=0, column=3, sticky=tk.W)
+        ttk.Entry(preview_config_frame, textvariable=self.preview_row_limit, width=10).grid(row=0, column=3, sticky=tk.W, padx=(0, 20))
+        
+        ttk.Label(preview_config_frame, text=ui.PREVIEW_DEBOUNCE_LABEL).grid(row=0, column=4, sticky=tk.W, padx=(0, 5))
+        ttk.Entry(preview_config_frame, textvariable=self.preview_debounce_ms, width=6).grid(row=0, column=5, sticky=tk.W)
+        
+        ttk.Checkbutton(preview_config_frame, text=ui.PREVIEW_TABLE_VIEW_LABEL, variable=self.preview_table_view,
+                        command=self.auto_preview).grid(row=1, column=0, columnspan=6, sticky=tk.W, pady=(5, 0))
         
         # Scrollable checkboxes area
         checkbox_container = ttk.Frame(self.column_frame)
@@ -296,6 +378,13 @@ class OpenCCGUI:
         
         self.preview_text = scrolledtext.ScrolledText(preview_frame, height=15, wrap=tk.WORD, font=preview_font)
         self.preview_text.grid(row=0, column=0, sticky="nsew")
+        # Manual edits invalidate the line map used for incremental updates
+        self.preview_text.bind('<Key>', lambda e: setattr(self, 'preview_lines', None))
+        
+        # Table view of column previews, shown in place of the text when enabled
+        self.preview_table = VirtualTable(preview_frame)
+        self.preview_table.grid(row=0, column=0, sticky="nsew")
+        self.preview_table.grid_remove()
         
         # Copy button for direct text conversion in right frame
         copy_button_frame = ttk.Frame(preview_frame)
@@ -315,6 +404,13 @@ class OpenCCGUI:
         self.progress_bar.grid(row=1, column=0, sticky="ew", pady=(5, 0))
     
     def get_conversion_mode(self):
+        """Conversion mode for the converter cache: the OpenCC mode, or a trie spec when glossaries are set"""
+        conversion_mode = self.get_opencc_mode()
+        if conversion_mode and self.glossary_files:
+            return make_spec(conversion_mode, self.glossary_files)
+        return conversion_mode
+    
+    def get_opencc_mode(self):
         """Generate OpenCC conversion mode based on current settings"""
         source = self.source_type.get()
         target = self.target_type.get()
@@ -381,34 +477,67 @@ class OpenCCGUI:
         else:
             return ui.CONVERSION_MODE_CONVERT
     
+    def _on_window_mapped(self, event):
+        """First time the main window is shown: build the converters in the background"""
+        if event.widget is not self.root or self.window_mapped:
+            return
+        self.window_mapped = True
+        self.update_converter()
+        
+        # Load the frequently used modes in the background so switching is instant
+        warm_up_converters(background=True)
+    
     def update_converter(self):
-        """Update the OpenCC converter based on current settings"""
-        try:
-            conversion_mode = self.get_conversion_mode()
-            if conversion_mode:
-                self.converter = OpenCC(conversion_mode)
-                self.progress_var.set(f"转换器就绪: {conversion_mode}")
-            else:
-                self.converter = None
-                self.progress_var.set("无需转换（相同格式）")
-        except Exception as e:
-            messagebox.showerror(ui.ERROR_CONVERTER_INIT, ui.ERROR_CONVERTER_INIT_MSG.format(str(e)))
-            logger.error(f"Converter initialization error: {e}")
+        """Update the OpenCC converter based on current settings
+        
+        Converters already in the cache are used at once; others are built on a
+        background thread and the preview refreshes when they are ready.
+        """
+        conversion_mode = self.get_conversion_mode()
+        if conversion_mode and conversion_mode == self.converter_mode and self.converter:
+            # Same mode as before, nothing to rebuild
+            return
+        self.tasks.cancel('converter')
+        self.converter = None
+        self.converter_mode = None
+        if not conversion_mode:
+            self.progress_var.set("无需转换（相同格式）")
+            return
+        if conversion_mode in get_converter_cache().stats()['modes']:
+            self._on_converter_ready(conversion_mode, get_converter(conversion_mode), refresh=False)
+            return
+        self.progress_var.set(ui.PROGRESS_LOADING_CONVERTER)
+        self.tasks.submit(
+            'converter', get_converter, conversion_mode,
+            on_success=lambda converter: self._on_converter_ready(conversion_mode, converter),
+            on_error=self._on_converter_error)
+    
+    def _on_converter_ready(self, conversion_mode, converter, refresh=True):
+        """Use a converter built for the current settings"""
+        self.converter = converter
+        self.converter_mode = conversion_mode
+        self.progress_var.set(f"转换器就绪: {base_mode(conversion_mode)}")
+        logger.debug(f"Converter cache stats: {get_converter_cache().stats()}")
+        if refresh:
+            self.auto_preview()
+    
+    def _on_converter_error(self, error):
+        """Report a converter that could not be built"""
+        messagebox.showerror(ui.ERROR_CONVERTER_INIT, ui.ERROR_CONVERTER_INIT_MSG.format(str(error)))
+        logger.error(f"Converter initialization error: {error}")
     
     def on_conversion_settings_change(self, *args):
         """Handle conversion settings change"""
-        self.update_converter()
-        self.update_output_filename()  # Update filename when settings change
-        self.auto_preview()
+        # The variable traces usually handled this change already; on_conversion_change
+        # skips the work when the settings are unchanged
+        self.on_conversion_change()
     
     def update_output_filename(self):
         """Update output filename based on current conversion settings"""
         input_path = self.input_file_path.get()
         if input_path:
-            input_path_obj = Path(input_path)
             conversion_mode = self.get_conversion_mode_for_filename()
-            output_name = f"{input_path_obj.stem}_{conversion_mode}{input_path_obj.suffix}"
-            output_path = input_path_obj.parent / output_name
+            output_path = conversion_engine.default_output_path(input_path, conversion_mode)
             self.output_file_path.set(str(output_path))
     
     def on_conversion_mode_change(self):
@@ -422,19 +551,52 @@ class OpenCCGUI:
     
     def on_conversion_change(self, *args):
         """Handle conversion mode change from trace"""
-        current_settings = f"{self.source_type.get()}-{self.target_type.get()}-{self.variant_standard.get()}-{self.convert_phrases.get()}"
+        current_settings = f"{self.source_type.get()}-{self.target_type.get()}-{self.variant_standard.get()}-{self.convert_phrases.get()}-{self.glossary_files}"
         if current_settings != self.last_conversion_settings:
             self.last_conversion_settings = current_settings
             self.update_converter()
             self.update_output_filename()  # Update filename when settings change
             self.auto_preview()
     
+    def choose_glossary_files(self):
+        """Pick glossary files whose terms override the OpenCC dictionaries"""
+        file_paths = filedialog.askopenfilenames(
+            title=ui.GLOSSARY_DIALOG_TITLE,
+            filetypes=[("Text files", "*.txt;*.tsv"), ("All files", "*.*")]
+        )
+        if file_paths:
+            self._set_glossary_files(list(file_paths))
+    
+    def clear_glossary_files(self):
+        """Go back to the plain OpenCC dictionaries"""
+        self._set_glossary_files([])
+    
+    def _set_glossary_files(self, file_paths):
+        """Apply a new glossary selection and rebuild the converter"""
+        self.glossary_files = file_paths
+        if file_paths:
+            self.glossary_label_var.set(", ".join(os.path.basename(path) for path in file_paths))
+        else:
+            self.glossary_label_var.set(ui.GLOSSARY_NONE)
+        self.on_conversion_change()
+    
     def on_direct_text_change(self, *args):
         """Handle direct text input change from trace"""
         self.auto_preview()
     
     def on_direct_text_change_event(self, event):
-        """Handle direct text input change from event"""
+        """Handle direct text input change from event (debounced)"""
+        if self.direct_text_after_id is not None:
+            self.root.after_cancel(self.direct_text_after_id)
+        try:
+            delay = max(int(self.preview_debounce_ms.get()), 0)
+        except (tk.TclError, ValueError):
+            delay = 300
+        self.direct_text_after_id = self.root.after(delay, self._on_direct_text_idle)
+    
+    def _on_direct_text_idle(self):
+        """Preview the direct text once typing has paused"""
+        self.direct_text_after_id = None
         self.auto_preview()
     
     def on_column_selection_change(self, *args):
@@ -462,10 +624,16 @@ class OpenCCGUI:
         file_path = filedialog.askopenfilename(
             title="Select input file",
             filetypes=[
-                ("All supported", "*.xlsx;*.xls;*.docx;*.txt"),
+                ("All supported",
+                 "*.xlsx;*.xls;*.csv;*.tsv;*.parquet;*.parq;*.feather;*.arrow;*.json;*.jsonl;*.ndjson;*.docx;*.txt;"
+                 "*.gz;*.bz2;*.xz;*.zst"),
                 ("Excel files", "*.xlsx;*.xls"),
+                ("CSV files", "*.csv;*.tsv"),
+                ("Parquet/Arrow files", "*.parquet;*.parq;*.feather;*.arrow"),
+                ("JSON files", "*.json;*.jsonl;*.ndjson"),
                 ("Word documents", "*.docx"),
                 ("Text files", "*.txt"),
+                ("Compressed text/CSV/JSON files", "*.gz;*.bz2;*.xz;*.zst"),
                 ("All files", "*.*")
             ]
         )
@@ -481,10 +649,8 @@ class OpenCCGUI:
             self.load_file_data(file_path)
             
             # Auto-suggest output file name with conversion mode
-            input_path = Path(file_path)
             conversion_mode = self.get_conversion_mode_for_filename()
-            output_name = f"{input_path.stem}_{conversion_mode}{input_path.suffix}"
-            output_path = input_path.parent / output_name
+            output_path = conversion_engine.default_output_path(file_path, conversion_mode)
             self.output_file_path.set(str(output_path))
     
     def browse_output_file(self):
@@ -494,17 +660,30 @@ class OpenCCGUI:
             messagebox.showwarning(ui.WARNING_NO_INPUT, ui.WARNING_NO_INPUT_MSG)
             return
         
-        # Determine file type for save dialog
-        file_ext = Path(input_path).suffix.lower()
+        # Determine file type for save dialog; compressed inputs suggest the same compression
+        compression_ext = Path(input_path).suffix.lower() if compression_from_suffix(input_path) else ''
+        file_ext = strip_compression_suffix(input_path).suffix.lower()
         if file_ext in ['.xlsx', '.xls']:
             filetypes = [("Excel 文件", "*.xlsx"), ("所有文件", "*.*")]
             default_ext = ".xlsx"
+        elif file_ext in ['.csv', '.tsv']:
+            filetypes = [("CSV 文件", f"*{file_ext}"), ("所有文件", "*.*")]
+            default_ext = file_ext
+        elif file_ext in ['.parquet', '.parq', '.feather', '.arrow']:
+            filetypes = [("Parquet/Arrow 文件", f"*{file_ext}"), ("所有文件", "*.*")]
+            default_ext = file_ext
+        elif file_ext in ['.json', '.jsonl', '.ndjson']:
+            filetypes = [("JSON 文件", f"*{file_ext}"), ("所有文件", "*.*")]
+            default_ext = file_ext
         elif file_ext == '.docx':
             filetypes = [("Word 文档", "*.docx"), ("所有文件", "*.*")]
             default_ext = ".docx"
         else:
             filetypes = [("文本文件", "*.txt"), ("所有文件", "*.*")]
             default_ext = ".txt"
+        if compression_ext:
+            default_ext += compression_ext
+            filetypes.insert(0, ("压缩文件", f"*{default_ext}"))
         
         file_path = filedialog.asksaveasfilename(
             title="保存转换后的文件",
@@ -518,67 +697,69 @@ class OpenCCGUI:
     def validate_file_type(self, file_path):
         """Validate that the file is of a supported type"""
         try:
-            ext = Path(file_path).suffix.lower()
-            if ext in ['.xlsx', '.xls', '.docx', '.txt']:
-                return True
-            else:
-                return False
+            return conversion_engine.detect_file_type(file_path) != 'unknown'
         except Exception as e:
             logger.error(f"File type validation error: {e}")
             return False
     
     def detect_file_type(self, file_path):
         """Detect file type based on extension"""
-        ext = Path(file_path).suffix.lower()
-        if ext in ['.xlsx', '.xls']:
-            self.file_type.set('excel')
-        elif ext == '.docx':
-            self.file_type.set('word')
-        elif ext == '.txt':
-            self.file_type.set('text')
-        else:
-            self.file_type.set('unknown')
+        self.file_type.set(conversion_engine.detect_file_type(file_path))
+        # The option only applies to the engines that use worker processes
+        try:
+            parallel = conversion_engine.supports_workers(file_path, self.file_type.get())
+        except OSError:
+            parallel = False
+        self.parallel_check.state(['!disabled'] if parallel else ['disabled'])
     
     def load_file_data(self, file_path):
-        """Load file data and update column selection if needed"""
-        try:
-            self.progress_var.set(ui.PROGRESS_LOADING_FILE)
-            
-            # Check file size to warn about large files
-            file_size = os.path.getsize(file_path)
-            if file_size > 100 * 1024 * 1024:  # 100MB
-                response = messagebox.askyesno("警告", f"文件大小为 {file_size / (1024*1024):.2f} MB，可能需要较长时间处理。是否继续？")
-                if not response:
-                    self.progress_var.set(ui.PROGRESS_READY)
-                    return
-            
-            if self.file_type.get() == 'excel':
-                # Load Excel file
-                self.file_data = pd.read_excel(file_path)
-                self.update_column_selection()
-            elif self.file_type.get() == 'word':
-                # Load Word file
-                doc = Document(file_path)
-                text = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-                self.file_data = text
-                self.clear_column_selection()
-            elif self.file_type.get() == 'text':
-                # Load text file
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    self.file_data = f.read()
-                self.clear_column_selection()
-            
-            self.progress_var.set(ui.PROGRESS_FILE_LOADED)
-        except Exception as e:
-            messagebox.showerror(ui.ERROR_FILE_LOAD, ui.ERROR_FILE_LOAD_MSG.format(str(e)))
-            self.progress_var.set(ui.PROGRESS_ERROR_LOADING_FILE)
-            logger.error(f"File load error: {e}")
+        """Load the part of the file shown in the preview in the background"""
+        missing = missing_module_message(self.file_type.get(), compression_from_suffix(file_path))
+        if missing:
+            messagebox.showerror(ui.ERROR_FILE_LOAD, missing)
+            return
+        self.progress_var.set(ui.PROGRESS_LOADING_FILE)
+        # Any preview of the previous data is stale now
+        self.tasks.cancel('preview')
+        
+        # Only read what the preview shows; the full file is read when converting
+        self.tasks.submit(
+            'load', conversion_engine.load_preview_data,
+            file_path, self.file_type.get(),
+            row_limit=self.preview_row_limit.get(),
+            text_limit=self.preview_text_limit.get(),
+            on_success=self._on_file_data_loaded,
+            on_error=self._on_file_load_error)
+    
+    def _on_file_data_loaded(self, result):
+        """Store the loaded preview slice and refresh column selection and preview"""
+        self.file_data, self.file_data_complete = result
+        if self.file_type.get() in conversion_engine.TABLE_FILE_TYPES:
+            self.update_column_selection()
+        else:
+            self.clear_column_selection()
+        self.progress_var.set(ui.PROGRESS_FILE_LOADED)
+        self.auto_preview()
+    
+    def _on_file_load_error(self, error):
+        """Report a failed background load"""
+        messagebox.showerror(ui.ERROR_FILE_LOAD, ui.ERROR_FILE_LOAD_MSG.format(str(error)))
+        self.progress_var.set(ui.PROGRESS_ERROR_LOADING_FILE)
+        logger.error(f"File load error: {error}")
+    
+    def preview_data_insufficient(self):
+        """Whether the preview limits grew beyond the loaded slice of the file"""
+        if self.file_data is None or self.file_data_complete:
+            return False
+        if isinstance(self.file_data, str):
+            return len(self.file_data) < self.preview_text_limit.get()
+        return len(self.file_data) < self.preview_row_limit.get()
     
     def update_column_selection(self):
         """Update column selection checkboxes for Excel files"""
         # Check if file_data is a DataFrame (Excel file)
         if (self.file_data is not None and
-            isinstance(self.file_data, pd.DataFrame) and
+            is_dataframe(self.file_data) and
             hasattr(self.file_data, 'columns') and
             hasattr(self.file_data, 'empty') and
             not self.file_data.empty):
@@ -711,14 +892,20 @@ class OpenCCGUI:
     
     def auto_preview(self):
         """Automatically preview conversion based on current inputs"""
+        # Whatever preview is still being computed is now stale
+        self.tasks.cancel('preview')
+        self._stop_busy_indicator()
+        
         if not self.converter:
-            self.preview_text.delete(1.0, tk.END)
-            self.preview_text.insert(tk.END, "转换器未初始化或无需转换。")
+            self._clear_preview()
+            if self.tasks.is_pending('converter') or not self.window_mapped:
+                # _on_converter_ready refreshes the preview
+                self.preview_text.insert(tk.END, ui.PROGRESS_LOADING_CONVERTER)
+            else:
+                self.preview_text.insert(tk.END, "转换器未初始化或无需转换。")
             return
         
         try:
-            self.preview_text.delete(1.0, tk.END)
-            
             # Check for direct text input first
             direct_text = self.direct_text_entry.get(1.0, tk.END).strip()
             if direct_text:
@@ -726,17 +913,19 @@ class OpenCCGUI:
                 self.progress_var.set("正在转换文本...")
                 self.progress_bar.configure(mode="indeterminate")
                 self.progress_bar.start(10)
-                self.root.update_idletasks()
                 
-                converted_text = self.converter.convert(direct_text)
-                
-                # Stop progress indication
-                self.progress_bar.stop()
-                self.progress_bar.configure(mode="determinate")
-                self.progress_var.set("文本转换完成！")
-                
-                # Only show converted result
-                self.preview_text.insert(tk.END, converted_text)
+                # Only lines not converted before reach the converter
+                self.tasks.submit('preview', self.incremental_preview.convert_lines,
+                                  self.converter, self.converter_mode, direct_text,
+                                  on_success=self._show_direct_text_preview,
+                                  on_error=self._on_preview_error)
+                return
+            
+            self._clear_preview()
+            
+            # The file is still being loaded; its callback refreshes the preview
+            if self.tasks.is_pending('load'):
+                self.preview_text.insert(tk.END, ui.PROGRESS_LOADING_FILE)
                 return
             
             # Check for file input
@@ -744,16 +933,22 @@ class OpenCCGUI:
                 self.preview_text.insert(tk.END, ui.PREVIEW_NO_INPUT)
                 return
             
+            # Preview limits were raised: load a larger slice first
+            if self.preview_data_insufficient():
+                self.load_file_data(self.input_file_path.get())
+                self.preview_text.insert(tk.END, ui.PROGRESS_LOADING_FILE)
+                return
+            
             # Check if file_data is empty DataFrame
             if (self.file_data is not None and
-                isinstance(self.file_data, pd.DataFrame) and
+                is_dataframe(self.file_data) and
                 hasattr(self.file_data, 'empty') and self.file_data.empty):
                 self.preview_text.insert(tk.END, ui.PREVIEW_EMPTY_FILE)
                 return
             
-            if self.file_type.get() == 'excel':
+            if self.file_type.get() in conversion_engine.TABLE_FILE_TYPES:
                 if (self.file_data is None or
-                    not isinstance(self.file_data, pd.DataFrame) or
+                    not is_dataframe(self.file_data) or
                     not hasattr(self.file_data, 'columns')):
                     self.preview_text.insert(tk.END, ui.PREVIEW_INVALID_EXCEL)
                     return
@@ -761,7 +956,7 @@ class OpenCCGUI:
                 selected_cols = self.get_selected_columns()
                 if not selected_cols:
                     if (hasattr(self.file_data, 'columns') and
-                        isinstance(self.file_data, pd.DataFrame)):
+                        is_dataframe(self.file_data)):
                         available_cols = ", ".join(self.file_data.columns.tolist())
                         self.preview_text.insert(tk.END, f"{ui.PREVIEW_SELECT_COLUMN}\n\n{ui.PREVIEW_AVAILABLE_COLUMNS.format(available_cols)}")
                     else:
@@ -772,73 +967,101 @@ class OpenCCGUI:
                 row_limit = self.preview_row_limit.get()
                 
                 if (hasattr(self.file_data, 'head') and
-                    isinstance(self.file_data, pd.DataFrame)):
+                    is_dataframe(self.file_data)):
                     preview_data = self.file_data.head(row_limit).copy()
                 else:
                     self.preview_text.insert(tk.END, "无效的 Excel 数据格式。")
                     return
-                    
-                # Use vectorized operations for better performance
-                for col in selected_cols:
-                    if col in preview_data.columns:
-                        preview_data[col] = preview_data[col].astype(str).apply(
-                            lambda x: self.converter.convert(x) if self.converter and pd.notna(x) and str(x) != 'nan' and str(x).strip() else x
-                        )
                 
-                # Display results for multiple columns
-                if len(selected_cols) == 1:
-                    self.preview_text.insert(tk.END, ui.PREVIEW_COLUMN_RESULT_HEADER_SINGLE.format(selected_cols[0], row_limit))
-                    self.preview_text.insert(tk.END, "=" * 40 + "\n")
-                    # Only show the converted column values
-                    if selected_cols[0] in preview_data.columns:
-                        for idx, value in preview_data[selected_cols[0]].items():
-                            self.preview_text.insert(tk.END, f"{str(value)}\n")
-                    else:
-                        self.preview_text.insert(tk.END, "所选列不存在于数据中。\n")
-                else:
-                    self.preview_text.insert(tk.END, ui.PREVIEW_COLUMN_RESULT_HEADER_MULTI.format(len(selected_cols), row_limit))
-                    self.preview_text.insert(tk.END, "=" * 50 + "\n")
-                    
-                    # Show column headers
-                    headers = " | ".join([f"{col[:15]}..." if len(col) > 15 else col for col in selected_cols])
-                    self.preview_text.insert(tk.END, f"{headers}\n")
-                    self.preview_text.insert(tk.END, "-" * 50 + "\n")
-                    
-                    # Show data rows
-                    for idx in range(min(row_limit, len(preview_data))):
-                        row_values = []
-                        for col in selected_cols:
-                            if col in preview_data.columns:
-                                try:
-                                    value = str(preview_data[col].iloc[idx])
-                                    # Truncate long values for display
-                                    if len(value) > 15:
-                                        value = value[:12] + "..."
-                                    row_values.append(value)
-                                except (IndexError, KeyError):
-                                    row_values.append("N/A")
-                            else:
-                                row_values.append("N/A")
-                        
-                        row_text = " | ".join(row_values)
-                        self.preview_text.insert(tk.END, f"{row_text}\n")
+                original_data = self.file_data.head(row_limit)
+                self.tasks.submit(
+                    'preview', self._convert_preview_columns, self.converter, preview_data, selected_cols,
+                    self.file_type.get(),
+                    on_success=lambda data: self._render_excel_preview(data, selected_cols, row_limit,
+                                                                       original_data),
+                    on_error=self._on_preview_error)
                 
             else:  # Word or Text files
                 if isinstance(self.file_data, str):
                     text_limit = self.preview_text_limit.get()
                     sample_text = self.file_data[:text_limit] if len(self.file_data) > text_limit else self.file_data
-                    converted_text = self.converter.convert(sample_text)
-                    
-                    # Only show converted result
-                    self.preview_text.insert(tk.END, ui.PREVIEW_RESULT_HEADER.format(text_limit))
-                    self.preview_text.insert(tk.END, "=" * 30 + "\n")
-                    self.preview_text.insert(tk.END, converted_text)
+                    self.tasks.submit(
+                        'preview', self.converter.convert, sample_text,
+                        on_success=lambda converted: self._render_text_preview(converted, text_limit),
+                        on_error=self._on_preview_error)
                 else:
                     self.preview_text.insert(tk.END, ui.PREVIEW_INVALID_TEXT)
         
         except Exception as e:
-            self.preview_text.insert(tk.END, f"预览错误: {str(e)}")
-            logger.error(f"Auto preview error: {e}")
+            self._on_preview_error(e)
+    
+    @staticmethod
+    def _convert_preview_columns(converter, preview_data, selected_cols, file_type='excel'):
+        """Background: convert the preview rows of the selected columns"""
+        with job('preview', file_type=file_type, rows=len(preview_data), columns=len(selected_cols)):
+            # Convert all preview cells of each column with a single batched call
+            for col in selected_cols:
+                if col in preview_data.columns:
+                    values = preview_data[col].astype(str).tolist()
+                    preview_data[col] = convert_batch(converter, values)
+        return preview_data
+    
+    def _stop_busy_indicator(self):
+        """Return the progress bar to determinate mode if a preview left it spinning"""
+        if str(self.progress_bar.cget("mode")) == "indeterminate":
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+    
+    def _clear_preview(self):
+        """Empty the preview area and show it as text"""
+        self.preview_table.grid_remove()
+        self.preview_text.grid()
+        self.preview_text.delete(1.0, tk.END)
+        self.preview_lines = None
+    
+    def _show_direct_text_preview(self, converted_lines):
+        """Show the converted direct text input, patching only the lines that changed"""
+        self._stop_busy_indicator()
+        self.progress_var.set("文本转换完成！")
+        
+        # Only show converted result
+        if self.preview_lines is None:
+            self._clear_preview()
+            self.preview_text.insert(tk.END, "\n".join(converted_lines))
+        else:
+            patch = diff_lines(self.preview_lines, converted_lines)
+            if patch:
+                apply_line_patch(self.preview_text, patch, len(self.preview_lines))
+        self.preview_lines = converted_lines
+    
+    def _render_text_preview(self, converted_text, text_limit):
+        """Show the converted beginning of a Word or text file"""
+        self._clear_preview()
+        self.preview_text.insert(tk.END, ui.PREVIEW_RESULT_HEADER.format(text_limit))
+        self.preview_text.insert(tk.END, "=" * 30 + "\n")
+        self.preview_text.insert(tk.END, converted_text)
+    
+    def _render_excel_preview(self, preview_data, selected_cols, row_limit, original_data=None):
+        """Show the converted preview rows of the selected columns
+
+        The text view is built in one piece and inserted at once; the table view
+        shows original and converted values side by side and only renders the
+        rows on screen.
+        """
+        self._clear_preview()
+        if self.preview_table_view.get() and original_data is not None:
+            self.preview_table.set_data(*comparison_rows(original_data, preview_data, selected_cols))
+            self.preview_text.grid_remove()
+            self.preview_table.grid()
+            return
+        self.preview_text.insert(tk.END, format_table_preview(preview_data, selected_cols, row_limit))
+    
+    def _on_preview_error(self, error):
+        """Show a preview failure in the preview area"""
+        self._stop_busy_indicator()
+        self._clear_preview()
+        self.preview_text.insert(tk.END, f"预览错误: {str(error)}")
+        logger.error(f"Auto preview error: {error}")
     
     def convert_file(self):
         """Convert the entire file or direct text input"""
@@ -866,7 +1089,7 @@ class OpenCCGUI:
                 self.progress_bar.stop()
                 self.progress_bar.configure(mode="determinate")
                 
-                self.preview_text.delete(1.0, tk.END)
+                self._clear_preview()
                 # Only show converted result within the text limit
                 text_limit = self.preview_text_limit.get()
                 display_text = converted_text[:text_limit] if len(converted_text) > text_limit else converted_text
@@ -894,11 +1117,27 @@ class OpenCCGUI:
             messagebox.showerror(ui.WARNING_NO_CONVERTER, ui.WARNING_NO_CONVERTER_MSG)
             return
         
+        # Check file size to warn about large files
+        try:
+            file_size = os.path.getsize(self.input_file_path.get())
+        except OSError:
+            file_size = 0
+        if file_size > 100 * 1024 * 1024:  # 100MB
+            response = messagebox.askyesno("警告", f"文件大小为 {file_size / (1024*1024):.2f} MB，可能需要较长时间处理。是否继续？")
+            if not response:
+                return
+        
         # Add to undo stack
         self.undo_stack.append(("file", self.input_file_path.get(), self.output_file_path.get()))
         self.redo_stack.clear()
         
         # Run conversion in separate thread to avoid freezing GUI
+        self.progress_bar.configure(mode="determinate", value=0)
+        self.progress_var.set(ui.PROGRESS_CONVERTING_FILE)
+        self.progress_channel.reset()
+        self.progress_version = 0
+        self.conversion_running = True
+        self.root.after(DEFAULT_POLL_INTERVAL_MS, self._poll_progress)
         thread = threading.Thread(target=self._convert_file_worker)
         thread.daemon = True
         thread.start()
@@ -906,138 +1145,74 @@ class OpenCCGUI:
     def _convert_file_worker(self):
         """Worker function for file conversion"""
         try:
-            # Update UI in main thread
-            self.root.after(0, lambda: self.progress_bar.configure(mode="determinate"))
-            self.root.after(0, lambda: self.progress_bar.configure(value=0))
-            self.root.after(0, lambda: self.progress_var.set(ui.PROGRESS_CONVERTING_FILE))
-            
-            if self.file_type.get() == 'excel':
+            columns = None
+            if self.file_type.get() in conversion_engine.TABLE_FILE_TYPES:
                 if (self.file_data is None or
-                    not isinstance(self.file_data, pd.DataFrame) or
+                    not is_dataframe(self.file_data) or
                     not hasattr(self.file_data, 'columns')):
                     self.root.after(0, lambda: messagebox.showerror(ui.WARNING_NO_CONVERTER, "无效的 Excel 数据。"))
                     return
                     
-                selected_cols = self.get_selected_columns()
-                if not selected_cols:
+                columns = self.get_selected_columns()
+                if not columns:
                     self.root.after(0, lambda: messagebox.showwarning(ui.WARNING_NO_COLUMN, ui.WARNING_NO_COLUMN_MSG))
                     return
-                
-                # Convert Excel file - multiple columns using vectorized operations
-                if (hasattr(self.file_data, 'copy') and
-                    isinstance(self.file_data, pd.DataFrame)):
-                    converted_data = self.file_data.copy()
-                else:
-                    self.root.after(0, lambda: messagebox.showerror(ui.WARNING_NO_CONVERTER, "无法复制 Excel 数据。"))
-                    return
-                    
-                total_rows = len(converted_data)
-                total_operations = total_rows * len(selected_cols)
-                current_operation = 0
-                
-                # Use vectorized operations for better performance
-                for col in selected_cols:
-                    if hasattr(converted_data, 'columns') and col in converted_data.columns:
-                        # Apply conversion to entire column at once
-                        mask = converted_data[col].notna() & (converted_data[col].astype(str) != 'nan') & (converted_data[col].astype(str).str.strip() != '')
-                        converted_data.loc[mask, col] = converted_data.loc[mask, col].astype(str).apply(
-                            lambda x: self.converter.convert(x) if self.converter else x
-                        )
-                        
-                        # Update progress for the column
-                        current_operation += total_rows
-                        progress_percentage = int(current_operation / total_operations * 100)
-                        progress_msg = f"正在转换列 '{col}' ({selected_cols.index(col)+1}/{len(selected_cols)}) ({progress_percentage}%)"
-                        self.root.after(0, lambda msg=progress_msg: self.progress_var.set(msg))
-                        self.root.after(0, lambda pct=progress_percentage: self.progress_bar.configure(value=pct))
-                
-                # Save Excel file
-                if hasattr(converted_data, 'to_excel'):
-                    converted_data.to_excel(self.output_file_path.get(), index=False)
-                else:
-                    self.root.after(0, lambda: messagebox.showerror(ui.WARNING_NO_CONVERTER, "无法保存 Excel 文件。"))
-                    return
-                
-            elif self.file_type.get() == 'word':
-                # Convert Word file
-                doc = Document(self.input_file_path.get())
-                
-                # Count total elements for progress
-                total_elements = len(doc.paragraphs)
-                for table in doc.tables:
-                    for row in table.rows:
-                        total_elements += len(row.cells)
-                
-                processed = 0
-                
-                # Convert paragraphs
-                for i, paragraph in enumerate(doc.paragraphs):
-                    if paragraph.text.strip() and self.converter:
-                        original_text = paragraph.text
-                        converted_text = self.converter.convert(original_text)
-                        # Store converted text to apply later
-                        paragraph.text = converted_text
-                    
-                    processed += 1
-                    progress_percentage = int(processed / total_elements * 100)
-                    self.root.after(0, lambda pct=progress_percentage: self.progress_bar.configure(value=pct))
-                    self.root.after(0, lambda p=processed, t=total_elements: self.progress_var.set(f"正在转换段落: {p}/{t}"))
-                
-                # Handle tables in Word document
-                for table in doc.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            if cell.text.strip() and self.converter:
-                                original_text = cell.text
-                                converted_text = self.converter.convert(original_text)
-                                # Store converted text to apply later
-                                cell.text = converted_text
-                            
-                            processed += 1
-                            progress_percentage = int(processed / total_elements * 100)
-                            self.root.after(0, lambda pct=progress_percentage: self.progress_bar.configure(value=pct))
-                            self.root.after(0, lambda p=processed, t=total_elements: self.progress_var.set(f"正在转换表格: {p}/{t}"))
-                
-                # Save document in main thread
-                self.root.after(0, lambda: doc.save(self.output_file_path.get()))
-                
             elif self.file_type.get() == 'text':
-                # Convert text file
-                if isinstance(self.file_data, str) and self.converter:
-                    self.root.after(0, lambda: self.progress_var.set(ui.PROGRESS_CONVERTING_TEXT_FILE))
-                    self.root.after(0, lambda: self.progress_bar.configure(value=50))
-                    
-                    converted_text = self.converter.convert(self.file_data)
-                    
-                    self.root.after(0, lambda: self.progress_bar.configure(value=80))
-                    self.root.after(0, lambda: self.progress_var.set(ui.PROGRESS_SAVING_FILE))
-                    
-                    with open(self.output_file_path.get(), 'w', encoding='utf-8') as f:
-                        f.write(converted_text)
-                    
-                    self.root.after(0, lambda: self.progress_bar.configure(value=100))
-                else:
+                if not isinstance(self.file_data, str):
                     self.root.after(0, lambda: messagebox.showerror(ui.WARNING_NO_CONVERTER, "无效的文本数据。"))
                     return
             
+            conversion_engine.convert_file(
+                self.input_file_path.get(),
+                self.output_file_path.get(),
+                self.converter_mode,
+                columns=columns,
+                progress=self.progress_channel.update,
+                file_type=self.file_type.get(),
+                converter=self.converter,
+                data=self.file_data if self.file_type.get() == 'excel' and self.file_data_complete else None,
+                workers=0 if self.parallel_conversion.get() and self.parallel_check.instate(['!disabled']) else None,
+                memo=get_session_memo(),
+            )
+            
             # Success
-            self.root.after(0, lambda: self.progress_bar.configure(value=100))
-            self.root.after(0, lambda: self.progress_var.set(ui.PROGRESS_COMPLETED))
+            self.root.after(0, lambda: self._finish_conversion(100, ui.PROGRESS_COMPLETED))
             self.root.after(0, lambda: messagebox.showinfo(ui.SUCCESS_CONVERSION, ui.SUCCESS_CONVERSION_MSG.format(self.output_file_path.get())))
             
         except Exception as e:
-            self.root.after(0, lambda: self.progress_bar.configure(value=0))
-            self.root.after(0, lambda: self.progress_var.set(ui.PROGRESS_FAILED))
+            self.root.after(0, lambda: self._finish_conversion(0, ui.PROGRESS_FAILED))
             self.root.after(0, lambda: messagebox.showerror(ui.ERROR_CONVERSION, ui.ERROR_CONVERSION_MSG.format(str(e))))
             logger.error(f"File conversion error: {e}")
+        finally:
+            self.conversion_running = False
+    
+    def _poll_progress(self):
+        """Render the progress recorded by the conversion worker; reschedules itself while it runs"""
+        if not self.conversion_running:
+            return
+        snapshot = self.progress_channel.snapshot()
+        if snapshot.version != self.progress_version:
+            self.progress_version = snapshot.version
+            self.progress_bar.configure(value=percentage(snapshot))
+            self.progress_var.set(format_snapshot(snapshot))
+        self.root.after(DEFAULT_POLL_INTERVAL_MS, self._poll_progress)
+    
+    def _finish_conversion(self, value, message):
+        """Show the final state once the worker is done"""
+        self.conversion_running = False
+        self.progress_bar.configure(value=value)
+        self.progress_var.set(message)
     
     def clear_all(self):
         """Clear all inputs and reset the interface"""
+        self.tasks.cancel('load')
+        self.tasks.cancel('preview')
         self.input_file_path.set("")
         self.output_file_path.set("")
         self.file_data = None
+        self.file_data_complete = False
         self.direct_text_entry.delete(1.0, tk.END)
-        self.preview_text.delete(1.0, tk.END)
+        self._clear_preview()
         self.clear_column_selection()
         # Reset column selection count display
         if hasattr(self, 'selected_count_label'):
@@ -1096,6 +1271,9 @@ class OpenCCGUI:
 
 def main():
     """Main function to run the application"""
+    # Required for the conversion process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+    
     # Hide console window on Windows (similar to nps-auto.py)
     if os.name == 'nt':  # Windows
         try:
@@ -1107,6 +1285,10 @@ def main():
     root = tk.Tk()
     app = OpenCCGUI(root)
     root.mainloop()
+    
+    # Drop loading/preview work that is still queued
+    if hasattr(app, 'tasks'):
+        app.tasks.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenCC CLI - Chinese Text Conversion Tool
+Headless batch conversion using the same engine as the GUI
+
+Examples:
+    python opencc_cli.py convert --mode s2twp --columns A,B in.xlsx -o out.xlsx
+    python opencc_cli.py convert --mode t2s "exports/*.txt" -o converted/
+    python opencc_cli.py convert --mode s2hk --recursive documents/ -o converted/
+    python opencc_cli.py convert --mode s2twp --glossary terms.txt in.docx
+    python opencc_cli.py convert --mode s2t --columns title,items.name records.jsonl
+    python opencc_cli.py convert --mode t2s corpus.txt.zst
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import conversion_engine as engine
+from batch_convert import ConversionMemo
+from compressed_io import strip_compression_suffix
+from trie_converter import make_spec
+from progress_channel import DEFAULT_POLL_INTERVAL_MS, ProgressChannel, format_snapshot, percentage
+
+# Import logger
+from app_logger import get_logger
+
+# Initialize logger
+logger = get_logger()
+
+
+def is_converted_output(file_path, mode):
+    """Whether a file is named like an output of this mode ('<stem>_<mode><suffix>')"""
+    stem = strip_compression_suffix(file_path).stem
+    return stem.endswith(f"_{mode}")
+
+
+def expand_inputs(patterns, recursive=False, mode=None, exclude_dir=None):
+    """Expand files, glob patterns and directories into a sorted list of supported files
+
+    Files found through directories and patterns are skipped when they are
+    named like an output of mode or lie inside exclude_dir (the output
+    directory), so running the same command again does not convert its own
+    outputs. Files named explicitly are always kept.
+    """
+    exclude_dir = os.path.abspath(exclude_dir) if exclude_dir else None
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            walker = Path(pattern).rglob('*') if recursive else Path(pattern).iterdir()
+            candidates = sorted(str(p) for p in walker if p.is_file())
+        elif glob.has_magic(pattern):
+            candidates = sorted(glob.glob(pattern, recursive=recursive))
+        else:
+            candidates = [pattern]
+        for candidate in candidates:
+            if os.path.isdir(candidate):
+                continue
+            if candidate != pattern and (
+                    (mode and is_converted_output(candidate, mode)) or
+                    (exclude_dir and os.path.abspath(candidate).startswith(exclude_dir + os.sep))):
+                continue
+            if engine.detect_file_type(candidate) == 'unknown':
+                if candidate == pattern:
+                    raise ValueError(f"Unsupported file type: {candidate}")
+                continue
+            if candidate not in files:
+                files.append(candidate)
+    return files
+
+
+def plan_outputs(inputs, output, mode):
+    """Pair every input with its output path
+
+    Inputs written to an output directory keep their directories relative to
+    the deepest directory they share, so same-named files from different
+    sub-directories do not overwrite each other. Raises ValueError when two
+    inputs would still be written to the same output.
+    """
+    as_directory = output is not None and (
+        len(inputs) > 1 or os.path.isdir(output) or output.endswith(('/', os.sep)))
+    if as_directory:
+        parents = [os.path.dirname(os.path.abspath(path)) for path in inputs]
+        try:
+            root = os.path.commonpath(parents)
+        except ValueError:
+            # Inputs on different drives share no directory
+            root = None
+        plan = []
+        for path, parent in zip(inputs, parents):
+            output_dir = os.path.join(output, os.path.relpath(parent, root)) if root else output
+            os.makedirs(output_dir, exist_ok=True)
+            plan.append((path, engine.default_output_path(path, mode, output_dir)))
+    elif output is not None:
+        plan = [(inputs[0], Path(output))]
+    else:
+        plan = [(path, engine.default_output_path(path, mode)) for path in inputs]
+
+    planned = {}
+    for input_path, output_path in plan:
+        key = os.path.normcase(os.path.abspath(output_path))
+        if key in planned:
+            raise ValueError(f"{planned[key]} and {input_path} would both be written to {output_path}")
+        planned[key] = input_path
+    return plan
+
+
+def make_progress_printer(interval_ms=DEFAULT_POLL_INTERVAL_MS):
+    """Progress callback that redraws a single stderr line at most every interval_ms"""
+    channel = ProgressChannel()
+    last_draw = [0.0]
+
+    def print_progress(done, total, message, unit=None):
+        channel.update(done, total, message, unit)
+        now = time.perf_counter()
+        if now - last_draw[0] >= interval_ms / 1000 or done >= total:
+            last_draw[0] = now
+            snapshot = channel.snapshot()
+            sys.stderr.write(f"\r{percentage(snapshot):3d}% {format_snapshot(snapshot)}\033[K")
+            sys.stderr.flush()
+
+    return print_progress
+
+
+def run_convert(args):
+    """Run the 'convert' command; returns the process exit code"""
+    exclude_dir = args.output if args.output and os.path.isdir(args.output) else None
+    try:
+        inputs = expand_inputs(args.inputs, args.recursive, args.mode, exclude_dir)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    if not inputs:
+        logger.error("No supported input files found")
+        return 2
+    try:
+        plan = plan_outputs(inputs, args.output, args.mode)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+
+    missing = [path for path in args.glossary or [] if not os.path.isfile(path)]
+    if missing:
+        logger.error(f"Glossary file not found: {', '.join(missing)}")
+        return 2
+    conversion_mode = args.mode
+    if args.engine == 'trie' or args.glossary:
+        conversion_mode = make_spec(args.mode, args.glossary or [])
+
+    columns = [c for c in args.columns.split(',') if c.strip()] if args.columns else None
+    memo = ConversionMemo(args.memo) if args.memo else None
+    failures = 0
+    for input_path, output_path in plan:
+        start = time.perf_counter()
+        try:
+            summary = engine.convert_file(
+                input_path, output_path, conversion_mode, columns=columns,
+                progress=None if args.quiet else make_progress_printer(), workers=args.workers,
+                memo=memo, excel_engine=args.excel_engine)
+        except Exception as e:
+            failures += 1
+            if not args.quiet:
+                sys.stderr.write("\n")
+            logger.error(f"File conversion error ({input_path}): {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        if not args.quiet:
+            sys.stderr.write("\n")
+        print(f"{summary['input']} -> {summary['output']} ({elapsed:.2f}s)")
+    return 1 if failures else 0
+
+
+def build_parser():
+    """Build the argument parser"""
+    parser = argparse.ArgumentParser(description="OpenCC batch conversion for Excel, CSV/TSV, JSON, Word and text files")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help="convert files")
+    convert_parser.add_argument('inputs', nargs='+', help="input files, glob patterns or directories")
+    convert_parser.add_argument('-m', '--mode', required=True, choices=engine.CONVERSION_MODES,
+                                help="OpenCC conversion mode")
+    convert_parser.add_argument('-o', '--output',
+                                help="output file, or output directory for several inputs "
+                                     "(default: <name>_<mode>.<ext> next to each input)")
+    convert_parser.add_argument('-c', '--columns',
+                                help="Excel or CSV/TSV columns to convert, by name or letter, e.g. A,B; "
+                                     "for JSON, key paths of the string values, e.g. title,items.name (default: all)")
+    convert_parser.add_argument('-r', '--recursive', action='store_true',
+                                help="descend into sub-directories and expand ** in patterns")
+    convert_parser.add_argument('-j', '--workers', type=int,
+                                help="convert Excel columns (pandas engine only) and large text files "
+                                     "in N worker processes (0: all cores)")
+    convert_parser.add_argument('--excel-engine', choices=engine.EXCEL_ENGINES, default='auto',
+                                help="auto: rewrite .xlsx shared strings in place, keeping formatting "
+                                     "and all sheets; pandas: read and rewrite the first sheet as a table")
+    convert_parser.add_argument('--engine', choices=['opencc', 'trie'], default='opencc',
+                                help="opencc: the OpenCC package; trie: compiled prefix tables built from "
+                                     "the same dictionaries (same output, cached on disk)")
+    convert_parser.add_argument('--glossary', action='append', metavar='FILE',
+                                help="tab-separated 'source<TAB>target' terms that override the OpenCC "
+                                     "dictionaries (repeatable; implies --engine trie)")
+    convert_parser.add_argument('--memo', type=int, metavar='ENTRIES',
+                                help="reuse converted cell values across columns and files, "
+                                     "keeping at most ENTRIES strings")
+    convert_parser.add_argument('-q', '--quiet', action='store_true', help="do not print progress")
+    convert_parser.set_defaults(func=run_convert)
+    return parser
+
+
+def main(argv=None):
+    """Main function to run the command line interface"""
+    multiprocessing.freeze_support()
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
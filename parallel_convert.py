@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parallel conversion for OpenCC GUI - Chinese Text Conversion Tool
+Shards lists of cell values, or line-aligned byte ranges of a text file,
+into chunks converted in a process pool
+"""
+
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Import logger
+from app_logger import configure_worker_logging, get_logger
+
+# Import converter registry
+from converter_cache import get_converter
+
+# Import batched conversion
+from batch_convert import convert_batch
+
+# Import progress units
+from progress_channel import UNIT_BYTES
+
+# Initialize logger
+logger = get_logger()
+
+# Number of cells sent to a worker at once
+DEFAULT_CHUNK_SIZE = 5000
+
+# Size of the line-aligned byte ranges of a text file sent to a worker at once
+DEFAULT_TEXT_RANGE_BYTES = 4 * 1024 * 1024
+
+# Converted ranges queued or held in memory per worker while waiting to be written in order
+TEXT_RANGES_IN_FLIGHT_PER_WORKER = 2
+
+# Converter of the current worker process, built once by the pool initializer
+_worker_converter = None
+
+
+def _init_worker(conversion_mode):
+    """Pool initializer: build (and cache) this worker's converter"""
+    global _worker_converter
+    configure_worker_logging()
+    _worker_converter = get_converter(conversion_mode)
+
+
+def _convert_chunk(index, texts):
+    """Convert one chunk of strings inside a worker process"""
+    return index, convert_batch(_worker_converter, texts)
+
+
+def _convert_text_range(input_path, start, end):
+    """Decode and convert bytes [start, end) of a text file inside a worker process"""
+    with open(input_path, 'rb') as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        text = data[start:end].decode('utf-8')
+    return _worker_converter.convert(text).encode('utf-8'), len(text)
+
+
+def resolve_workers(workers):
+    """Turn a worker count option into a concrete number (0 or None means all cores)"""
+    if not workers or workers < 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def convert_values_parallel(texts, conversion_mode, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                            progress=None, message="正在并行转换"):
+    """Convert a list of strings in a process pool, returning results in input order"""
+    texts = list(texts)
+    total = len(texts)
+    if total == 0:
+        return []
+
+    workers = min(resolve_workers(workers), (total + chunk_size - 1) // chunk_size)
+    if workers <= 1:
+        # Not worth the process start-up cost
+        converter = get_converter(conversion_mode)
+        results = convert_batch(converter, texts)
+        if progress:
+            progress(total, total, f"{message}: {total}/{total}")
+        return results
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    results = [None] * len(chunks)
+    done = 0
+    logger.debug(f"Parallel conversion: {total} cells, {len(chunks)} chunks, {workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(conversion_mode,)) as executor:
+        futures = [executor.submit(_convert_chunk, i, chunk) for i, chunk in enumerate(chunks)]
+        for future in as_completed(futures):
+            index, converted = future.result()
+            results[index] = converted
+            done += len(converted)
+            if progress:
+                progress(done, total, f"{message}: {done}/{total}")
+
+    return [text for chunk in results for text in chunk]
+
+
+def split_line_ranges(data, range_bytes=DEFAULT_TEXT_RANGE_BYTES):
+    """Cut a bytes-like buffer into (start, end) ranges of about range_bytes, each ending after a newline
+
+    A newline byte never occurs inside a multi-byte UTF-8 sequence and no OpenCC
+    dictionary entry spans a line break, so the ranges convert independently.
+    """
+    ranges = []
+    start = 0
+    size = len(data)
+    while start < size:
+        cut = data.find(b'\n', min(start + range_bytes, size) - 1)
+        end = size if cut < 0 else cut + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def convert_text_file_parallel(input_path, output_path, conversion_mode, workers=None,
+                               range_bytes=DEFAULT_TEXT_RANGE_BYTES, progress=None, message="正在并行转换"):
+    """Convert a UTF-8 text file in a process pool; returns the number of characters read
+
+    The input is memory-mapped and split at line breaks; each worker maps the
+    file itself and converts its own byte range, so only the converted bytes
+    travel back. Results are appended in input order with a bounded number of
+    ranges in flight, which makes the output identical to a single-threaded
+    conversion. Returns None when the file is too small to be worth a pool, in
+    which case the caller converts it serially.
+    """
+    total_bytes = os.path.getsize(input_path)
+    if total_bytes == 0:
+        return None
+    with open(input_path, 'rb') as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        ranges = split_line_ranges(data, range_bytes)
+
+    workers = min(resolve_workers(workers), len(ranges))
+    if workers <= 1:
+        return None
+
+    logger.debug(f"Parallel text conversion: {total_bytes} bytes, {len(ranges)} ranges, {workers} workers")
+    max_in_flight = workers * TEXT_RANGES_IN_FLIGHT_PER_WORKER
+    pending = deque()
+    next_range = 0
+    done_bytes = 0
+    chars = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(conversion_mode,)) as executor, open(output_path, 'wb') as dst:
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < max_in_flight:
+                start, end = ranges[next_range]
+                pending.append((end - start, executor.submit(_convert_text_range, str(input_path), start, end)))
+                next_range += 1
+            size, future = pending.popleft()
+            converted, range_chars = future.result()
+            dst.write(converted)
+            chars += range_chars
+            done_bytes += size
+            if progress:
+                progress(done_bytes, total_bytes,
+                         f"{message} {done_bytes / 1048576:.1f}/{total_bytes / 1048576:.1f} MB", unit=UNIT_BYTES)
+    return chars
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Progress channel for OpenCC GUI - Chinese Text Conversion Tool
+Conversion workers record their latest progress here; the UI reads it on a timer
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+# Import UI strings
+import ui_strings as ui
+
+# How often the UI renders progress
+DEFAULT_POLL_INTERVAL_MS = 100
+
+# Progress units reported by the engines
+UNIT_ITEMS = 'items'
+UNIT_BYTES = 'bytes'
+
+ProgressSnapshot = namedtuple('ProgressSnapshot', 'done total message unit rate eta version')
+
+
+class ProgressChannel:
+    """Latest progress of one job, written by a worker thread and polled by the UI
+
+    update() only stores values under a lock, so reporting costs next to nothing
+    however often the engine calls it. A phase starts over (for the rate and the
+    ETA) whenever the total or the unit changes or the count goes backwards.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new job"""
+        with self._lock:
+            self._done = 0
+            self._total = 0
+            self._message = ''
+            self._unit = UNIT_ITEMS
+            self._version = 0
+            self._phase_start = time.perf_counter()
+            self._phase_done = 0
+            self._updated = self._phase_start
+
+    def update(self, done, total, message='', unit=None):
+        """Record progress; usable directly as an engine progress callback"""
+        now = time.perf_counter()
+        unit = unit or UNIT_ITEMS
+        with self._lock:
+            if total != self._total or unit != self._unit or done < self._done:
+                self._phase_start = now
+                self._phase_done = done
+            self._done = done
+            self._total = total
+            self._message = message
+            self._unit = unit
+            self._updated = now
+            self._version += 1
+
+    def snapshot(self):
+        """Current progress with the phase rate (units per second) and ETA (seconds or None)"""
+        with self._lock:
+            elapsed = self._updated - self._phase_start
+            rate = (self._done - self._phase_done) / elapsed if elapsed > 0 else 0.0
+            eta = (self._total - self._done) / rate if rate > 0 and self._total >= self._done else None
+            return ProgressSnapshot(self._done, self._total, self._message, self._unit,
+                                    rate, eta, self._version)
+
+
+def format_rate(rate, unit):
+    """Human-readable throughput"""
+    if unit == UNIT_BYTES:
+        return ui.PROGRESS_RATE_BYTES.format(rate / 1048576)
+    return ui.PROGRESS_RATE_ITEMS.format(rate)
+
+
+def format_eta(seconds):
+    """Remaining time as m:ss or h:mm:ss"""
+    seconds = int(seconds + 0.5)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def format_snapshot(snapshot):
+    """One status line: message, throughput and remaining time"""
+    parts = [snapshot.message] if snapshot.message else []
+    if snapshot.rate > 0:
+        parts.append(format_rate(snapshot.rate, snapshot.unit))
+    if snapshot.eta is not None and snapshot.done < snapshot.total:
+        parts.append(ui.PROGRESS_ETA.format(format_eta(snapshot.eta)))
+    return "  ".join(parts)
+
+
+def percentage(snapshot):
+    """Completed share of the current phase, 0-100"""
+    return int(snapshot.done / snapshot.total * 100) if snapshot.total else 0
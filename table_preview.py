@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Table preview for OpenCC GUI - Chinese Text Conversion Tool
+Formats the column preview as one block of text, and shows original and
+converted rows side by side in a virtualized table
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+# Import UI strings
+import ui_strings as ui
+
+# Rows shown before the table knows its real height
+DEFAULT_VISIBLE_ROWS = 15
+
+# Rows scrolled per mouse wheel notch
+WHEEL_ROWS = 3
+
+# Longest cell text of the multi-column text preview
+_CELL_WIDTH = 15
+
+
+def _short(value):
+    """Cell text of the multi-column text preview, truncated for display"""
+    return value[:_CELL_WIDTH - 3] + "..." if len(value) > _CELL_WIDTH else value
+
+
+def format_table_preview(preview_data, selected_cols, row_limit):
+    """Text of the converted preview rows of the selected columns, built in one pass
+
+    Each column is read once with tolist() instead of cell by cell, so the
+    text of a few thousand rows takes milliseconds and is inserted into the
+    preview widget with a single call.
+    """
+    if len(selected_cols) == 1:
+        col = selected_cols[0]
+        parts = [ui.PREVIEW_COLUMN_RESULT_HEADER_SINGLE.format(col, row_limit), "=" * 40 + "\n"]
+        if col in preview_data.columns:
+            parts.extend(f"{value}\n" for value in preview_data[col].tolist())
+        else:
+            parts.append("所选列不存在于数据中。\n")
+        return ''.join(parts)
+
+    rows = min(row_limit, len(preview_data))
+    columns = []
+    for col in selected_cols:
+        if col in preview_data.columns:
+            columns.append([_short(str(value)) for value in preview_data[col].iloc[:rows].tolist()])
+        else:
+            columns.append(["N/A"] * rows)
+    names = [str(col) for col in selected_cols]
+    headers = " | ".join(f"{name[:_CELL_WIDTH]}..." if len(name) > _CELL_WIDTH else name for name in names)
+    parts = [ui.PREVIEW_COLUMN_RESULT_HEADER_MULTI.format(len(selected_cols), row_limit), "=" * 50 + "\n",
+             f"{headers}\n", "-" * 50 + "\n"]
+    parts.extend(f"{' | '.join(values)}\n" for values in zip(*columns))
+    return ''.join(parts)
+
+
+def comparison_rows(original, converted, selected_cols):
+    """Headings, row count and row getter showing each selected column before and after conversion"""
+    columns = [col for col in selected_cols if col in converted.columns and col in original.columns]
+    pairs = [(original[col], converted[col]) for col in columns]
+    headings = []
+    for col in columns:
+        headings.append(ui.PREVIEW_TABLE_ORIGINAL_HEADING.format(col))
+        headings.append(ui.PREVIEW_TABLE_CONVERTED_HEADING.format(col))
+
+    def get_row(index):
+        values = []
+        for before, after in pairs:
+            values.append(str(before.iat[index]))
+            values.append(str(after.iat[index]))
+        return values
+
+    return headings, min(len(original), len(converted)), get_row
+
+
+class VirtualTable:
+    """Treeview that shows any number of rows by refilling the items of the visible ones
+
+    Only as many tree items exist as rows fit on screen; scrolling replaces
+    their values through the row getter, so rendering costs the same for ten
+    rows or a million.
+    """
+
+    def __init__(self, parent, visible_rows=DEFAULT_VISIBLE_ROWS):
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+        self.tree = ttk.Treeview(self.frame, show='headings', selectmode='none', height=visible_rows)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self._on_scrollbar)
+        xscrollbar = ttk.Scrollbar(self.frame, orient='horizontal', command=self.tree.xview)
+        self.tree.configure(xscrollcommand=xscrollbar.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        xscrollbar.grid(row=1, column=0, sticky="ew")
+
+        self.visible_rows = visible_rows
+        self.row_count = 0
+        self.first_row = 0
+        self.get_row = None
+        self.items = []
+
+        self.tree.bind('<Configure>', self._on_resize)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.tree.bind(sequence, self._on_wheel)
+        self.tree.bind('<Prior>', lambda e: self.scroll_to(self.first_row - self.visible_rows))
+        self.tree.bind('<Next>', lambda e: self.scroll_to(self.first_row + self.visible_rows))
+        self.tree.bind('<Home>', lambda e: self.scroll_to(0))
+        self.tree.bind('<End>', lambda e: self.scroll_to(self.row_count))
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def grid_remove(self):
+        self.frame.grid_remove()
+
+    def set_data(self, headings, row_count, get_row):
+        """Show new columns and rows; get_row(index) returns the values of one row"""
+        columns = [f"c{index}" for index in range(len(headings))]
+        self.tree.delete(*self.items)
+        self.items = []
+        self.tree.configure(columns=columns)
+        for column, heading in zip(columns, headings):
+            self.tree.heading(column, text=heading, anchor=tk.W)
+            self.tree.column(column, width=140, minwidth=60, stretch=True)
+        self.row_count = row_count
+        self.get_row = get_row
+        self.first_row = 0
+        self._refresh()
+
+    def scroll_to(self, first_row):
+        """Make first_row the top visible row (clamped to the data)"""
+        first_row = max(0, min(first_row, self.row_count - self.visible_rows))
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self._refresh()
+        return 'break'
+
+    def _refresh(self):
+        """Fill the visible items from the row getter and update the scrollbar"""
+        count = max(0, min(self.visible_rows, self.row_count - self.first_row))
+        while len(self.items) < count:
+            self.items.append(self.tree.insert('', tk.END))
+        while len(self.items) > count:
+            self.tree.delete(self.items.pop())
+        for offset, item in enumerate(self.items):
+            self.tree.item(item, values=self.get_row(self.first_row + offset))
+        if self.row_count:
+            self.scrollbar.set(self.first_row / self.row_count, (self.first_row + count) / self.row_count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.row_count))
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_to(self.first_row + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            return self.scroll_to(self.first_row - WHEEL_ROWS)
+        return self.scroll_to(self.first_row + WHEEL_ROWS)
+
+    def _on_resize(self, event):
+        """Recompute how many rows fit; the headings take about one row"""
+        row_height = ttk.Style().lookup('Treeview', 'rowheight')
+        row_height = int(row_height) if str(row_height).isdigit() else 20
+        visible_rows = max(1, event.height // row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.first_row = max(0, min(self.first_row, self.row_count - visible_rows))
+            if self.get_row is not None:
+                self._refresh()
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Test setup for OpenCC GUI - Chinese Text Conversion Tool
+Makes the top-level modules importable and keeps test logs out of logs/
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app_logger import configure_logging
+
+
+@pytest.fixture(autouse=True, scope='session')
+def _test_logging():
+    configure_logging(log_file=False, console=False)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Tests for the rotating log handler"""
+
+import logging
+import os
+
+from app_logger import SizedTimedRotatingFileHandler
+
+
+def _emit(handler, count):
+    for index in range(count):
+        handler.emit(logging.LogRecord('test', logging.INFO, __file__, 0, f"record {index:04d} " + "x" * 40,
+                                       None, None))
+
+
+def test_size_rollovers_keep_the_newest_backups(tmp_path):
+    handler = SizedTimedRotatingFileHandler(str(tmp_path / 'app.log'), max_bytes=2000, backup_count=3)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    _emit(handler, 500)
+    handler.close()
+
+    backups = sorted(name for name in os.listdir(tmp_path) if name != 'app.log')
+    assert len(backups) == 3
+    first_records = [(tmp_path / name).read_text(encoding='utf-8').split()[1] for name in backups]
+    # In name order, the backups are consecutive and end right before the current file
+    assert first_records == sorted(first_records)
+    current = (tmp_path / 'app.log').read_text(encoding='utf-8').splitlines()
+    assert current[-1].split()[1] == '0499'
+    last_backup = (tmp_path / backups[-1]).read_text(encoding='utf-8').splitlines()
+    assert int(last_backup[-1].split()[1]) + 1 == int(current[0].split()[1])
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Tests for background loading and previewing"""
+
+import importlib.util
+import os
+import threading
+import time
+import tkinter as tk
+
+import pytest
+
+from background_tasks import UI_LATENCY_TARGET_MS, BackgroundTasks, measure_event_loop_lag
+
+
+class _FakeRoot:
+    """Stand-in for a Tk root: after() queues the callbacks until run_pending()"""
+
+    def __init__(self):
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def after(self, delay_ms, callback):
+        with self.lock:
+            self.callbacks.append(callback)
+
+    def run_pending(self):
+        with self.lock:
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def _wait(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_stale_results_are_dropped():
+    root = _FakeRoot()
+    tasks = BackgroundTasks(root)
+    release = threading.Event()
+    started = threading.Event()
+    delivered = []
+
+    def slow(value):
+        started.set()
+        release.wait(5)
+        return value
+
+    tasks.submit('preview', slow, 'first', on_success=delivered.append)
+    started.wait(5)
+    tasks.submit('preview', lambda: 'second', on_success=delivered.append)
+    _wait(lambda: root.callbacks)
+    release.set()
+    _wait(lambda: not tasks.is_pending('preview'))
+    time.sleep(0.05)
+    root.run_pending()
+    assert delivered == ['second']
+    tasks.shutdown()
+
+
+def test_result_stale_before_delivery_is_dropped():
+    root = _FakeRoot()
+    tasks = BackgroundTasks(root)
+    delivered = []
+    tasks.submit('load', lambda: 'data', on_success=delivered.append)
+    _wait(lambda: root.callbacks)
+    # Cancelled after the worker finished but before the Tk thread ran the callback
+    tasks.cancel('load')
+    root.run_pending()
+    assert delivered == []
+    tasks.shutdown()
+
+
+def test_errors_reach_the_error_handler():
+    root = _FakeRoot()
+    tasks = BackgroundTasks(root)
+    errors = []
+
+    def fail():
+        raise ValueError('bad file')
+
+    tasks.submit('load', fail, on_error=errors.append)
+    _wait(lambda: root.callbacks)
+    root.run_pending()
+    assert [str(error) for error in errors] == ['bad file']
+    tasks.shutdown()
+
+
+@pytest.fixture
+def tk_root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip('no display')
+    yield root
+    root.destroy()
+
+
+def _load_gui_module():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'opencc-py-gui.py')
+    spec = importlib.util.spec_from_file_location('opencc_py_gui', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_loading_a_large_file_keeps_the_ui_responsive(tk_root, tmp_path):
+    input_path = tmp_path / 'large.txt'
+    input_path.write_text('简体中文的信息网络发展，鼠标和打印机。\n' * 500000, encoding='utf-8')
+    app = _load_gui_module().OpenCCGUI(tk_root)
+    tk_root.update()
+    deadline = time.monotonic() + 30
+    while app.converter is None and time.monotonic() < deadline:
+        tk_root.update()
+        time.sleep(0.01)
+    assert app.converter is not None
+
+    def load():
+        app.input_file_path.set(str(input_path))
+        app.detect_file_type(str(input_path))
+        app.load_file_data(str(input_path))
+
+    lag_ms = measure_event_loop_lag(tk_root, load, duration_ms=3000)
+    app.tasks.shutdown()
+    assert '簡體中文的信息網絡發展' in app.preview_text.get(1.0, tk.END)
+    assert lag_ms < UI_LATENCY_TARGET_MS
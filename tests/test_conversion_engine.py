@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Tests for file conversion through conversion_engine"""
+
+import io
+import os
+
+import pytest
+
+from char_filter import rewritable_mask
+from conversion_engine import (convert_csv_file, convert_dataframe, convert_file, convert_text_file, get_converter,
+                               iter_line_chunks)
+
+
+def _convert_csv(tmp_path, data, name='input.csv', **kwargs):
+    input_path = tmp_path / name
+    output_path = tmp_path / f"output{os.path.splitext(name)[1]}"
+    input_path.write_bytes(data)
+    summary = convert_csv_file(input_path, output_path, get_converter('s2t'), **kwargs)
+    return output_path.read_bytes(), summary
+
+
+def test_csv_keeps_crlf_and_field_text(tmp_path):
+    data = '名称,数量,日期\r\n软件,007,2024-01-02\r\n"鼠标,打印机",1.50,\r\n'.encode('utf-8')
+    output, summary = _convert_csv(tmp_path, data)
+    assert output == '名称,数量,日期\r\n軟件,007,2024-01-02\r\n"鼠標,打印機",1.50,\r\n'.encode('utf-8')
+    assert summary['rows'] == 2
+
+
+def test_csv_keeps_quoting_of_every_field_and_bom(tmp_path):
+    data = '﻿"名称"\t"备注"\n"软件"\t"网络"\n'.encode('utf-8')
+    output, _ = _convert_csv(tmp_path, data, name='input.tsv')
+    assert output == '﻿"名称"\t"备注"\n"軟件"\t"網絡"\n'.encode('utf-8')
+
+
+def test_csv_selected_columns_only(tmp_path):
+    output, summary = _convert_csv(tmp_path, '名称,备注\n软件,软件\n'.encode('utf-8'), columns=['备注'])
+    assert output == '名称,备注\n软件,軟件\n'.encode('utf-8')
+    assert summary['columns'] == ['备注']
+
+
+@pytest.mark.parametrize('data', [b'', b'\n\n', b'\xef\xbb\xbf'])
+def test_empty_csv(tmp_path, data):
+    output, summary = _convert_csv(tmp_path, data)
+    assert output == b''
+    assert summary['rows'] == 0
+
+
+def test_header_only_csv(tmp_path):
+    output, summary = _convert_csv(tmp_path, '名称,备注\r\n'.encode('utf-8'))
+    assert output == '名称,备注\r\n'.encode('utf-8')
+    assert summary['rows'] == 0
+
+
+def test_convert_file_onto_its_input(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('简体中文的软件\n' * 1000, encoding='utf-8')
+    convert_file(path, path, 's2t')
+    assert path.read_text(encoding='utf-8') == '簡體中文的軟件\n' * 1000
+    assert os.listdir(tmp_path) == ['notes.txt']
+
+
+def test_failed_conversion_leaves_no_output(tmp_path):
+    input_path = tmp_path / 'input.csv'
+    input_path.write_text('名称\n软件\n', encoding='utf-8')
+    output_path = tmp_path / 'output.csv'
+    with pytest.raises(ValueError):
+        convert_file(input_path, output_path, 's2t', columns=['missing'])
+    assert os.listdir(tmp_path) == ['input.csv']
+
+
+def test_categorical_columns():
+    import pandas as pd
+
+    data = pd.DataFrame({'name': pd.Series(['软件', '网络', '软件', None], dtype='category'),
+                         'code': pd.Series([1, 2, 1, 3], dtype='category')})
+    assert rewritable_mask(data['code'], 's2t').tolist() == [False] * 4
+    converted = convert_dataframe(data, ['name', 'code'], get_converter('s2t'), conversion_mode='s2t')
+    assert converted['name'].tolist()[:3] == ['軟件', '網絡', '軟件']
+    assert pd.isna(converted['name'].iloc[3])
+    assert converted['code'].tolist() == [1, 2, 1, 3]
+    assert data['name'].dtype == 'category'
+
+
+@pytest.mark.parametrize('text', ['简体中文的信息网络发展，鼠标和打印机。' * 4000,
+                                  '头发软件内存' * 8000,
+                                  '软件 network 鼠标,' * 5000])
+def test_text_without_newlines_is_cut_into_bounded_chunks(tmp_path, text):
+    data = text.encode('utf-8')
+    chunk_bytes = 4096
+    chunks = list(iter_line_chunks(io.BytesIO(data), chunk_bytes))
+    assert b''.join(chunks) == data
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) <= 5 * chunk_bytes
+    for chunk in chunks:
+        chunk.decode('utf-8')
+
+    input_path = tmp_path / 'minified.txt'
+    output_path = tmp_path / 'output.txt'
+    input_path.write_bytes(data)
+    convert_text_file(input_path, output_path, get_converter('s2t'), chunk_bytes=chunk_bytes)
+    if '，' in text or ',' in text:
+        # Cut after separators: the same as converting the whole text at once
+        assert output_path.read_text(encoding='utf-8') == get_converter('s2t').convert(text)
+    else:
+        assert len(output_path.read_text(encoding='utf-8')) == len(text)
+
+
+def test_streamed_workbook_keeps_typed_headers(tmp_path):
+    import datetime
+
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    from conversion_engine import iter_dataframe_rows, write_excel_streaming
+
+    data = pd.DataFrame([['软件', 1, 2.5]], columns=['名称', 2024, datetime.datetime(2024, 1, 2)])
+    path = tmp_path / 'out.xlsx'
+    write_excel_streaming(path, data.columns, iter_dataframe_rows(data), len(data))
+    header = [cell.value for cell in next(load_workbook(path).active.iter_rows(max_row=1))]
+    assert header == ['名称', 2024, datetime.datetime(2024, 1, 2)]
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Tests for the streaming JSON engine"""
+
+import json
+
+import pytest
+
+from conversion_engine import get_converter
+from json_engine import convert_json_file
+
+DOCUMENT = (
+    '{"软件" : "软件", "items": [{"标题"\n:\t"打印机", "id": 1}, {"标题": "鼠标\\n网络"}],\n'
+    ' "备注":"信息" , "软件列表": ["软件", "内存"]}\n'
+)
+
+LINES = '{"名称": "软件"}\n{"名称" :"打印机", "数量": 2}\n"简体中文"\n'
+
+
+def _convert(tmp_path, text, chunk_bytes, columns=None):
+    input_path = tmp_path / 'input.json'
+    output_path = tmp_path / 'output.json'
+    input_path.write_text(text, encoding='utf-8')
+    convert_json_file(input_path, output_path, get_converter('s2t'), columns, chunk_bytes=chunk_bytes)
+    return output_path.read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('chunk_bytes', list(range(1, 24)) + [64, 1024])
+def test_keys_are_kept_at_every_chunk_size(tmp_path, chunk_bytes):
+    output = _convert(tmp_path, DOCUMENT, chunk_bytes)
+    assert json.loads(output) == {'软件': '軟件', 'items': [{'标题': '打印機', 'id': 1}, {'标题': '鼠標\n網絡'}],
+                                  '备注': '信息', '软件列表': ['軟件', '內存']}
+    # Only the string values change; the layout is copied as is
+    assert output.replace('軟', '软').replace('機', '机').replace('標', '标').replace('網絡', '网络') \
+        .replace('內', '内') == DOCUMENT
+
+
+@pytest.mark.parametrize('chunk_bytes', list(range(1, 24)) + [1024])
+def test_key_paths_at_every_chunk_size(tmp_path, chunk_bytes):
+    output = _convert(tmp_path, DOCUMENT, chunk_bytes, columns=['items.标题', '软件'])
+    assert json.loads(output) == {'软件': '軟件', 'items': [{'标题': '打印機', 'id': 1}, {'标题': '鼠標\n網絡'}],
+                                  '备注': '信息', '软件列表': ['软件', '内存']}
+
+
+@pytest.mark.parametrize('chunk_bytes', [1, 2, 5, 10, 1024])
+def test_json_lines(tmp_path, chunk_bytes):
+    output = _convert(tmp_path, LINES, chunk_bytes)
+    assert output == '{"名称": "軟件"}\n{"名称" :"打印機", "数量": 2}\n"簡體中文"\n'
+
+
+def test_unterminated_string(tmp_path):
+    with pytest.raises(ValueError):
+        _convert(tmp_path, '{"软件": "软件', 4)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Tests for the command line interface"""
+
+import os
+
+import pytest
+
+from opencc_cli import expand_inputs, main, plan_outputs
+
+
+def _tree(root, files):
+    for name, text in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+
+
+def _files(root):
+    return sorted(str(path.relative_to(root)).replace(os.sep, '/') for path in root.rglob('*') if path.is_file())
+
+
+def test_recursive_output_mirrors_sub_directories(tmp_path):
+    _tree(tmp_path / 'docs', {'a/x.txt': '软件', 'b/x.txt': '鼠标', 'top.txt': '网络'})
+    assert main(['convert', '-m', 's2t', '-q', '-r', str(tmp_path / 'docs'), '-o', str(tmp_path / 'out')]) == 0
+    assert _files(tmp_path / 'out') == ['a/x_s2t.txt', 'b/x_s2t.txt', 'top_s2t.txt']
+    assert (tmp_path / 'out' / 'b' / 'x_s2t.txt').read_text(encoding='utf-8') == '鼠標'
+
+
+def test_running_again_skips_earlier_outputs(tmp_path):
+    _tree(tmp_path, {'a.txt': '软件', 'sub/b.txt.gz': ''})
+    for _ in range(2):
+        assert main(['convert', '-m', 's2t', '-q', '-r', str(tmp_path)]) == 0
+    assert _files(tmp_path) == ['a.txt', 'a_s2t.txt', 'sub/b.txt.gz', 'sub/b_s2t.txt.gz']
+
+
+def test_output_directory_inside_the_input_is_not_walked(tmp_path):
+    _tree(tmp_path, {'a.txt': '软件'})
+    (tmp_path / 'converted').mkdir()
+    (tmp_path / 'converted' / 'old.txt').write_text('旧', encoding='utf-8')
+    assert expand_inputs([str(tmp_path)], True, 's2t', str(tmp_path / 'converted')) == [str(tmp_path / 'a.txt')]
+
+
+def test_explicit_files_are_kept(tmp_path):
+    _tree(tmp_path, {'a_s2t.txt': '软件'})
+    assert expand_inputs([str(tmp_path / 'a_s2t.txt')], mode='s2t') == [str(tmp_path / 'a_s2t.txt')]
+
+
+def test_colliding_outputs_are_refused(tmp_path):
+    _tree(tmp_path, {'x.txt': '软件'})
+    path = str(tmp_path / 'x.txt')
+    with pytest.raises(ValueError):
+        plan_outputs([path, path], str(tmp_path / 'out'), 's2t')
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Tests comparing the trie engine with OpenCC"""
+
+import os
+
+import pytest
+from opencc import OpenCC
+
+from conversion_engine import CONVERSION_MODES
+from converter_cache import ConverterCache
+from trie_converter import TrieConverter, make_spec, parse_spec, read_dictionary
+
+SAMPLES = [
+    '',
+    '简体中文的信息网络发展，鼠标和打印机。',
+    '這個軟體的記憶體不夠，滑鼠壞了，印表機也壞了。',
+    '头发干了，皇后在后面吃面，干杯！',
+    '於是她說：「我們去公園吧」——好的…',
+    'Mixed text with 中文 and numbers 123, tabs\tand\nnewlines 里程碑 計程車 出租车',
+    '乾隆年間，他發現了頭髮和鬆餅。台灣臺灣台北',
+    '🙂 emoji 和 𠮷野家 以及 繁體字：亂碼、體驗、回覆、覆蓋',
+]
+
+
+@pytest.fixture(scope='module')
+def cache_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp('trie_cache'))
+
+
+@pytest.mark.parametrize('mode', CONVERSION_MODES)
+def test_matches_opencc(mode, cache_dir):
+    reference = OpenCC(mode)
+    converter = TrieConverter(mode, cache_dir=cache_dir)
+    for text in SAMPLES:
+        assert converter.convert(text) == reference.convert(text), text
+
+
+def _write_glossary(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_glossary_overrides_the_chain(tmp_path, cache_dir):
+    glossary = _write_glossary(tmp_path / 'terms.txt',
+                               '# company names\n苹果公司\tApple Inc.\n\n打印机\t列印機\nno tab line\n')
+    converter = TrieConverter('s2twp', [glossary], cache_dir=cache_dir)
+    assert converter.convert('苹果公司的打印机和鼠标') == 'Apple Inc.的列印機和滑鼠'
+
+
+def test_read_dictionary_keeps_whole_glossary_values(tmp_path):
+    glossary = _write_glossary(tmp_path / 'terms.txt', '苹果公司\tApple Inc. \n')
+    assert read_dictionary(glossary, strict=False) == {'苹果公司': 'Apple Inc.'}
+    dictionary = _write_glossary(tmp_path / 'dict.txt', '干\t乾 幹 干\n')
+    assert read_dictionary(dictionary) == {'干': '乾'}
+
+
+def test_spec_round_trips_paths_with_separator(tmp_path):
+    glossary = _write_glossary(tmp_path / 'a|b.txt', '软件\t軟件\n')
+    assert parse_spec(make_spec('s2t', [glossary])) == ('s2t', [glossary])
+    assert parse_spec(make_spec('s2t')) == ('s2t', [])
+    assert parse_spec('s2t') is None
+
+
+def test_edited_glossary_gives_a_new_converter(tmp_path, cache_dir, monkeypatch):
+    monkeypatch.setenv('OPENCC_GUI_CACHE_DIR', cache_dir)
+    glossary = _write_glossary(tmp_path / 'terms.txt', '软件\t軟件\n')
+    cache = ConverterCache()
+    assert cache.get(make_spec('s2twp', [glossary])).convert('软件') == '軟件'
+
+    _write_glossary(tmp_path / 'terms.txt', '软件\t軟體程式\n')
+    stat = os.stat(glossary)
+    os.utime(glossary, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.get(make_spec('s2twp', [glossary])).convert('软件') == '軟體程式'
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trie converter for OpenCC GUI - Chinese Text Conversion Tool
+Pure-Python conversion engine compiled from the OpenCC dictionaries plus user
+glossaries, with a compiled on-disk cache that is memory-mapped on load
+"""
+
+import hashlib
+import importlib.util
+import json
+import marshal
+import mmap
+import os
+import re
+
+# Import logger and stage timing
+from app_logger import get_logger, span, timed
+
+# Initialize logger
+logger = get_logger()
+
+# Conversion specs starting with this prefix select the trie engine:
+# "trie:<mode>", or "trie:<mode>|<JSON list of [glossary path, size, mtime_ns]>"
+# so that editing a glossary gives a new spec (and a new cached converter)
+TRIE_SPEC_PREFIX = 'trie:'
+_SPEC_SEPARATOR = '|'
+
+# Where compiled tables are kept; OPENCC_GUI_CACHE_DIR overrides it
+CACHE_DIR_ENV = 'OPENCC_GUI_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'opencc_gui')
+
+# Bumped whenever the layout of the compiled tables changes
+CACHE_FORMAT_VERSION = 2
+
+# Sentence separators of OpenCC (PhraseExtract.cpp); no dictionary entry
+# contains one, so text is converted piece by piece between them
+_SEPARATOR_RE = re.compile(
+    r'(\s+|-|,|\.|\?|!|\*|　|，|。|、|；|：|？|！|…|“|”|‘|’|『|』|「|」|﹁|﹂|—|－|（|）|《|》|〈|〉|～|．|／|＼|︒|︑'
+    r'|︔|︓|︿|﹀|︹|︺|︙|︐|［|﹇|］|﹈|︕|︖|︰|︳|︴|︽|︾|︵|︶|｛|︷|｝|︸|﹃|﹄|【|︻|】|︼)')
+
+
+def _file_stamp(path):
+    """[path, size, mtime_ns] of a glossary file; size and time are None when it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [path, None, None]
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+def make_spec(conversion_mode, glossary_files=()):
+    """Conversion spec selecting the trie engine for a mode and optional glossary files
+
+    Glossaries are recorded with their size and modification time, so a spec
+    made after a glossary changed differs from the one made before.
+    """
+    if not glossary_files:
+        return TRIE_SPEC_PREFIX + conversion_mode
+    stamps = [_file_stamp(os.path.abspath(path)) for path in glossary_files]
+    return TRIE_SPEC_PREFIX + conversion_mode + _SPEC_SEPARATOR + json.dumps(stamps, ensure_ascii=False)
+
+
+def parse_spec(spec):
+    """Split a trie spec into (mode, glossary files); None for a plain OpenCC mode"""
+    if not spec or not spec.startswith(TRIE_SPEC_PREFIX):
+        return None
+    conversion_mode, _, stamps = spec[len(TRIE_SPEC_PREFIX):].partition(_SPEC_SEPARATOR)
+    return conversion_mode, [stamp[0] for stamp in json.loads(stamps)] if stamps else []
+
+
+def base_mode(spec):
+    """OpenCC mode of a spec (the spec itself when it is a plain mode)"""
+    parsed = parse_spec(spec)
+    return parsed[0] if parsed else spec
+
+
+def dictionary_chain(conversion_mode):
+    """Dictionary files of a mode's conversion chain as a list of groups
+
+    Each group is a list of paths tried in order; None when the OpenCC data
+    files cannot be found (e.g. with a binding that ships compiled dictionaries).
+    """
+    spec = importlib.util.find_spec('opencc')
+    if spec is None or not spec.origin:
+        return None
+    package_dir = os.path.dirname(spec.origin)
+    config_file = os.path.join(package_dir, 'config', f"{conversion_mode}.json")
+    if not os.path.exists(config_file):
+        return None
+    with open(config_file, encoding='utf-8') as f:
+        config = json.load(f)
+
+    def collect(dictionary, files):
+        if dictionary.get('type') == 'group':
+            for member in dictionary.get('dicts', []):
+                collect(member, files)
+        elif dictionary.get('file'):
+            files.append(os.path.join(package_dir, 'dictionary', dictionary['file']))
+        return files
+
+    chain = [collect(step.get('dict', {}), []) for step in config.get('conversion_chain', [])]
+    paths = [path for group in chain for path in group]
+    return chain if paths and all(os.path.exists(path) for path in paths) else None
+
+
+def read_dictionary(path, strict=True):
+    """Read a tab-separated OpenCC dictionary into {key: first value}
+
+    Glossaries are read with strict=False, which skips blank lines, comments
+    (#) and lines without a tab instead of failing, and keeps the whole value
+    (a glossary value may contain spaces).
+    """
+    entries = {}
+    with open(path, encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.strip()
+            if not strict and (not line or line.startswith('#') or '\t' not in line):
+                continue
+            fields = line.split('\t')
+            if strict:
+                key, value = fields
+                # Several candidates: OpenCC uses the first one
+                value = value.strip().split(' ')[0]
+            else:
+                key, value = fields[0].strip(), fields[1].strip()
+            if key:
+                entries[key] = value
+    return entries
+
+
+def compile_table(entries):
+    """Compile {key: value} into (max key length, prefix table)
+
+    The prefix table maps every key to its value and every proper prefix of a
+    key that is not a key itself to None, so a scan can stop at the first
+    substring that is not in the table.
+    """
+    table = {}
+    max_len = 1
+    for key, value in entries.items():
+        table[key] = value
+        max_len = max(max_len, len(key))
+    for key in entries:
+        for end in range(1, len(key)):
+            table.setdefault(key[:end], None)
+    return max_len, table
+
+
+def _source_files(conversion_mode, glossary_files):
+    chain = dictionary_chain(conversion_mode)
+    if chain is None:
+        raise ValueError(f"OpenCC dictionaries not found for mode: {conversion_mode}")
+    return chain, list(glossary_files)
+
+
+def _cache_path(conversion_mode, chain, glossary_files, cache_dir):
+    """Cache file name derived from the format version and every source file's path, size and time"""
+    digest = hashlib.sha1(str(CACHE_FORMAT_VERSION).encode('ascii'))
+    for path in [path for group in chain for path in group] + glossary_files:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode('utf-8'))
+    return os.path.join(cache_dir, f"trie-{conversion_mode}-{digest.hexdigest()[:16]}.bin")
+
+
+@timed('trie_compile')
+def compile_tables(conversion_mode, glossary_files=()):
+    """Compile the conversion chain and glossary of a mode into marshal-friendly tables"""
+    chain, glossary_files = _source_files(conversion_mode, glossary_files)
+    glossary = {}
+    for path in glossary_files:
+        glossary.update(read_dictionary(path, strict=False))
+    return {
+        'version': CACHE_FORMAT_VERSION,
+        'mode': conversion_mode,
+        'chain': [[compile_table(read_dictionary(path)) for path in group] for group in chain],
+        'glossary': compile_table(glossary) if glossary else None,
+    }
+
+
+def load_tables(conversion_mode, glossary_files=(), cache_dir=None):
+    """Load compiled tables from the cache, compiling and saving them on a miss
+
+    The cache file is memory-mapped and unmarshalled straight from the mapping.
+    A cache that cannot be written (read-only home, full disk) only costs the
+    compile time on the next start.
+    """
+    chain, glossary_files = _source_files(conversion_mode, glossary_files)
+    cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+    cache_path = _cache_path(conversion_mode, chain, glossary_files, cache_dir)
+    try:
+        with open(cache_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with span('trie_load'):
+                tables = marshal.loads(data)
+        if tables.get('version') == CACHE_FORMAT_VERSION:
+            return tables
+    except (OSError, ValueError, EOFError, TypeError) as e:
+        if not isinstance(e, FileNotFoundError):
+            logger.warning(f"Ignoring unreadable trie cache {cache_path}: {e}")
+
+    tables = compile_tables(conversion_mode, glossary_files)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        partial = f"{cache_path}.{os.getpid()}.partial"
+        with open(partial, 'wb') as f:
+            marshal.dump(tables, f)
+        os.replace(partial, cache_path)
+        logger.debug(f"Trie cache written: {cache_path}")
+    except OSError as e:
+        logger.warning(f"Could not write trie cache {cache_path}: {e}")
+    return tables
+
+
+# Marks a substring that is neither a key nor a key prefix
+_MISSING = object()
+
+
+def _find_matches(text, max_len, table):
+    """Non-overlapping dictionary matches in text as sorted (start, end, value)
+
+    Matches are taken longest first, leftmost among equals, which is what the
+    recursive splitting of OpenCC (the Python implementation) produces.
+    """
+    size = len(text)
+    candidates = []
+    get = table.get
+    for i in range(size):
+        limit = min(max_len, size - i)
+        length = 1
+        while length <= limit:
+            value = get(text[i:i + length], _MISSING)
+            if value is _MISSING:
+                break
+            if value is not None:
+                candidates.append((-length, i, value))
+            length += 1
+    if not candidates:
+        return []
+    candidates.sort()
+    if candidates[0][0] == -1:
+        # Single characters never overlap
+        return [(i, i + 1, value) for _, i, value in sorted(candidates, key=lambda c: c[1])]
+    claimed = bytearray(size)
+    accepted = []
+    for negative_length, i, value in candidates:
+        j = i - negative_length
+        if claimed.find(1, i, j) < 0:
+            claimed[i:j] = b'\x01' * (j - i)
+            accepted.append((i, j, value))
+    accepted.sort()
+    return accepted
+
+
+class TrieConverter:
+    """Drop-in replacement for opencc.OpenCC built from compiled prefix tables
+
+    Glossary entries are matched first, on the whole text, and their output is
+    final; the remaining text runs through the mode's conversion chain exactly
+    as OpenCC would convert it.
+    """
+
+    def __init__(self, conversion_mode, glossary_files=(), cache_dir=None, tables=None):
+        self.conversion = conversion_mode
+        self.glossary_files = list(glossary_files)
+        tables = tables or load_tables(conversion_mode, self.glossary_files, cache_dir)
+        self.glossary = tables['glossary']
+        self.chain = []
+        for group in tables['chain']:
+            steps = []
+            for index, (max_len, table) in enumerate(group):
+                # The last dictionary of a group with single-character keys is a plain mapping
+                translation = str.maketrans(table) if max_len == 1 and index == len(group) - 1 else None
+                steps.append((max_len, table, translation))
+            self.chain.append(steps)
+
+    @classmethod
+    def from_spec(cls, spec, cache_dir=None):
+        """Build the converter described by a trie spec (see make_spec)"""
+        conversion_mode, glossary_files = parse_spec(spec)
+        return cls(conversion_mode, glossary_files, cache_dir)
+
+    def convert(self, string):
+        """Convert a string"""
+        if not self.glossary:
+            return self._convert_unprotected(string)
+        max_len, table = self.glossary
+        parts = []
+        position = 0
+        for start, end, value in _find_matches(string, max_len, table):
+            if start > position:
+                parts.append(self._convert_unprotected(string[position:start]))
+            parts.append(value)
+            position = end
+        if position < len(string):
+            parts.append(self._convert_unprotected(string[position:]))
+        return ''.join(parts)
+
+    def convert_batch(self, strings):
+        """Convert a list of strings"""
+        return [self.convert(string) for string in strings]
+
+    def _convert_unprotected(self, string):
+        pieces = _SEPARATOR_RE.split(string)
+        for i in range(0, len(pieces), 2):
+            if pieces[i]:
+                pieces[i] = self._convert_segment(pieces[i])
+        return ''.join(pieces)
+
+    def _convert_segment(self, segment):
+        """Run a separator-free segment through every step of the chain"""
+        for steps in self.chain:
+            # (text, final) pieces: text matched by one dictionary of the group is final
+            pieces = [(segment, False)]
+            for max_len, table, translation in steps:
+                next_pieces = []
+                for text, final in pieces:
+                    if final:
+                        next_pieces.append((text, True))
+                    elif translation is not None:
+                        next_pieces.append((text.translate(translation), True))
+                    else:
+                        position = 0
+                        for start, end, value in _find_matches(text, max_len, table):
+                            if start > position:
+                                next_pieces.append((text[position:start], False))
+                            next_pieces.append((value, True))
+                            position = end
+                        if position < len(text):
+                            next_pieces.append((text[position:], False))
+                pieces = next_pieces
+            segment = ''.join(text for text, _ in pieces)
+        return segment
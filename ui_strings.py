@@ -23,9 +23,15 @@ SOURCE_LABEL = "原文:"
 TARGET_LABEL = "目标:"
 VARIANT_LABEL = "字形:"
 PHRASES_LABEL = "当地词汇"
+PARALLEL_LABEL = "多进程转换（大型文本/.xls 文件）"
+GLOSSARY_LABEL = "术语表:"
+GLOSSARY_NONE = "未使用"
+GLOSSARY_CHOOSE_BUTTON = "选择..."
+GLOSSARY_CLEAR_BUTTON = "清除"
+GLOSSARY_DIALOG_TITLE = "选择术语表文件（每行：原词<Tab>译词）"
 
 # Column selection section
-COLUMN_SELECTION_TITLE = "列选择（Excel文件）"
+COLUMN_SELECTION_TITLE = "列选择（Excel/CSV/JSON 文件）"
 SELECT_ALL_BUTTON = "全选"
 DESELECT_ALL_BUTTON = "取消全选"
 SELECTED_COLUMNS_LABEL = "已选择: {} 列"
@@ -35,6 +41,7 @@ NOT_APPLICABLE_FILE = "不适用于此文件类型"
 # Preview limits configuration
 PREVIEW_TEXT_LIMIT_LABEL = "预览字符限制:"
 PREVIEW_ROW_LIMIT_LABEL = "预览行数限制:"
+PREVIEW_DEBOUNCE_LABEL = "预览延迟(毫秒):"
 
 # Buttons
 CONVERT_BUTTON = "转换文件"
@@ -52,23 +59,36 @@ PREVIEW_RESULT_HEADER = "文件转换结果（前{}字符）："
 PREVIEW_INVALID_TEXT = "无效的文本数据。"
 PREVIEW_COLUMN_RESULT_HEADER_SINGLE = "列 '{}' 的转换结果（前{}行）："
 PREVIEW_COLUMN_RESULT_HEADER_MULTI = "多列转换结果（{}列，前{}行）："
+PREVIEW_TABLE_VIEW_LABEL = "表格视图（原文与转换结果对照）"
+PREVIEW_TABLE_ORIGINAL_HEADING = "{} · 原文"
+PREVIEW_TABLE_CONVERTED_HEADING = "{} · 转换后"
 
 # Progress messages
 PROGRESS_READY = "就绪"
+PROGRESS_LOADING_CONVERTER = "正在加载转换器..."
 PROGRESS_LOADING_FILE = "Loading file..."
 PROGRESS_FILE_LOADED = "File loaded successfully"
 PROGRESS_ERROR_LOADING_FILE = "Error loading file"
 PROGRESS_CONVERTING_FILE = "正在转换文件..."
 PROGRESS_CONVERTING_TEXT_FILE = "正在转换文本文件..."
+PROGRESS_CONVERTING_CSV_FILE = "正在转换 CSV 文件... 已处理 {} 行"
+PROGRESS_CONVERTING_TABLE_ROWS = "正在转换列数据... {}/{} 行"
+PROGRESS_CONVERTING_JSON_FILE = "正在转换 JSON 文件... 已处理 {} 个字符串"
 PROGRESS_SAVING_FILE = "正在保存转换后的文件..."
 PROGRESS_COMPLETED = "转换完成！"
 PROGRESS_FAILED = "转换失败"
+PROGRESS_RATE_ITEMS = "{:.0f} 项/秒"
+PROGRESS_RATE_BYTES = "{:.1f} MB/秒"
+PROGRESS_ETA = "剩余 {}"
 
 # Error messages
 ERROR_IMPORT_OPENCC = "Import Error"
 ERROR_IMPORT_OPENCC_MSG = "Please install opencc-python-reimplemented:\npip install opencc-python-reimplemented"
 ERROR_IMPORT_OPENPYXL = "Import Error"
 ERROR_IMPORT_OPENPYXL_MSG = "Please install openpyxl:\npip install openpyxl"
+ERROR_IMPORT_PANDAS_MSG = "Please install pandas:\npip install pandas"
+ERROR_IMPORT_PYARROW_MSG = "Please install pyarrow:\npip install pyarrow"
+ERROR_IMPORT_ZSTANDARD_MSG = "Please install zstandard to read and write .zst files:\npip install zstandard"
 ERROR_IMPORT_DOCX = "Import Error"
 ERROR_IMPORT_DOCX_MSG = "Please install python-docx:\npip install python-docx"
 ERROR_CONVERTER_INIT = "转换器错误"
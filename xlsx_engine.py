@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XLSX engine for OpenCC GUI - Chinese Text Conversion Tool
+Converts .xlsx workbooks by rewriting the shared-strings table (and inline
+strings) in a streaming pass; formatting, formulas, styles and all other
+package members are copied unchanged
+"""
+
+import re
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Import UI strings
+import ui_strings as ui
+
+# Import logger and stage timing
+from app_logger import get_logger, span, timed
+
+# Import batched conversion
+from batch_convert import DEFAULT_BATCH_BYTES
+
+# Import OOXML streaming helpers
+from ooxml_stream import (iter_xml_tokens, iter_xml_blocks, unescape_text, escape_text, convert_runs,
+                          copy_member, open_member_for_write)
+
+# Initialize logger
+logger = get_logger()
+
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+# Shared-strings part: the <sst> start tag, every <si> item and the closing tag
+_SST_TOKEN_RE = re.compile(r'<sst\b[^>]*>|<si\b[^>]*?/>|<si\b[^>]*>.*?</si>|</sst>', re.S)
+_SST_START_RE = re.compile(r'<s(?:st|i)[\s>/]|</sst')
+
+# Worksheet part: row start tags and complete cells
+_SHEET_TOKEN_RE = re.compile(r'<row\b[^>]*?/>|<row\b[^>]*>|<c\b[^>]*?/>|<c\b[^>]*>.*?</c>', re.S)
+_SHEET_START_RE = re.compile(r'<(?:row|c)[\s>/]')
+
+# Text runs; phonetic guides (<rPh>) are left alone
+_TEXT_RE = re.compile(r'<t\b[^>]*>(.*?)</t>', re.S)
+_PHONETIC_RE = re.compile(r'<rPh\b.*?</rPh>', re.S)
+
+_CELL_REF_RE = re.compile(r'\br="([A-Za-z]+)\d*"')
+_CELL_TYPE_RE = re.compile(r'\bt="(\w+)"')
+_CELL_VALUE_RE = re.compile(r'(<v>)\s*(\d+)\s*(</v>)')
+_RAW_VALUE_RE = re.compile(r'<v>(.*?)</v>', re.S)
+_ROW_REF_RE = re.compile(r'<row\b[^>]*?\br="(\d+)"')
+
+# Block-level matching of referenced cells (r="A1" first, as Excel writes them);
+# (?<!/) keeps empty self-closing cells out
+_SHARED_CELL_RE = re.compile(r'<c r="([A-Z]+)(\d+)"[^>]*?\bt="s"[^>]*(?<!/)>\s*<v>(\d+)</v>')
+_ANY_SHARED_CELL_RE = re.compile(r'<c\b[^>]*?\bt="s"[^>]*(?<!/)>\s*<v>(\d+)</v>')
+_STRING_CELL_RE = re.compile(r'<c r="([A-Z]+)(\d+)"[^>]*?\bt="(s|inlineStr)"[^>]*(?<!/)>.*?</c>', re.S)
+_INLINE_CELL_RE = re.compile(r'<c\b[^>]*?\bt="inlineStr"[^>]*(?<!/)>.*?</c>', re.S)
+_UNIQUE_COUNT_RE = re.compile(r'\buniqueCount="(\d+)"')
+
+
+def _column_index(letters):
+    """Convert column letters to a zero-based index"""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index - 1
+
+
+def _column_letters(index):
+    """Convert a zero-based column index to column letters"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _part_path(target, base='xl'):
+    """Resolve a relationship target to a package member name"""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(base, target))
+
+
+def _workbook_parts(package):
+    """Return (worksheet paths in workbook order, shared strings path or None)"""
+    workbook = ET.fromstring(package.read('xl/workbook.xml'))
+    rels = ET.fromstring(package.read('xl/_rels/workbook.xml.rels'))
+    targets = {}
+    shared_strings = None
+    for rel in rels:
+        rel_type = rel.get('Type', '')
+        if rel_type.endswith('/sharedStrings'):
+            shared_strings = _part_path(rel.get('Target'))
+        targets[rel.get('Id')] = _part_path(rel.get('Target'))
+    sheets = []
+    for sheet in workbook.iterfind('{*}sheets/{*}sheet'):
+        rel_id = sheet.get(_REL_NS + 'id')
+        if rel_id in targets and targets[rel_id].startswith('xl/worksheets/'):
+            sheets.append(targets[rel_id])
+    return sheets, shared_strings
+
+
+def _text_slots(block):
+    """Find (start, end, text) of every text run of an <si>/<is> block, skipping phonetics"""
+    skipped = [(m.start(), m.end()) for m in _PHONETIC_RE.finditer(block)]
+    slots = []
+    for match in _TEXT_RE.finditer(block):
+        if any(start <= match.start() < end for start, end in skipped):
+            continue
+        slots.append((match.start(1), match.end(1), unescape_text(match.group(1))))
+    return slots
+
+
+def _block_text(block):
+    """Plain text of an <si>/<is> block"""
+    return ''.join(text for _, _, text in _text_slots(block))
+
+
+def _convert_blocks(blocks, converter, memo=None, conversion_mode=None):
+    """Convert the text runs of many blocks, keeping runs of rich text in place"""
+    slots_per_block = [_text_slots(block) for block in blocks]
+    split_texts = convert_runs([[text for _, _, text in slots] for slots in slots_per_block],
+                               converter, memo, conversion_mode)
+
+    results = []
+    for block, slots, texts in zip(blocks, slots_per_block, split_texts):
+        parts = []
+        position = 0
+        for (start, end, original), text in zip(slots, texts):
+            parts.append(block[position:start])
+            parts.append(escape_text(text) if text != original else block[start:end])
+            position = end
+        parts.append(block[position:])
+        results.append(''.join(parts))
+    return results
+
+
+class _BatchedWriter:
+    """Writes XML text in order while blocks to convert are collected into batches"""
+
+    def __init__(self, target, converter, memo, conversion_mode, on_flush=None, batch_bytes=DEFAULT_BATCH_BYTES):
+        self.target = target
+        self.converter = converter
+        self.memo = memo
+        self.conversion_mode = conversion_mode
+        self.on_flush = on_flush
+        self.batch_bytes = batch_bytes
+        self.segments = []
+        self.blocks = []
+        self.pending_size = 0
+        self.converted = 0
+
+    def write(self, text):
+        """Queue text that is copied unchanged"""
+        if self.blocks:
+            self.segments.append(text)
+        else:
+            self.target.write(text.encode('utf-8'))
+
+    def write_block(self, block):
+        """Queue a block whose text runs are converted"""
+        self.segments.append(len(self.blocks))
+        self.blocks.append(block)
+        self.pending_size += len(block)
+        if self.pending_size >= self.batch_bytes:
+            self.flush()
+
+    def flush(self):
+        """Convert the queued blocks and write everything queued so far"""
+        if not self.blocks:
+            return
+        converted = _convert_blocks(self.blocks, self.converter, self.memo, self.conversion_mode)
+        self.target.write(''.join(
+            converted[segment] if isinstance(segment, int) else segment
+            for segment in self.segments).encode('utf-8'))
+        self.converted += len(self.blocks)
+        self.segments, self.blocks, self.pending_size = [], [], 0
+        if self.on_flush:
+            self.on_flush(self.converted)
+
+
+def _iter_cells(stream):
+    """Yield (token, text, row_number, column_index) over a worksheet part
+
+    Non-cell text is yielded with token None; row_number counts <row> elements
+    from 1 and column_index follows the cell reference or the cell order.
+    """
+    row_number = 0
+    column = -1
+    for match, text in iter_xml_tokens(stream, _SHEET_TOKEN_RE, _SHEET_START_RE):
+        if match is None:
+            yield None, text, row_number, column
+            continue
+        if text.startswith('<row'):
+            row_number += 1
+            column = -1
+            yield None, text, row_number, column
+            continue
+        start_tag = text[:text.index('>') + 1]
+        ref = _CELL_REF_RE.search(start_tag)
+        column = _column_index(ref.group(1)) if ref else column + 1
+        yield start_tag, text, row_number, column
+
+
+def _cell_type(start_tag):
+    """Value of a cell's t attribute ('n' when missing)"""
+    match = _CELL_TYPE_RE.search(start_tag)
+    return match.group(1) if match else 'n'
+
+
+def _shared_index(cell):
+    """Shared-string index referenced by a t="s" cell"""
+    match = _CELL_VALUE_RE.search(cell)
+    return int(match.group(2)) if match else None
+
+
+def _header_labels(package, sheet_path, shared_strings_path):
+    """Column labels of a sheet's first row, named the way pandas.read_excel names them
+
+    Returns (labels, header_row) where header_row is the r attribute of that row.
+    """
+    header = {}
+    wanted = {}
+    header_row = '1'
+    with package.open(sheet_path) as stream:
+        for start_tag, cell, row_number, column in _iter_cells(stream):
+            if row_number > 1:
+                break
+            if start_tag is None:
+                row_ref = _ROW_REF_RE.match(cell)
+                if row_ref:
+                    header_row = row_ref.group(1)
+                continue
+            cell_type = _cell_type(start_tag)
+            if cell_type == 's':
+                index = _shared_index(cell)
+                if index is not None:
+                    wanted[index] = column
+            elif cell_type == 'inlineStr':
+                header[column] = _block_text(cell)
+            else:
+                value = _RAW_VALUE_RE.search(cell)
+                if value:
+                    raw = unescape_text(value.group(1))
+                    try:
+                        number = float(raw)
+                        raw = str(int(number)) if number.is_integer() else str(number)
+                    except ValueError:
+                        pass
+                    header[column] = raw
+
+    if wanted and shared_strings_path:
+        index = -1
+        with package.open(shared_strings_path) as stream:
+            for match, text in iter_xml_tokens(stream, _SST_TOKEN_RE, _SST_START_RE):
+                if match is None or not text.startswith('<si'):
+                    continue
+                index += 1
+                if index in wanted:
+                    header[wanted.pop(index)] = _block_text(text)
+                    if not wanted:
+                        break
+
+    labels = []
+    seen = {}
+    for column in range(max(header) + 1 if header else 0):
+        label = header.get(column) or f"Unnamed: {column}"
+        if label in seen:
+            seen[label] += 1
+            label = f"{label}.{seen[label]}"
+        else:
+            seen[label] = 0
+        labels.append(label)
+    return labels, header_row
+
+
+def _resolve_selected_columns(labels, columns):
+    """Map requested column names or letters to zero-based column indexes"""
+    from conversion_engine import resolve_columns
+
+    labels = list(labels)
+    # Columns without a header cell are only named once requested
+    for name in columns:
+        match = re.match(r'^Unnamed: (\d+)$', str(name))
+        if match:
+            while len(labels) <= int(match.group(1)):
+                labels.append(f"Unnamed: {len(labels)}")
+    resolved = resolve_columns(labels, columns)
+    return {labels.index(name) for name in resolved}
+
+
+def _count_shared_strings(package, shared_strings_path):
+    """Number of <si> items in the shared-strings part"""
+    count = 0
+    with package.open(shared_strings_path) as stream:
+        for match, text in iter_xml_tokens(stream, _SST_TOKEN_RE, _SST_START_RE):
+            if match is not None and text.startswith('<si'):
+                count += 1
+    return count
+
+
+def _cells_referenced(block):
+    """Whether every cell of a worksheet block starts with its r="A1" reference"""
+    return block.count('<c ') + block.count('<c>') + block.count('<c/>') == block.count('<c r="')
+
+
+class _ColumnPlan:
+    """Which shared strings and cells a column selection touches"""
+
+    def __init__(self, sheet_path, selected_columns, header_row):
+        self.sheet_path = sheet_path
+        self.selected_columns = selected_columns
+        self.selected_letters = {_column_letters(column) for column in selected_columns}
+        self.header_row = header_row
+        self.referenced = True
+        self.selected_indexes = set()
+        self.other_indexes = set()
+        self.inline_selected = False
+        self.convert_indexes = set()
+        self.relocated = {}
+
+    @property
+    def rewrite_sheet(self):
+        """Whether the selected sheet itself must be rewritten"""
+        return self.inline_selected or bool(self.relocated)
+
+    def in_scope(self, letters, row):
+        """Whether a referenced cell lies in the selection"""
+        return row != self.header_row and letters in self.selected_letters
+
+
+def _scan_selected_sheet(package, plan):
+    """Sort the shared strings of the selected sheet into selected and other ones
+
+    Works on whole blocks of rows with regular expressions; returns False without
+    a result when some cell has no r attribute, which needs the cell-by-cell scan.
+    """
+    selected = set()
+    other = set()
+    with package.open(plan.sheet_path) as stream:
+        for block in iter_xml_blocks(stream, '<row'):
+            if not _cells_referenced(block):
+                return False
+            for letters, row, index in _SHARED_CELL_RE.findall(block):
+                if row != plan.header_row and letters in plan.selected_letters:
+                    selected.add(index)
+                else:
+                    other.add(index)
+            if 'inlineStr' in block and not plan.inline_selected:
+                plan.inline_selected = any(
+                    cell_type == 'inlineStr' and plan.in_scope(letters, row)
+                    for letters, row, cell_type in _STRING_CELL_RE.findall(block))
+    plan.selected_indexes.update(int(index) for index in selected)
+    plan.other_indexes.update(int(index) for index in other)
+    return True
+
+
+def _scan_selected_sheet_by_cell(package, plan):
+    """Cell-by-cell variant of _scan_selected_sheet for cells without references"""
+    plan.referenced = False
+    plan.selected_indexes.clear()
+    plan.inline_selected = False
+    with package.open(plan.sheet_path) as stream:
+        for start_tag, cell, row_number, column in _iter_cells(stream):
+            if start_tag is None:
+                continue
+            cell_type = _cell_type(start_tag)
+            selected = row_number > 1 and column in plan.selected_columns
+            if cell_type == 's':
+                index = _shared_index(cell)
+                if index is not None:
+                    (plan.selected_indexes if selected else plan.other_indexes).add(index)
+            elif cell_type == 'inlineStr' and selected:
+                plan.inline_selected = True
+
+
+@timed('plan')
+def _plan_columns(package, sheet_paths, shared_strings_path, columns):
+    """Scan the workbook to map the selected columns of the first sheet to shared strings"""
+    sheet_path = sheet_paths[0]
+    labels, header_row = _header_labels(package, sheet_path, shared_strings_path)
+    plan = _ColumnPlan(sheet_path, _resolve_selected_columns(labels, columns), header_row)
+
+    if not _scan_selected_sheet(package, plan):
+        _scan_selected_sheet_by_cell(package, plan)
+    for path in sheet_paths[1:]:
+        with package.open(path) as stream:
+            for block in iter_xml_blocks(stream, '<row'):
+                plan.other_indexes.update(int(index) for index in set(_ANY_SHARED_CELL_RE.findall(block)))
+
+    # Strings also used outside the selection get a converted copy at the end of the table
+    plan.convert_indexes = plan.selected_indexes - plan.other_indexes
+    shared = sorted(plan.selected_indexes & plan.other_indexes)
+    if shared:
+        base = _count_shared_strings(package, shared_strings_path)
+        plan.relocated = {index: base + offset for offset, index in enumerate(shared)}
+    return plan
+
+
+def _rewrite_shared_strings(package, info, target_zip, converter, plan, memo, conversion_mode, progress):
+    """Stream the shared-strings part, converting the items in scope"""
+    relocated_blocks = {}
+    total = None
+    with package.open(info) as stream, open_member_for_write(target_zip, info) as target:
+        def report(done):
+            if progress:
+                progress(done, max(total or done, done), f"{ui.PROGRESS_CONVERTING_FILE} {done}/{total or '?'}")
+
+        writer = _BatchedWriter(target, converter, memo, conversion_mode, on_flush=report)
+        index = -1
+        for match, text in iter_xml_tokens(stream, _SST_TOKEN_RE, _SST_START_RE):
+            if match is None:
+                writer.write(text)
+            elif text.startswith('<sst'):
+                unique_count = _UNIQUE_COUNT_RE.search(text)
+                if unique_count:
+                    total = int(unique_count.group(1))
+                    if plan and plan.relocated:
+                        text = _UNIQUE_COUNT_RE.sub(f'uniqueCount="{total + len(plan.relocated)}"', text)
+                writer.write(text)
+            elif text.startswith('<si'):
+                index += 1
+                if plan is not None and index in plan.relocated:
+                    relocated_blocks[index] = text
+                if plan is None or index in plan.convert_indexes:
+                    writer.write_block(text)
+                else:
+                    writer.write(text)
+            else:
+                # Converted copies of strings shared with unselected cells go last
+                if plan is not None:
+                    for original in sorted(plan.relocated, key=plan.relocated.get):
+                        writer.write_block(relocated_blocks[original])
+                writer.write(text)
+        writer.flush()
+    return writer.converted
+
+
+def _repoint(cell, plan):
+    """Point a shared-string cell at the converted copy of its string"""
+    return _CELL_VALUE_RE.sub(lambda m: f"{m.group(1)}{plan.relocated[int(m.group(2))]}{m.group(3)}", cell, 1)
+
+
+def _rewrite_blocks(stream, writer, plan):
+    """Rewrite a worksheet block by block: inline strings in scope and relocated shared strings"""
+    for block in iter_xml_blocks(stream, '<row'):
+        if plan is None and 'inlineStr' not in block:
+            writer.write(block)
+            continue
+        position = 0
+        for match in (_INLINE_CELL_RE if plan is None else _STRING_CELL_RE).finditer(block):
+            cell = match.group(0)
+            if plan is None:
+                replacement = None
+            else:
+                letters, row, cell_type = match.groups()
+                if not plan.in_scope(letters, row):
+                    continue
+                if cell_type == 's':
+                    index = _shared_index(cell)
+                    if index not in plan.relocated:
+                        continue
+                    replacement = _repoint(cell, plan)
+                else:
+                    replacement = None
+            writer.write(block[position:match.start()])
+            if replacement is None:
+                writer.write_block(cell)
+            else:
+                writer.write(replacement)
+            position = match.end()
+        writer.write(block[position:])
+
+
+def _rewrite_cells(stream, writer, plan):
+    """Cell-by-cell variant of _rewrite_blocks for cells without references"""
+    for start_tag, cell, row_number, column in _iter_cells(stream):
+        if start_tag is None or row_number <= 1 or column not in plan.selected_columns:
+            writer.write(cell)
+            continue
+        cell_type = _cell_type(start_tag)
+        if cell_type == 'inlineStr':
+            writer.write_block(cell)
+        elif cell_type == 's' and _shared_index(cell) in plan.relocated:
+            writer.write(_repoint(cell, plan))
+        else:
+            writer.write(cell)
+
+
+def _rewrite_sheet(package, info, target_zip, converter, plan, memo, conversion_mode):
+    """Stream a worksheet, converting inline strings in scope and repointing relocated shared strings"""
+    with package.open(info) as stream, open_member_for_write(target_zip, info) as target:
+        writer = _BatchedWriter(target, converter, memo, conversion_mode)
+        if plan is None or plan.referenced:
+            _rewrite_blocks(stream, writer, plan)
+        else:
+            _rewrite_cells(stream, writer, plan)
+        writer.flush()
+    return writer.converted
+
+
+def convert_xlsx_file(input_path, output_path, converter, columns=None, progress=None,
+                      conversion_mode=None, memo=None):
+    """Convert an .xlsx package without the pandas round trip
+
+    With columns=None every text of every sheet is converted, header cells
+    included. Otherwise only cells below the header row of the first sheet in
+    the given columns (names as read by pandas, or Excel letters) are converted;
+    shared strings that are also used elsewhere get a converted copy so other
+    cells stay untouched.
+    """
+    with zipfile.ZipFile(input_path) as package:
+        sheet_paths, shared_strings_path = _workbook_parts(package)
+        if not sheet_paths:
+            raise ValueError(ui.PREVIEW_INVALID_EXCEL)
+        plan = None
+        if columns is not None:
+            plan = _plan_columns(package, sheet_paths, shared_strings_path, columns)
+            if not plan.selected_columns:
+                raise ValueError(ui.WARNING_NO_COLUMN_MSG)
+
+        shared_converted = 0
+        inline_converted = 0
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as target_zip:
+            for info in package.infolist():
+                if info.filename == shared_strings_path:
+                    with span('convert'):
+                        shared_converted = _rewrite_shared_strings(
+                            package, info, target_zip, converter, plan, memo, conversion_mode, progress)
+                elif info.filename in sheet_paths and (
+                        plan is None or (info.filename == plan.sheet_path and plan.rewrite_sheet)):
+                    with span('sheets'):
+                        inline_converted += _rewrite_sheet(
+                            package, info, target_zip, converter, plan, memo, conversion_mode)
+                else:
+                    with span('copy'):
+                        copy_member(package, info, target_zip)
+
+    logger.debug(f"XLSX engine: {shared_converted} shared strings, {inline_converted} inline strings converted")
+    return {'shared_strings': shared_converted, 'inline_strings': inline_converted, 'engine': 'xlsx'}